@@ -0,0 +1,38 @@
+"""
+Shared API dependencies
+App-scoped services are built once in the lifespan and injected per request
+"""
+from fastapi import Request
+
+from app.services.cerebras_service import CerebrasService
+from app.services.health_prober import HealthProber
+from app.services.mcp_orchestrator import MCPOrchestrator
+from app.services.ollama_service import OllamaService
+
+
+def get_mcp_orchestrator(request: Request) -> MCPOrchestrator:
+    """
+    Dependency to get the app-scoped MCP orchestrator
+    """
+    return request.app.state.mcp_orchestrator
+
+
+def get_cerebras_service(request: Request) -> CerebrasService:
+    """
+    Dependency to get the app-scoped Cerebras service
+    """
+    return request.app.state.cerebras_service
+
+
+def get_ollama_service(request: Request) -> OllamaService:
+    """
+    Dependency to get the app-scoped Ollama service
+    """
+    return request.app.state.ollama_service
+
+
+def get_health_prober(request: Request) -> HealthProber:
+    """
+    Dependency to get the background health prober
+    """
+    return request.app.state.health_prober
@@ -5,17 +5,21 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from loguru import logger
-import aiohttp
 
+from app.api.deps import get_health_prober
 from app.core.database import get_db
 from app.core.config import settings
+from app.services.health_prober import HealthProber
 from app.schemas.health import HealthCheck, ComponentHealth
 
 router = APIRouter()
 
 
 @router.get("", response_model=HealthCheck)
-async def health_check(db: AsyncSession = Depends(get_db)):
+async def health_check(
+    db: AsyncSession = Depends(get_db),
+    prober: HealthProber = Depends(get_health_prober)
+):
     """
     Comprehensive health check for all system components
     """
@@ -39,53 +43,14 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         )
         health_status["status"] = "unhealthy"
     
-    # Check MCP Gateway
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{settings.MCP_GATEWAY_URL}/health",
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                if response.status == 200:
-                    health_status["components"]["mcp_gateway"] = ComponentHealth(
-                        status="healthy",
-                        message="MCP Gateway operational"
-                    )
-                else:
-                    health_status["components"]["mcp_gateway"] = ComponentHealth(
-                        status="degraded",
-                        message=f"MCP Gateway returned status {response.status}"
-                    )
-    except Exception as e:
-        logger.error(f"MCP Gateway health check failed: {e}")
-        health_status["components"]["mcp_gateway"] = ComponentHealth(
-            status="unhealthy",
-            message=f"MCP Gateway error: {str(e)}"
-        )
-    
-    # Check Ollama
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{settings.OLLAMA_HOST}/api/tags",
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                if response.status == 200:
-                    health_status["components"]["ollama"] = ComponentHealth(
-                        status="healthy",
-                        message="Ollama operational"
-                    )
-                else:
-                    health_status["components"]["ollama"] = ComponentHealth(
-                        status="degraded",
-                        message=f"Ollama returned status {response.status}"
-                    )
-    except Exception as e:
-        logger.error(f"Ollama health check failed: {e}")
-        health_status["components"]["ollama"] = ComponentHealth(
-            status="unhealthy",
-            message=f"Ollama error: {str(e)}"
-        )
+    # MCP Gateway and Ollama (from the latest background probe)
+    for component in ("mcp_gateway", "ollama"):
+        snapshot = prober.get_component(component)
+        if snapshot:
+            health_status["components"][component] = ComponentHealth(
+                status=snapshot["status"],
+                message=snapshot["message"]
+            )
     
     # Check Cerebras API
     health_status["components"]["cerebras"] = ComponentHealth(
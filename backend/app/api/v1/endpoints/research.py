@@ -9,10 +9,10 @@ from typing import Optional
 import asyncio
 
 from app.core.database import get_db
+from app.api.deps import get_cerebras_service, get_mcp_orchestrator
 from app.schemas.research import ResearchQuery, ResearchResponse, ResearchStatus
 from app.services.cerebras_service import CerebrasService
 from app.services.mcp_orchestrator import MCPOrchestrator
-from app.services.ollama_service import OllamaService
 from app.core.monitoring import research_queries_total, research_query_duration_seconds
 from time import time
 
@@ -23,7 +23,9 @@ router = APIRouter()
 async def create_research_query(
     query: ResearchQuery,
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    cerebras_service: CerebrasService = Depends(get_cerebras_service),
+    mcp_orchestrator: MCPOrchestrator = Depends(get_mcp_orchestrator)
 ):
     """
     Submit a research query for processing
@@ -34,10 +36,6 @@ async def create_research_query(
     try:
         logger.info(f"Received research query: {query.query[:100]}...")
         
-        # Initialize services
-        cerebras_service = CerebrasService()
-        mcp_orchestrator = MCPOrchestrator()
-        
         # Validate query
         if len(query.query) < 10:
             raise HTTPException(status_code=400, detail="Query too short (minimum 10 characters)")
@@ -55,7 +53,9 @@ async def create_research_query(
         await db.refresh(research)
         
         # Start async processing (without passing the session)
-        asyncio.create_task(process_research_query(research.id, query))
+        asyncio.create_task(
+            process_research_query(research.id, query, cerebras_service, mcp_orchestrator)
+        )
         
         # Record metrics
         research_queries_total.inc()
@@ -78,7 +78,9 @@ async def create_research_query(
 @router.get("/stream/{research_id}")
 async def stream_research_results(
     research_id: str,
-    request: Request
+    request: Request,
+    cerebras_service: CerebrasService = Depends(get_cerebras_service),
+    mcp_orchestrator: MCPOrchestrator = Depends(get_mcp_orchestrator)
 ):
     """
     Stream research results in real-time using SSE
@@ -90,7 +92,11 @@ async def stream_research_results(
     async def event_generator():
         """Generate SSE events"""
         try:
-            research_service = ResearchService(None)  # Will create session per query
+            research_service = ResearchService(  # Will create session per query
+                None,
+                cerebras_service=cerebras_service,
+                mcp_orchestrator=mcp_orchestrator
+            )
             async for chunk in research_service.stream_results(research_id):
                 yield f"data: {chunk}\n\n"
                 await asyncio.sleep(0.01)  # Small delay for smooth streaming
@@ -109,6 +115,32 @@ async def stream_research_results(
     )
 
 
+@router.get("/cache/synthesis")
+async def get_synthesis_cache_stats(
+    cerebras_service: CerebrasService = Depends(get_cerebras_service)
+):
+    """
+    Get synthesis cache size and limits
+    """
+    cache = cerebras_service.synthesis_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.delete("/cache/synthesis")
+async def clear_synthesis_cache(
+    cerebras_service: CerebrasService = Depends(get_cerebras_service)
+):
+    """
+    Invalidate every cached synthesis
+    """
+    cache = cerebras_service.synthesis_cache
+    if cache is None:
+        raise HTTPException(status_code=404, detail="Synthesis cache is disabled")
+    return {"message": "Synthesis cache cleared", "cleared": cache.clear()}
+
+
 @router.get("/history")
 async def get_research_history(
     limit: int = 20,
@@ -172,6 +204,8 @@ async def get_research_status(
             sources=research.sources,
             results=research.results,
             synthesis=research.synthesis,
+            synthesis_revision=research.synthesis_revision,
+            synthesis_revisions=research.synthesis_revisions,
             credibility_score=research.credibility_score,
             created_at=research.created_at,
             completed_at=research.completed_at,
@@ -216,7 +250,9 @@ async def delete_research(
 
 async def process_research_query(
     research_id: str,
-    query: ResearchQuery
+    query: ResearchQuery,
+    cerebras_service: Optional[CerebrasService] = None,
+    mcp_orchestrator: Optional[MCPOrchestrator] = None
 ):
     """
     Background task to process research query
@@ -229,7 +265,11 @@ async def process_research_query(
     # Create a new database session for this background task
     async with AsyncSessionLocal() as db:
         try:
-            research_service = ResearchService(db)
+            research_service = ResearchService(
+                db,
+                cerebras_service=cerebras_service,
+                mcp_orchestrator=mcp_orchestrator
+            )
             
             # Choose processing method based on use_tool_calling parameter
             if query.use_tool_calling:
@@ -1,24 +1,28 @@
 """
 Sources endpoint - MCP source management and health checks
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from loguru import logger
 from typing import List
 
+from app.api.deps import get_health_prober, get_mcp_orchestrator
 from app.schemas.sources import SourceStatus, SourceHealth
+from app.services.health_prober import HealthProber
 from app.services.mcp_orchestrator import MCPOrchestrator
 
 router = APIRouter()
 
 
 @router.get("/status", response_model=List[SourceStatus])
-async def get_sources_status():
+async def get_sources_status(
+    orchestrator: MCPOrchestrator = Depends(get_mcp_orchestrator),
+    prober: HealthProber = Depends(get_health_prober)
+):
     """
-    Get the status of all MCP sources
+    Get the status of all MCP sources (from the latest background probe)
     """
     try:
-        orchestrator = MCPOrchestrator()
-        sources = await orchestrator.check_all_sources()
+        sources = prober.get_sources()
         
         return [
             SourceStatus(
@@ -26,6 +30,8 @@ async def get_sources_status():
                 status=source["status"],
                 response_time=source.get("response_time"),
                 last_check=source.get("last_check"),
+                error=source.get("error"),
+                **orchestrator.get_source_stats(source["name"]),
             )
             for source in sources
         ]
@@ -35,13 +41,14 @@ async def get_sources_status():
 
 
 @router.get("/health", response_model=SourceHealth)
-async def get_sources_health():
+async def get_sources_health(
+    prober: HealthProber = Depends(get_health_prober)
+):
     """
-    Get overall health of MCP sources
+    Get overall health of MCP sources (from the latest background probe)
     """
     try:
-        orchestrator = MCPOrchestrator()
-        health = await orchestrator.get_health_summary()
+        health = prober.get_health_summary()
         
         return SourceHealth(
             total_sources=health["total"],
@@ -55,13 +62,16 @@ async def get_sources_health():
 
 
 @router.get("/{source_name}/status", response_model=SourceStatus)
-async def get_source_status(source_name: str):
+async def get_source_status(
+    source_name: str,
+    orchestrator: MCPOrchestrator = Depends(get_mcp_orchestrator),
+    prober: HealthProber = Depends(get_health_prober)
+):
     """
-    Get the status of a specific MCP source
+    Get the status of a specific MCP source (from the latest background probe)
     """
     try:
-        orchestrator = MCPOrchestrator()
-        source = await orchestrator.check_source(source_name)
+        source = prober.get_source(source_name)
         
         if not source:
             raise HTTPException(status_code=404, detail=f"Source '{source_name}' not found")
@@ -71,6 +81,8 @@ async def get_source_status(source_name: str):
             status=source["status"],
             response_time=source.get("response_time"),
             last_check=source.get("last_check"),
+            error=source.get("error"),
+            **orchestrator.get_source_stats(source["name"]),
         )
     except HTTPException:
         raise
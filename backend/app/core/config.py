@@ -2,7 +2,7 @@
 Application Configuration
 Loads settings from environment variables
 """
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
 
@@ -40,9 +40,84 @@ class Settings(BaseSettings):
     REDIS_URL: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
     CACHE_TTL: int = Field(default=3600, env="CACHE_TTL")
     
+    # Source Result Cache (L1 in-process LRU + L2 Redis)
+    SOURCE_CACHE_ENABLED: bool = Field(default=True, env="SOURCE_CACHE_ENABLED")
+    SOURCE_CACHE_L1_MAX_BYTES: int = Field(default=64 * 1024 * 1024, env="SOURCE_CACHE_L1_MAX_BYTES")
+    SOURCE_CACHE_REDIS_ENABLED: bool = Field(default=True, env="SOURCE_CACHE_REDIS_ENABLED")
+    SOURCE_CACHE_REDIS_TIMEOUT: float = Field(default=0.25, env="SOURCE_CACHE_REDIS_TIMEOUT")
+    SOURCE_CACHE_TTLS: Dict[str, int] = Field(
+        default={
+            "news": 300,
+            "web-search": 900,
+            "database": 600,
+            "github": 3600,
+            "filesystem": 3600,
+            "arxiv": 86400,
+        },
+        env="SOURCE_CACHE_TTLS"
+    )
+    
+    # Synthesis Cache (exact match on model + prompt + sampling settings)
+    SYNTHESIS_CACHE_ENABLED: bool = Field(default=True, env="SYNTHESIS_CACHE_ENABLED")
+    SYNTHESIS_CACHE_TTL: int = Field(default=900, env="SYNTHESIS_CACHE_TTL")
+    SYNTHESIS_CACHE_MAX_ENTRIES: int = Field(default=500, env="SYNTHESIS_CACHE_MAX_ENTRIES")
+    SYNTHESIS_CACHE_MAX_BYTES: int = Field(default=16 * 1024 * 1024, env="SYNTHESIS_CACHE_MAX_BYTES")
+    SYNTHESIS_CACHE_REPLAY_CHUNK_CHARS: int = Field(default=48, env="SYNTHESIS_CACHE_REPLAY_CHUNK_CHARS")
+    SYNTHESIS_CACHE_REPLAY_DELAY: float = Field(default=0.0, env="SYNTHESIS_CACHE_REPLAY_DELAY")
+    
+    # Synthesis Context Packing (approximate tokens)
+    CONTEXT_TOKEN_BUDGET: int = Field(default=3000, env="CONTEXT_TOKEN_BUDGET")
+    CONTEXT_ITEM_MAX_TOKENS: int = Field(default=160, env="CONTEXT_ITEM_MAX_TOKENS")
+    CONTEXT_MAX_ITEMS_PER_SOURCE: int = Field(default=25, env="CONTEXT_MAX_ITEMS_PER_SOURCE")
+    
+    # Progressive Synthesis (draft from the first sources, refine on all of them)
+    PROGRESSIVE_DRAFT_MIN_SOURCES: int = Field(default=1, env="PROGRESSIVE_DRAFT_MIN_SOURCES")
+    PROGRESSIVE_DRAFT_CONTEXT_TOKENS: int = Field(default=1500, env="PROGRESSIVE_DRAFT_CONTEXT_TOKENS")
+    PROGRESSIVE_DRAFT_SAVE_INTERVAL: float = Field(default=0.25, env="PROGRESSIVE_DRAFT_SAVE_INTERVAL")
+    
     # MCP Gateway
     MCP_GATEWAY_URL: str = Field(default="http://localhost:8080", env="MCP_GATEWAY_URL")
     MCP_GATEWAY_TIMEOUT: int = Field(default=30, env="MCP_GATEWAY_TIMEOUT")
+    MCP_GATEWAY_STREAM_FANOUT: bool = Field(default=False, env="MCP_GATEWAY_STREAM_FANOUT")
+    MCP_GATEWAY_BATCH_FANOUT: bool = Field(default=True, env="MCP_GATEWAY_BATCH_FANOUT")
+    
+    # Background Health Probing
+    HEALTH_PROBE_INTERVAL: float = Field(default=15.0, env="HEALTH_PROBE_INTERVAL")
+    HEALTH_PROBE_TIMEOUT: float = Field(default=5.0, env="HEALTH_PROBE_TIMEOUT")
+    HEALTH_PROBE_SKIP_DOWN: bool = Field(default=True, env="HEALTH_PROBE_SKIP_DOWN")
+    
+    # MCP Resilience (circuit breakers and retries)
+    CIRCUIT_FAILURE_RATE: float = Field(default=0.5, env="CIRCUIT_FAILURE_RATE")
+    CIRCUIT_SLOW_CALL_SECONDS: float = Field(default=10.0, env="CIRCUIT_SLOW_CALL_SECONDS")
+    CIRCUIT_SLOW_CALL_RATE: float = Field(default=0.8, env="CIRCUIT_SLOW_CALL_RATE")
+    CIRCUIT_WINDOW_SIZE: int = Field(default=20, env="CIRCUIT_WINDOW_SIZE")
+    CIRCUIT_MIN_CALLS: int = Field(default=5, env="CIRCUIT_MIN_CALLS")
+    CIRCUIT_OPEN_SECONDS: float = Field(default=30.0, env="CIRCUIT_OPEN_SECONDS")
+    CIRCUIT_HALF_OPEN_CALLS: int = Field(default=1, env="CIRCUIT_HALF_OPEN_CALLS")
+    MCP_RETRY_MAX_ATTEMPTS: int = Field(default=2, env="MCP_RETRY_MAX_ATTEMPTS")
+    MCP_RETRY_BACKOFF_BASE: float = Field(default=0.2, env="MCP_RETRY_BACKOFF_BASE")
+    MCP_RETRY_BACKOFF_MAX: float = Field(default=2.0, env="MCP_RETRY_BACKOFF_MAX")
+    MCP_RETRY_BUDGET_RATIO: float = Field(default=0.2, env="MCP_RETRY_BUDGET_RATIO")
+    MCP_RETRY_BUDGET_MIN_PER_SECOND: float = Field(default=1.0, env="MCP_RETRY_BUDGET_MIN_PER_SECOND")
+    
+    # Cerebras Concurrency (AIMD limiter) and 429/503 retries
+    CEREBRAS_LIMIT_INITIAL: int = Field(default=8, env="CEREBRAS_LIMIT_INITIAL")
+    CEREBRAS_LIMIT_MIN: int = Field(default=1, env="CEREBRAS_LIMIT_MIN")
+    CEREBRAS_LIMIT_MAX: int = Field(default=64, env="CEREBRAS_LIMIT_MAX")
+    CEREBRAS_LIMIT_BACKOFF: float = Field(default=0.5, env="CEREBRAS_LIMIT_BACKOFF")
+    CEREBRAS_LIMIT_SLOW_SECONDS: float = Field(default=15.0, env="CEREBRAS_LIMIT_SLOW_SECONDS")
+    CEREBRAS_REQUEST_DEADLINE: float = Field(default=60.0, env="CEREBRAS_REQUEST_DEADLINE")
+    CEREBRAS_RETRY_MAX_ATTEMPTS: int = Field(default=4, env="CEREBRAS_RETRY_MAX_ATTEMPTS")
+    CEREBRAS_RETRY_BACKOFF_BASE: float = Field(default=0.5, env="CEREBRAS_RETRY_BACKOFF_BASE")
+    CEREBRAS_RETRY_BACKOFF_MAX: float = Field(default=8.0, env="CEREBRAS_RETRY_BACKOFF_MAX")
+    
+    # MCP Adaptive Timeouts (observed p99 x safety factor, clamped)
+    ADAPTIVE_TIMEOUT_ENABLED: bool = Field(default=True, env="ADAPTIVE_TIMEOUT_ENABLED")
+    ADAPTIVE_TIMEOUT_FACTOR: float = Field(default=2.0, env="ADAPTIVE_TIMEOUT_FACTOR")
+    ADAPTIVE_TIMEOUT_MIN: float = Field(default=2.0, env="ADAPTIVE_TIMEOUT_MIN")
+    ADAPTIVE_TIMEOUT_MAX: float = Field(default=30.0, env="ADAPTIVE_TIMEOUT_MAX")
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = Field(default=20, env="ADAPTIVE_TIMEOUT_MIN_SAMPLES")
+    LATENCY_WINDOW_SIZE: int = Field(default=256, env="LATENCY_WINDOW_SIZE")
     
     # External APIs
     NEWS_API_KEY: str = Field(default="", env="NEWS_API_KEY")
@@ -63,6 +138,14 @@ class Settings(BaseSettings):
     REQUEST_TIMEOUT: int = Field(default=30, env="REQUEST_TIMEOUT")
     STREAM_CHUNK_SIZE: int = Field(default=1024, env="STREAM_CHUNK_SIZE")
     
+    # HTTP Client Pools
+    HTTP_POOL_LIMIT: int = Field(default=100, env="HTTP_POOL_LIMIT")
+    HTTP_POOL_LIMIT_PER_HOST: int = Field(default=20, env="HTTP_POOL_LIMIT_PER_HOST")
+    HTTP_DNS_CACHE_TTL: int = Field(default=300, env="HTTP_DNS_CACHE_TTL")
+    HTTP_KEEPALIVE_TIMEOUT: float = Field(default=30.0, env="HTTP_KEEPALIVE_TIMEOUT")
+    HTTP_WARMUP_ON_STARTUP: bool = Field(default=True, env="HTTP_WARMUP_ON_STARTUP")
+    HTTP_WARMUP_TIMEOUT: float = Field(default=3.0, env="HTTP_WARMUP_TIMEOUT")
+    
     @validator("ALLOWED_ORIGINS", pre=True)
     def parse_cors_origins(cls, v):
         if isinstance(v, str):
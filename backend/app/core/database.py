@@ -1,6 +1,8 @@
 """
 Database configuration and session management
 """
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from typing import AsyncGenerator
@@ -28,6 +30,22 @@ AsyncSessionLocal = async_sessionmaker(
 # Base class for models
 Base = declarative_base()
 
+# Columns added after the first release. create_all() only creates missing
+# tables and db/init.sql only runs on an empty volume, so existing databases
+# are brought up to date at startup; every statement must be idempotent
+SCHEMA_UPGRADES = [
+    "ALTER TABLE research ADD COLUMN IF NOT EXISTS synthesis_revision INTEGER",
+    "ALTER TABLE research ADD COLUMN IF NOT EXISTS synthesis_revisions JSONB DEFAULT '[]'::jsonb",
+]
+
+
+def upgrade_schema(connection: Connection) -> None:
+    """
+    Apply SCHEMA_UPGRADES (run via AsyncConnection.run_sync after create_all)
+    """
+    for statement in SCHEMA_UPGRADES:
+        connection.execute(text(statement))
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -0,0 +1,101 @@
+"""
+HTTP client registry
+Long-lived pooled aiohttp sessions shared by all services
+"""
+import asyncio
+from typing import Dict
+import aiohttp
+from loguru import logger
+from yarl import URL
+
+from app.core.config import settings
+
+# Client pool names
+MCP_CLIENT = "mcp"
+CEREBRAS_CLIENT = "cerebras"
+OLLAMA_CLIENT = "ollama"
+
+
+class HTTPClientRegistry:
+    """App-scoped registry of pooled HTTP sessions, one per upstream"""
+
+    CLIENTS = (MCP_CLIENT, CEREBRAS_CLIENT, OLLAMA_CLIENT)
+
+    def __init__(self):
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+
+    def _create_session(self, name: str) -> aiohttp.ClientSession:
+        """Create a keep-alive session with DNS caching and per-host limits"""
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_LIMIT,
+            limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True,
+        )
+        logger.debug(f"Created HTTP client pool: {name}")
+        return aiohttp.ClientSession(connector=connector)
+
+    def get(self, name: str) -> aiohttp.ClientSession:
+        """
+        Get the pooled session for an upstream
+        Sessions are created lazily so services also work outside the app lifespan
+        """
+        session = self._sessions.get(name)
+        if session is None or session.closed:
+            session = self._create_session(name)
+            self._sessions[name] = session
+        return session
+
+    async def startup(self) -> None:
+        """Open all client pools"""
+        for name in self.CLIENTS:
+            self.get(name)
+        logger.info(f"✅ HTTP client pools ready: {list(self._sessions.keys())}")
+
+    async def warm_up(self, targets: Dict[str, str]) -> None:
+        """
+        Pre-establish connections (DNS, TCP, TLS) to upstreams
+
+        Args:
+            targets: Mapping of client pool name to a URL on that upstream
+        """
+        async def _warm(name: str, url: str) -> None:
+            try:
+                async with self.get(name).get(
+                    url,
+                    timeout=aiohttp.ClientTimeout(total=settings.HTTP_WARMUP_TIMEOUT)
+                ) as response:
+                    # Drain the body so the connection goes back to the pool
+                    await response.read()
+                    logger.info(f"✓ Warmed {name} connection: {url} ({response.status})")
+            except Exception as e:
+                logger.warning(f"✗ Could not warm {name} connection to {url}: {e}")
+
+        await asyncio.gather(*(_warm(name, url) for name, url in targets.items()))
+
+    async def shutdown(self) -> None:
+        """Close all client pools"""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(
+            *(session.close() for session in sessions if not session.closed),
+            return_exceptions=True
+        )
+        logger.info("✅ HTTP client pools closed")
+
+
+def origin_of(url: str) -> str:
+    """Get the scheme://host[:port] origin of a URL"""
+    return str(URL(url).origin())
+
+
+# Global registry instance
+http_clients = HTTPClientRegistry()
+
+
+def get_http_clients() -> HTTPClientRegistry:
+    """
+    Dependency to get the HTTP client registry
+    """
+    return http_clients
@@ -35,12 +35,92 @@ mcp_sources_active = Gauge(
     'Number of active MCP sources'
 )
 
+mcp_circuit_state = Gauge(
+    'mcp_circuit_state',
+    'MCP source circuit breaker state (0=closed, 1=half_open, 2=open)',
+    ['source']
+)
+
+mcp_source_retries_total = Counter(
+    'mcp_source_retries_total',
+    'Total MCP source query retries',
+    ['source', 'outcome']
+)
+
+source_cache_requests_total = Counter(
+    'source_cache_requests_total',
+    'Source result cache lookups',
+    ['tier', 'result']
+)
+
+source_cache_evictions_total = Counter(
+    'source_cache_evictions_total',
+    'Source result cache evictions',
+    ['tier', 'reason']
+)
+
+source_cache_bytes = Gauge(
+    'source_cache_bytes',
+    'Bytes held by the in-process source result cache'
+)
+
+synthesis_cache_requests_total = Counter(
+    'synthesis_cache_requests_total',
+    'Synthesis cache lookups',
+    ['result']
+)
+
+synthesis_cache_tokens_saved_total = Counter(
+    'synthesis_cache_tokens_saved_total',
+    'Cerebras tokens (prompt + completion) not spent thanks to synthesis cache hits'
+)
+
+synthesis_cache_entries = Gauge(
+    'synthesis_cache_entries',
+    'Entries held by the synthesis cache'
+)
+
+synthesis_context_tokens = Histogram(
+    'synthesis_context_tokens',
+    'Approximate tokens of source context packed into a synthesis prompt',
+    buckets=(250, 500, 1000, 2000, 4000, 6000, 8000, 12000, 16000)
+)
+
+synthesis_context_items_total = Counter(
+    'synthesis_context_items_total',
+    'Source result items considered for the synthesis prompt',
+    ['outcome']
+)
+
 cerebras_api_calls_total = Counter(
     'cerebras_api_calls_total',
     'Total Cerebras API calls',
     ['model', 'status']
 )
 
+cerebras_wait_seconds = Histogram(
+    'cerebras_wait_seconds',
+    'Time Cerebras calls spent waiting (queue = for a concurrency slot, retry_after = rate limit back-off)',
+    ['reason'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+cerebras_concurrency_limit = Gauge(
+    'cerebras_concurrency_limit',
+    'Current adaptive concurrency limit for Cerebras calls'
+)
+
+cerebras_in_flight = Gauge(
+    'cerebras_in_flight',
+    'Cerebras calls currently holding a concurrency slot'
+)
+
+cerebras_rate_limited_total = Counter(
+    'cerebras_rate_limited_total',
+    'Cerebras 429/503 responses',
+    ['outcome']
+)
+
 ollama_api_calls_total = Counter(
     'ollama_api_calls_total',
     'Total Ollama API calls',
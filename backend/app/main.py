@@ -11,9 +11,16 @@ from loguru import logger
 import sys
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, upgrade_schema
+from app.core.http import http_clients, origin_of, MCP_CLIENT, CEREBRAS_CLIENT
 from app.api.v1 import api_router
 from app.core.monitoring import setup_monitoring
+from app.services.cerebras_service import CerebrasService
+from app.services.health_prober import HealthProber
+from app.services.mcp_orchestrator import MCPOrchestrator
+from app.services.ollama_service import OllamaService
+from app.services.source_cache import SourceResultCache
+from app.services.synthesis_cache import SynthesisCache
 
 # Configure logging
 logger.remove()
@@ -33,17 +40,45 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.APP_ENV}")
     logger.info(f"Debug Mode: {settings.DEBUG}")
     
-    # Create database tables
+    # Create database tables and add columns missing from existing ones
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
     
     logger.info("✅ Database initialized")
+    
+    # Open pooled HTTP clients and build app-scoped services
+    await http_clients.startup()
+    source_cache = SourceResultCache.from_settings() if settings.SOURCE_CACHE_ENABLED else None
+    app.state.mcp_orchestrator = MCPOrchestrator(http=http_clients, cache=source_cache)
+    synthesis_cache = SynthesisCache.from_settings() if settings.SYNTHESIS_CACHE_ENABLED else None
+    app.state.cerebras_service = CerebrasService(http=http_clients, synthesis_cache=synthesis_cache)
+    app.state.ollama_service = OllamaService(http=http_clients)
+    
+    # Warm connections to the hot upstreams
+    if settings.HTTP_WARMUP_ON_STARTUP:
+        warm_targets = {CEREBRAS_CLIENT: origin_of(settings.CEREBRAS_API_URL)}
+        if settings.MCP_GATEWAY_URL:
+            warm_targets[MCP_CLIENT] = f"{settings.MCP_GATEWAY_URL}/health"
+        await http_clients.warm_up(warm_targets)
+    
+    # Start background health probing
+    health_prober = HealthProber(app.state.mcp_orchestrator, http_clients)
+    app.state.health_prober = health_prober
+    if settings.HEALTH_PROBE_SKIP_DOWN:
+        app.state.mcp_orchestrator.health_prober = health_prober
+    await health_prober.start()
+    
     logger.info("✅ ResearchPilot API started successfully")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down ResearchPilot API...")
+    await health_prober.stop()
+    await http_clients.shutdown()
+    if source_cache:
+        await source_cache.close()
     await engine.dispose()
     logger.info("✅ Cleanup complete")
 
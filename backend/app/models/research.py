@@ -1,7 +1,7 @@
 """
 Research model - Database schema
 """
-from sqlalchemy import Column, String, DateTime, JSON, Float, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, JSON, Float, Integer, Text, ForeignKey
 from sqlalchemy.sql import func
 import uuid
 
@@ -18,6 +18,8 @@ class Research(Base):
     sources = Column(JSON, default=list)
     results = Column(JSON, default=list)
     synthesis = Column(Text, nullable=True)
+    synthesis_revision = Column(Integer, nullable=True)  # Revision currently in `synthesis`
+    synthesis_revisions = Column(JSON, default=list)  # Every finished version: draft, final
     credibility_score = Column(Float, nullable=True)
     error = Column(Text, nullable=True)
     parent_research_id = Column(String, ForeignKey("research.id"), nullable=True)  # For follow-up queries
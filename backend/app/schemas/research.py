@@ -6,6 +6,22 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 
+class LatencyBudget(BaseModel):
+    """Latency budget for the source fan-out before synthesis starts"""
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=60,
+        description="Synthesize after this many seconds with whatever sources have answered"
+    )
+    quorum: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=6,
+        description="Synthesize once this many sources have answered successfully"
+    )
+
+
 class ResearchQuery(BaseModel):
     """Request schema for research query"""
     query: str = Field(..., min_length=10, max_length=1000, description="Research query")
@@ -17,6 +33,18 @@ class ResearchQuery(BaseModel):
     include_credibility: Optional[bool] = Field(default=True, description="Include credibility scoring")
     parent_research_id: Optional[str] = Field(default=None, description="Parent research ID for follow-up queries")
     use_tool_calling: Optional[bool] = Field(default=False, description="Use AI to intelligently select sources")
+    latency_budget: Optional[LatencyBudget] = Field(
+        default=None,
+        description="Cut off slow sources after a deadline or once a quorum has answered"
+    )
+    bypass_synthesis_cache: Optional[bool] = Field(
+        default=False,
+        description="Always call the model for synthesis instead of reusing a cached answer"
+    )
+    progressive_synthesis: Optional[bool] = Field(
+        default=False,
+        description="Stream a quick draft from the first sources to answer, then refine it once all have landed"
+    )
 
 
 class ResearchResponse(BaseModel):
@@ -35,6 +63,15 @@ class SourceResult(BaseModel):
     response_time: Optional[float] = None
 
 
+class SynthesisRevision(BaseModel):
+    """One finished version of a research synthesis"""
+    revision: int
+    kind: str  # draft, final
+    sources: List[str]
+    synthesis: str
+    created_at: datetime
+
+
 class ResearchStatus(BaseModel):
     """Complete research status and results"""
     id: str
@@ -43,6 +80,8 @@ class ResearchStatus(BaseModel):
     sources: List[str]
     results: Optional[List[SourceResult]] = None
     synthesis: Optional[str] = None
+    synthesis_revision: Optional[int] = None
+    synthesis_revisions: Optional[List[SynthesisRevision]] = None
     credibility_score: Optional[float] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
@@ -6,6 +6,24 @@ from typing import Optional
 from datetime import datetime
 
 
+class SourceLatency(BaseModel):
+    """Rolling latency sketch of a single MCP source"""
+    samples: int = Field(..., description="Samples in the rolling window")
+    total_observed: int = Field(..., description="Samples observed since startup")
+    p50: Optional[float] = Field(None, description="Median latency in seconds")
+    p95: Optional[float] = Field(None, description="95th percentile latency in seconds")
+    p99: Optional[float] = Field(None, description="99th percentile latency in seconds")
+    effective_timeout: float = Field(..., description="Timeout currently applied to queries, in seconds")
+
+
+class SourceCircuit(BaseModel):
+    """Circuit breaker state of a single MCP source"""
+    state: str = Field(..., description="Circuit state (closed, open, half_open)")
+    calls: int = Field(..., description="Calls in the rolling window")
+    failure_rate: float = Field(..., description="Failure rate over the rolling window")
+    slow_call_rate: float = Field(..., description="Slow-call rate over the rolling window")
+
+
 class SourceStatus(BaseModel):
     """Status of a single MCP source"""
     name: str = Field(..., description="Source name")
@@ -13,6 +31,8 @@ class SourceStatus(BaseModel):
     response_time: Optional[float] = Field(None, description="Response time in seconds")
     last_check: Optional[datetime] = Field(None, description="Last health check timestamp")
     error: Optional[str] = Field(None, description="Error message if unhealthy")
+    latency: Optional[SourceLatency] = Field(None, description="Observed query latency and adaptive timeout")
+    circuit: Optional[SourceCircuit] = Field(None, description="Circuit breaker state")
 
 
 class SourceHealth(BaseModel):
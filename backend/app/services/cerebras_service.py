@@ -5,19 +5,60 @@ Supports: Streaming, Structured Outputs, Tool Use, Reasoning
 """
 import aiohttp
 import asyncio
-import json
+import random
+import time
+from contextlib import asynccontextmanager
 from typing import AsyncIterator, Dict, List, Any, Optional
 from loguru import logger
 
 from app.core.config import settings
-from app.core.monitoring import cerebras_api_calls_total
+from app.core.http import HTTPClientRegistry, CEREBRAS_CLIENT, http_clients
+from app.core.monitoring import (
+    cerebras_api_calls_total,
+    synthesis_cache_requests_total,
+    synthesis_context_tokens,
+    synthesis_context_items_total,
+    cerebras_wait_seconds,
+    cerebras_concurrency_limit,
+    cerebras_in_flight,
+    cerebras_rate_limited_total,
+)
 from app.schemas.synthesis import SYNTHESIS_JSON_SCHEMA, ResearchSynthesis
+from app.services.context_packer import ContextPacker
+from app.services.resilience import AdaptiveConcurrencyLimiter, backoff_delay, retry_after_seconds
+from app.services.sse_decoder import SSEDecoder, decode_json
+from app.services.synthesis_cache import SynthesisCache, replay
+
+# Process-wide: every CerebrasService instance shares one limit on concurrent API calls
+cerebras_limiter = AdaptiveConcurrencyLimiter(
+    "cerebras",
+    initial_limit=settings.CEREBRAS_LIMIT_INITIAL,
+    min_limit=settings.CEREBRAS_LIMIT_MIN,
+    max_limit=settings.CEREBRAS_LIMIT_MAX,
+    backoff_ratio=settings.CEREBRAS_LIMIT_BACKOFF,
+    slow_call_seconds=settings.CEREBRAS_LIMIT_SLOW_SECONDS,
+)
+
+# Responses that mean "too much load right now": back off and retry
+RETRYABLE_STATUSES = (429, 503)
 
 
 class CerebrasService:
     """Service for Cerebras API interactions with advanced capabilities"""
     
-    def __init__(self):
+    # Sampling temperature for synthesis (part of the synthesis cache key)
+    TEMPERATURE = 0.7
+    
+    def __init__(
+        self,
+        http: Optional[HTTPClientRegistry] = None,
+        synthesis_cache: Optional[SynthesisCache] = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None
+    ):
+        self.http = http or http_clients
+        self.limiter = limiter or cerebras_limiter
+        self.synthesis_cache = synthesis_cache
+        self.context_packer = ContextPacker.from_settings()
         self.api_key = settings.CEREBRAS_API_KEY
         self.api_url = settings.CEREBRAS_API_URL
         self.model = settings.CEREBRAS_MODEL
@@ -147,7 +188,9 @@ class CerebrasService:
         parent_context: Dict[str, Any] | None = None,
         stream: bool = True,
         use_structured_output: bool = False,  # Disabled due to Cerebras schema limitations
-        use_reasoning: bool = True
+        use_reasoning: bool = True,
+        use_cache: bool = True,
+        context_budget: Optional[int] = None
     ) -> AsyncIterator[str] | str:
         """
         Synthesize research results using Cerebras Llama 3.3 70B
@@ -160,13 +203,15 @@ class CerebrasService:
             stream: Whether to stream the response
             use_structured_output: Use JSON schema for structured responses
             use_reasoning: Enable reasoning capabilities
+            use_cache: Reuse (and store) a cached synthesis for an identical prompt
+            context_budget: Token budget for the source context (CONTEXT_TOKEN_BUDGET by default)
         
         Returns:
             Streaming or complete synthesis
         """
         try:
             # Build context summary
-            context_text = self._build_context(context)
+            context_text = self._build_context(context, context_budget)
             
             # Build prompt (with parent context if available)
             prompt = self._build_synthesis_prompt(query, context_text, parent_context)
@@ -176,22 +221,55 @@ class CerebrasService:
             
             logger.info(f"Synthesis: query_length={len(query)}, reasoning={reasoning_effort}, structured={use_structured_output}")
             
+            # Identical prompt + sampling settings: serve the stored synthesis
+            # (a bypassed call skips the lookup but still refreshes the entry)
+            cache = self.synthesis_cache
+            cache_key = None
+            if cache is not None:
+                cache_key = cache.make_key(
+                    self.model, prompt, self.TEMPERATURE, reasoning_effort, use_structured_output
+                )
+                cached = cache.get(cache_key) if use_cache else None
+                if not use_cache:
+                    synthesis_cache_requests_total.labels(result="bypass").inc()
+                elif cached is not None:
+                    logger.info(f"Synthesis cache hit ({len(cached)} chars)")
+                    if stream:
+                        async for chunk in replay(
+                            cached,
+                            settings.SYNTHESIS_CACHE_REPLAY_CHUNK_CHARS,
+                            settings.SYNTHESIS_CACHE_REPLAY_DELAY
+                        ):
+                            yield chunk
+                    else:
+                        yield cached
+                    return
+            
             # Make API call
+            usage: Dict[str, Any] = {}
             if stream:
+                chunks = []
                 async for chunk in self._stream_completion(
                     prompt, 
                     reasoning_effort=reasoning_effort,
-                    use_structured_output=use_structured_output
+                    use_structured_output=use_structured_output,
+                    usage=usage
                 ):
+                    chunks.append(chunk)
                     yield chunk
+                result = ''.join(chunks)
             else:
                 result = await self._complete(
                     prompt,
                     reasoning_effort=reasoning_effort,
-                    use_structured_output=use_structured_output
+                    use_structured_output=use_structured_output,
+                    usage=usage
                 )
                 yield result
-                return
+            
+            # Only complete syntheses are stored (a consumer that stops early never gets here)
+            if cache_key is not None:
+                cache.set(cache_key, result, usage.get('total_tokens'))
                 
         except Exception as e:
             logger.error(f"Cerebras synthesis error: {e}")
@@ -242,9 +320,13 @@ class CerebrasService:
         self, 
         prompt: str,
         reasoning_effort: Optional[str] = None,
-        use_structured_output: bool = False
+        use_structured_output: bool = False,
+        usage: Optional[Dict[str, Any]] = None
     ) -> AsyncIterator[str]:
-        """Stream completion from Cerebras API with optional structured output and reasoning"""
+        """
+        Stream completion from Cerebras API with optional structured output and reasoning
+        Token usage from the final chunk is copied into `usage` when given
+        """
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -263,7 +345,7 @@ class CerebrasService:
                 }
             ],
             "stream": True,
-            "temperature": 0.7,
+            "temperature": self.TEMPERATURE,
             "max_tokens": 3000,
         }
         
@@ -279,57 +361,63 @@ class CerebrasService:
             logger.info("Using structured JSON output schema")
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.api_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=settings.REQUEST_TIMEOUT)
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Cerebras API error: {response.status} - {error_text}")
-                        cerebras_api_calls_total.labels(model=self.model, status="error").inc()
-                        raise Exception(f"Cerebras API error: {response.status}")
-                    
-                    cerebras_api_calls_total.labels(model=self.model, status="success").inc()
+            async with self._post(self.api_url, headers, payload, settings.REQUEST_TIMEOUT) as response:
+                # Stream response chunks: decode whole network reads at once and
+                # yield the content deltas they carry as one batch
+                decoder = SSEDecoder()
+                async for raw in response.content.iter_any():
+                    content = self._stream_deltas(decoder.feed(raw), usage)
+                    if content:
+                        yield content
+                
+                content = self._stream_deltas(decoder.close(), usage)
+                if content:
+                    yield content
                     
-                    # Stream response chunks
-                    async for line in response.content:
-                        if line:
-                            line_text = line.decode('utf-8').strip()
-                            if line_text.startswith('data: '):
-                                data = line_text[6:]
-                                if data != '[DONE]':
-                                    try:
-                                        chunk = json.loads(data)
-                                        if 'choices' in chunk and len(chunk['choices']) > 0:
-                                            delta = chunk['choices'][0].get('delta', {})
-                                            
-                                            # Handle reasoning content if present
-                                            if 'reasoning' in delta:
-                                                # Log reasoning tokens but don't stream them
-                                                logger.debug(f"Reasoning: {delta['reasoning'][:100]}")
-                                            
-                                            # Stream main content
-                                            content = delta.get('content', '')
-                                            if content:
-                                                yield content
-                                    except json.JSONDecodeError:
-                                        continue
-                                        
         except asyncio.TimeoutError:
             logger.error("Cerebras API timeout")
             cerebras_api_calls_total.labels(model=self.model, status="timeout").inc()
             raise Exception("Cerebras API timeout")
     
+    @staticmethod
+    def _stream_deltas(events: List[bytes], usage: Optional[Dict[str, Any]]) -> str:
+        """Content of a batch of streamed completion events (usage is copied into `usage`)"""
+        parts = []
+        for data in events:
+            if data == b'[DONE]':
+                continue
+            try:
+                chunk = decode_json(data)
+            except ValueError:
+                logger.warning(f"Skipping malformed stream event: {data[:100]!r}")
+                continue
+            
+            if usage is not None and chunk.get('usage'):
+                usage.update(chunk['usage'])
+            if chunk.get('choices'):
+                delta = chunk['choices'][0].get('delta') or {}
+                
+                # Log reasoning tokens but don't stream them
+                if 'reasoning' in delta:
+                    logger.debug(f"Reasoning: {str(delta['reasoning'])[:100]}")
+                
+                content = delta.get('content')
+                if content:
+                    parts.append(content)
+        
+        return ''.join(parts)
+    
     async def _complete(
         self, 
         prompt: str,
         reasoning_effort: Optional[str] = None,
-        use_structured_output: bool = False
+        use_structured_output: bool = False,
+        usage: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Get complete response from Cerebras API with optional structured output and reasoning"""
+        """
+        Get complete response from Cerebras API with optional structured output and reasoning
+        Token usage is copied into `usage` when given
+        """
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -348,7 +436,7 @@ class CerebrasService:
                 }
             ],
             "stream": False,
-            "temperature": 0.7,
+            "temperature": self.TEMPERATURE,
             "max_tokens": 3000,
         }
         
@@ -361,91 +449,133 @@ class CerebrasService:
             payload["response_format"] = SYNTHESIS_JSON_SCHEMA
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._post(self.api_url, headers, payload, settings.REQUEST_TIMEOUT) as response:
+                result = await response.json()
+                if usage is not None and result.get('usage'):
+                    usage.update(result['usage'])
+                
+                # Handle structured response
+                content = result['choices'][0]['message']['content']
+                
+                # Log reasoning if present
+                if 'reasoning' in result['choices'][0]['message']:
+                    reasoning = result['choices'][0]['message']['reasoning']
+                    logger.info(f"Reasoning tokens: {len(reasoning)} chars")
+                
+                return content
+                
+        except asyncio.TimeoutError:
+            logger.error("Cerebras API timeout")
+            cerebras_api_calls_total.labels(model=self.model, status="timeout").inc()
+            raise Exception("Cerebras API timeout")
+    
+    @asynccontextmanager
+    async def _post(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        timeout: float
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        POST to the Cerebras API under the process-wide concurrency limiter
+        
+        Waits for a slot, retries 429/503 responses after their Retry-After
+        (or jittered backoff) while the per-request deadline allows, and
+        yields the 200 response. The slot is held until the caller is done
+        with the body, so a stream counts as in flight until it ends.
+        """
+        deadline = time.monotonic() + settings.CEREBRAS_REQUEST_DEADLINE
+        session = self.http.get(CEREBRAS_CLIENT)
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            try:
+                waited = await self.limiter.acquire(deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                cerebras_api_calls_total.labels(model=self.model, status="queue_timeout").inc()
+                raise Exception("Cerebras API busy: no capacity before the request deadline")
+            cerebras_wait_seconds.labels(reason="queue").observe(waited)
+            self._update_limiter_metrics()
+            
+            started = time.monotonic()
+            elapsed = 0.0
+            outcome = AdaptiveConcurrencyLimiter.IGNORE
+            retry_delay = None
+            try:
                 async with session.post(
-                    self.api_url,
+                    url,
                     headers=headers,
                     json=payload,
-                    timeout=aiohttp.ClientTimeout(total=settings.REQUEST_TIMEOUT)
+                    timeout=aiohttp.ClientTimeout(total=max(0.1, min(timeout, deadline - started)))
                 ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Cerebras API error: {response.status} - {error_text}")
-                        cerebras_api_calls_total.labels(model=self.model, status="error").inc()
-                        raise Exception(f"Cerebras API error: {response.status}")
-                    
-                    result = await response.json()
-                    cerebras_api_calls_total.labels(model=self.model, status="success").inc()
+                    elapsed = time.monotonic() - started
                     
-                    # Handle structured response
-                    content = result['choices'][0]['message']['content']
+                    if response.status in RETRYABLE_STATUSES:
+                        outcome = AdaptiveConcurrencyLimiter.DROPPED
+                        retry_delay = self._retry_delay(response, attempt)
+                        if (attempt >= settings.CEREBRAS_RETRY_MAX_ATTEMPTS
+                                or time.monotonic() + retry_delay >= deadline):
+                            retry_delay = None
+                            cerebras_rate_limited_total.labels(outcome="exhausted").inc()
                     
-                    # Log reasoning if present
-                    if 'reasoning' in result['choices'][0]['message']:
-                        reasoning = result['choices'][0]['message']['reasoning']
-                        logger.info(f"Reasoning tokens: {len(reasoning)} chars")
-                    
-                    return content
-                    
-        except asyncio.TimeoutError:
-            logger.error("Cerebras API timeout")
-            cerebras_api_calls_total.labels(model=self.model, status="timeout").inc()
-            raise Exception("Cerebras API timeout")
+                    if retry_delay is None:
+                        if response.status != 200:
+                            error_text = await response.text()
+                            logger.error(f"Cerebras API error: {response.status} - {error_text}")
+                            cerebras_api_calls_total.labels(model=self.model, status="error").inc()
+                            if response.status >= 500:
+                                outcome = AdaptiveConcurrencyLimiter.DROPPED
+                            raise Exception(f"Cerebras API error: {response.status}")
+                        
+                        cerebras_api_calls_total.labels(model=self.model, status="success").inc()
+                        outcome = AdaptiveConcurrencyLimiter.SUCCESS
+                        yield response
+                        return
+            except asyncio.TimeoutError:
+                outcome = AdaptiveConcurrencyLimiter.DROPPED
+                elapsed = time.monotonic() - started
+                raise
+            finally:
+                # Release before any back-off so the slot is not held while sleeping
+                self.limiter.release(outcome, started, elapsed)
+                self._update_limiter_metrics()
+            
+            cerebras_rate_limited_total.labels(outcome="retried").inc()
+            cerebras_wait_seconds.labels(reason="retry_after").observe(retry_delay)
+            logger.warning(f"↻ Cerebras rate limited: retrying in {retry_delay:.2f}s (attempt {attempt + 1})")
+            await asyncio.sleep(retry_delay)
     
-    def _build_context(self, context: List[Dict[str, Any]]) -> str:
-        """Build context summary from multiple sources"""
-        context_parts = []
+    @staticmethod
+    def _retry_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
+        """Retry-After plus up to 10% jitter, or exponential backoff when the header is missing"""
+        retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+        if retry_after is None:
+            return backoff_delay(attempt, settings.CEREBRAS_RETRY_BACKOFF_BASE, settings.CEREBRAS_RETRY_BACKOFF_MAX)
+        return retry_after + random.uniform(0, 0.1 * retry_after + 0.05)
+    
+    def _update_limiter_metrics(self) -> None:
+        cerebras_concurrency_limit.set(self.limiter.limit)
+        cerebras_in_flight.set(self.limiter.in_flight)
+    
+    def _build_context(self, context: List[Dict[str, Any]], budget: Optional[int] = None) -> str:
+        """Build context summary from multiple sources, packed into the context token budget"""
+        packed = self.context_packer.pack(context, budget)
         
-        for idx, source_result in enumerate(context, 1):
-            source_name = source_result.get('source', 'Unknown')
-            status = source_result.get('status', 'unknown')
-            
-            if status == 'success' and source_result.get('data'):
-                data = source_result['data']
-                context_parts.append(f"\n## {source_name.replace('-', ' ').title()}\n")
-                
-                # Format data based on source type
-                if isinstance(data, dict):
-                    # Handle structured data (like search results)
-                    if 'results' in data:
-                        results = data['results']
-                        if isinstance(results, list):
-                            for i, item in enumerate(results[:10], 1):  # Top 10 results
-                                if isinstance(item, dict):
-                                    title = item.get('title', item.get('name', f'Result {i}'))
-                                    snippet = item.get('snippet', item.get('description', item.get('body', '')))
-                                    url = item.get('url', item.get('link', ''))
-                                    
-                                    context_parts.append(f"\n**{i}. {title}**\n")
-                                    if snippet:
-                                        context_parts.append(f"{snippet[:200]}...\n")
-                                    if url:
-                                        context_parts.append(f"Source: {url}\n")
-                                else:
-                                    context_parts.append(f"{i}. {str(item)[:200]}\n")
-                    else:
-                        # Generic dict formatting
-                        for key, value in data.items():
-                            if key not in ['count', 'source']:  # Skip metadata
-                                context_parts.append(f"**{key.replace('_', ' ').title()}**: {str(value)[:300]}\n")
-                
-                elif isinstance(data, list):
-                    for i, item in enumerate(data[:10], 1):
-                        if isinstance(item, dict):
-                            # Format dict items nicely
-                            title = item.get('title', item.get('name', f'Item {i}'))
-                            context_parts.append(f"\n{i}. **{title}**\n")
-                            for k, v in item.items():
-                                if k not in ['title', 'name'] and v:
-                                    context_parts.append(f"   - {k.replace('_', ' ').title()}: {str(v)[:150]}\n")
-                        else:
-                            context_parts.append(f"{i}. {str(item)[:200]}\n")
-                else:
-                    context_parts.append(f"{str(data)[:500]}\n")
-                
-                context_parts.append("\n")
+        synthesis_context_tokens.observe(packed.tokens)
+        synthesis_context_items_total.labels(outcome="included").inc(packed.included - packed.truncated)
+        synthesis_context_items_total.labels(outcome="truncated").inc(packed.truncated)
+        synthesis_context_items_total.labels(outcome="dropped").inc(len(packed.dropped))
+        
+        logger.info(f"Context packed: {packed.summary()}")
+        if packed.dropped:
+            logger.debug(
+                "Context dropped: "
+                + ", ".join(f"{item['source']}#{item['rank'] + 1} {item['title'][:60]}" for item in packed.dropped)
+            )
         
-        return ''.join(context_parts) if context_parts else "No data available from sources."
+        return packed.text
     
     def _build_synthesis_prompt(self, query: str, context: str, parent_context: Dict[str, Any] | None = None) -> str:
         """Build synthesis prompt with optional conversation history"""
@@ -546,40 +676,28 @@ Remember: Answer exactly what the user asked for in a direct, helpful way."""
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                logger.info(f"Cerebras tool calling request: {len(messages)} messages, {len(tools)} tools available")
+            logger.info(f"Cerebras tool calling request: {len(messages)} messages, {len(tools)} tools available")
+            
+            async with self._post(f"{self.api_url}/chat/completions", headers, payload, 30) as response:
+                data = await response.json()
                 
-                async with session.post(
-                    f"{self.api_url}/chat/completions",
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Cerebras API error: {response.status} - {error_text}")
-                        raise Exception(f"Cerebras API error: {response.status}")
+                # Extract response
+                if "choices" in data and len(data["choices"]) > 0:
+                    choice = data["choices"][0]
+                    message = choice.get("message", {})
                     
-                    data = await response.json()
-                    cerebras_api_calls_total.inc()
+                    result = {
+                        "content": message.get("content", ""),
+                        "tool_calls": message.get("tool_calls", []),
+                        "finish_reason": choice.get("finish_reason", "stop")
+                    }
+                    
+                    logger.info(f"Cerebras response: finish_reason={result['finish_reason']}, tool_calls={len(result['tool_calls'])}")
+                    return result
+                else:
+                    logger.error(f"Unexpected Cerebras response format: {data}")
+                    raise Exception("Unexpected response format from Cerebras API")
                     
-                    # Extract response
-                    if "choices" in data and len(data["choices"]) > 0:
-                        choice = data["choices"][0]
-                        message = choice.get("message", {})
-                        
-                        result = {
-                            "content": message.get("content", ""),
-                            "tool_calls": message.get("tool_calls", []),
-                            "finish_reason": choice.get("finish_reason", "stop")
-                        }
-                        
-                        logger.info(f"Cerebras response: finish_reason={result['finish_reason']}, tool_calls={len(result['tool_calls'])}")
-                        return result
-                    else:
-                        logger.error(f"Unexpected Cerebras response format: {data}")
-                        raise Exception("Unexpected response format from Cerebras API")
-                        
         except asyncio.TimeoutError:
             logger.error("Cerebras API request timed out")
             raise Exception("Cerebras API request timed out")
@@ -0,0 +1,267 @@
+"""
+Context Packer
+Fits source results into a token budget for the synthesis prompt
+"""
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.core.config import settings
+
+# Word pieces, digit runs and single punctuation marks, roughly how a BPE
+# tokenizer (Llama 3 / gpt-oss) splits English text
+_TOKEN_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Fields that carry an item's descriptive text, in order of preference
+TEXT_FIELDS = ("snippet", "description", "summary", "abstract", "body", "content")
+TITLE_FIELDS = ("title", "name")
+URL_FIELDS = ("url", "link")
+METADATA_KEYS = ("count", "source")
+
+TRUNCATION_MARK = "..."
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate token count without a model tokenizer
+
+    Short words are one token and long ones are split every ~6 letters,
+    numbers every 3 digits, and each punctuation mark is its own token.
+    Within ~10-15% of the real count on English prose and URLs.
+    """
+    tokens = 0
+    for match in _TOKEN_PIECES.finditer(text):
+        piece = match.group()
+        if piece[0].isdigit():
+            tokens += (len(piece) + 2) // 3
+        elif piece[0].isalpha():
+            tokens += (len(piece) + 5) // 6
+        else:
+            tokens += 1
+    return tokens
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_END.split(" ".join(text.split())) if s]
+
+
+class ContextItem:
+    """
+    One result from a source, split into what is always kept (heading and
+    link) and the text fields that may be cut back to whole sentences
+    """
+
+    def __init__(
+        self,
+        source: str,
+        rank: int,
+        title: str,
+        heading: str = "",
+        fields: Optional[List[Tuple[str, str]]] = None,
+        url: str = ""
+    ):
+        self.source = source
+        self.rank = rank
+        self.title = title
+        self.heading = heading
+        self.fields = fields or []
+        self.url = f"Source: {url}\n" if url else ""
+
+    def fit(self, limit: int) -> Tuple[Optional[str], int, bool]:
+        """
+        Render the item within `limit` tokens
+        Returns (text, tokens, truncated); text is None when nothing fits
+        """
+        used = count_tokens(self.heading) + count_tokens(self.url)
+        if used > limit:
+            return None, 0, True
+
+        parts = [self.heading]
+        truncated = False
+        for prefix, value in self.fields:
+            sentences = split_sentences(value)
+            taken: List[str] = []
+            cost = count_tokens(prefix) + 1  # + line break
+            for index, sentence in enumerate(sentences):
+                sentence_tokens = count_tokens(sentence)
+                # Leave room for the truncation mark if more sentences follow
+                mark = 1 if index < len(sentences) - 1 else 0
+                if used + cost + sentence_tokens + mark > limit:
+                    break
+                taken.append(sentence)
+                cost += sentence_tokens
+
+            if len(taken) < len(sentences):
+                truncated = True
+                if not taken:
+                    # A single over-long sentence: fall back to a word boundary cut
+                    words = self._fit_words(sentences[0], limit - used - cost - 1)
+                    if not words:
+                        continue
+                    taken = [words]
+                    cost += count_tokens(words)
+                taken[-1] += TRUNCATION_MARK
+                cost += 1
+
+            parts.append(f"{prefix}{' '.join(taken)}\n")
+            used += cost
+
+        if len(parts) == 1 and not self.heading and not self.url:
+            return None, 0, True
+        parts.append(self.url)
+        return "".join(parts), used, truncated
+
+    @staticmethod
+    def _fit_words(sentence: str, limit: int) -> str:
+        words: List[str] = []
+        used = 0
+        for word in sentence.split(" "):
+            used += count_tokens(word)
+            if used > limit:
+                break
+            words.append(word)
+        return " ".join(words)
+
+
+class PackedContext:
+    """Packed context text plus a record of what did not make it in"""
+
+    def __init__(self, text: str, tokens: int, budget: int):
+        self.text = text
+        self.tokens = tokens
+        self.budget = budget
+        self.included = 0
+        self.truncated = 0
+        self.dropped: List[Dict[str, Any]] = []
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "included": self.included,
+            "truncated": self.truncated,
+            "dropped": len(self.dropped),
+        }
+
+
+class ContextPacker:
+    """
+    Greedy token-budget packer for source results
+
+    Items are taken in priority order: every source's first result, then
+    every source's second result, and so on, so one verbose source cannot
+    crowd out the others. Each item is capped at `item_max_tokens` and its
+    text is cut back to whole sentences; items that do not fit at all are
+    dropped and recorded. The output keeps the per-source layout of the
+    prompt (results grouped under their source heading, in rank order).
+    """
+
+    def __init__(self, budget: int, item_max_tokens: int, max_items_per_source: int):
+        self.budget = budget
+        self.item_max_tokens = item_max_tokens
+        self.max_items_per_source = max_items_per_source
+
+    @classmethod
+    def from_settings(cls) -> "ContextPacker":
+        return cls(
+            budget=settings.CONTEXT_TOKEN_BUDGET,
+            item_max_tokens=settings.CONTEXT_ITEM_MAX_TOKENS,
+            max_items_per_source=settings.CONTEXT_MAX_ITEMS_PER_SOURCE,
+        )
+
+    def pack(self, context: List[Dict[str, Any]], budget: Optional[int] = None) -> PackedContext:
+        """Pack `context` into `budget` tokens (the configured budget by default)"""
+        budget = budget or self.budget
+        sections: List[Tuple[str, List[ContextItem]]] = []
+        for source_result in context:
+            if source_result.get('status') != 'success' or not source_result.get('data'):
+                continue
+            source_name = source_result.get('source', 'Unknown')
+            items = self._items(source_name, source_result['data'])
+            if items:
+                sections.append((f"\n## {source_name.replace('-', ' ').title()}\n", items))
+
+        candidates = sorted(
+            ((item.rank, index, item) for index, (_, items) in enumerate(sections) for item in items),
+            key=lambda entry: entry[:2]
+        )
+
+        used = 0
+        rendered: Dict[int, List[Tuple[int, str]]] = {}
+        packed = PackedContext("", 0, budget)
+        for rank, index, item in candidates:
+            heading_cost = 0 if index in rendered else count_tokens(sections[index][0]) + 1
+            remaining = budget - used - heading_cost
+            text, tokens, truncated = item.fit(min(self.item_max_tokens, remaining))
+            if text is None:
+                packed.dropped.append({"source": item.source, "rank": rank, "title": item.title})
+                continue
+
+            rendered.setdefault(index, []).append((rank, text))
+            used += heading_cost + tokens
+            packed.included += 1
+            packed.truncated += truncated
+
+        parts = []
+        for index, (heading, _) in enumerate(sections):
+            if index in rendered:
+                parts.append(heading)
+                parts.extend(text for _, text in sorted(rendered[index], key=lambda entry: entry[0]))
+                parts.append("\n")
+
+        packed.text = "".join(parts) if parts else "No data available from sources."
+        packed.tokens = used
+        return packed
+
+    def _items(self, source: str, data: Any) -> List[ContextItem]:
+        """Normalize a source payload into ranked items (same shapes the prompt always handled)"""
+        limit = self.max_items_per_source
+
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            items = []
+            for i, item in enumerate(data['results'][:limit], 1):
+                if isinstance(item, dict):
+                    title = self._first(item, TITLE_FIELDS) or f"Result {i}"
+                    text = self._first(item, TEXT_FIELDS)
+                    items.append(ContextItem(
+                        source, i - 1, title,
+                        heading=f"\n**{i}. {title}**\n",
+                        fields=[("", text)] if text else [],
+                        url=self._first(item, URL_FIELDS),
+                    ))
+                else:
+                    items.append(ContextItem(source, i - 1, f"Result {i}", fields=[(f"{i}. ", str(item))]))
+            return items
+
+        if isinstance(data, dict):
+            if 'results' in data:
+                return []
+            return [
+                ContextItem(source, rank, key, fields=[(f"**{key.replace('_', ' ').title()}**: ", str(value))])
+                for rank, (key, value) in enumerate(
+                    (k, v) for k, v in data.items() if k not in METADATA_KEYS
+                )
+            ][:limit]
+
+        if isinstance(data, list):
+            items = []
+            for i, item in enumerate(data[:limit], 1):
+                if isinstance(item, dict):
+                    title = self._first(item, TITLE_FIELDS) or f"Item {i}"
+                    fields = [
+                        (f"   - {k.replace('_', ' ').title()}: ", str(v))
+                        for k, v in item.items() if k not in TITLE_FIELDS and v
+                    ]
+                    items.append(ContextItem(source, i - 1, title, heading=f"\n{i}. **{title}**\n", fields=fields))
+                else:
+                    items.append(ContextItem(source, i - 1, f"Item {i}", fields=[(f"{i}. ", str(item))]))
+            return items
+
+        return [ContextItem(source, 0, source, fields=[("", str(data))])]
+
+    @staticmethod
+    def _first(item: Dict[str, Any], keys: Tuple[str, ...]) -> str:
+        for key in keys:
+            if item.get(key):
+                return str(item[key])
+        return ""
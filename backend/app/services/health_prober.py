@@ -0,0 +1,141 @@
+"""
+Health Prober
+Background probing of MCP sources and upstream components with cached snapshots
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import aiohttp
+from loguru import logger
+
+from app.core.config import settings
+from app.core.http import HTTPClientRegistry, MCP_CLIENT, OLLAMA_CLIENT
+from app.services.mcp_orchestrator import MCPOrchestrator
+
+
+class HealthProber:
+    """
+    One background prober per process
+    
+    Probes every source and component concurrently on a fixed interval and
+    keeps the latest snapshot of each, so health endpoints answer in O(1)
+    and the orchestrator can skip sources that are known to be down.
+    """
+    
+    def __init__(
+        self,
+        orchestrator: MCPOrchestrator,
+        http: HTTPClientRegistry,
+        interval: float = settings.HEALTH_PROBE_INTERVAL
+    ):
+        self.orchestrator = orchestrator
+        self.http = http
+        self.interval = interval
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self._probed_at: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        """Run the first probe round and start the background loop"""
+        await self.probe_once()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Health prober started (interval={self.interval}s)")
+    
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error(f"Health probe round failed: {e}")
+    
+    async def probe_once(self) -> None:
+        """Probe all sources and components concurrently"""
+        component_targets = {
+            "mcp_gateway": (MCP_CLIENT, f"{settings.MCP_GATEWAY_URL}/health", "MCP Gateway"),
+            "ollama": (OLLAMA_CLIENT, f"{settings.OLLAMA_HOST}/api/tags", "Ollama"),
+        }
+        
+        source_results, component_results = await asyncio.gather(
+            # One gateway /health read in gateway mode, direct probes otherwise
+            self.orchestrator.check_all_sources(),
+            asyncio.gather(*(
+                self._probe_component(*target)
+                for target in component_targets.values()
+            )),
+        )
+        
+        now = time.monotonic()
+        for snapshot in source_results:
+            previous = self.sources.get(snapshot["name"], {})
+            if snapshot["status"] == "healthy":
+                snapshot["last_success"] = snapshot["last_check"]
+            else:
+                snapshot["last_success"] = previous.get("last_success")
+            self.sources[snapshot["name"]] = snapshot
+            self._probed_at[snapshot["name"]] = now
+        
+        self.components.update(zip(component_targets.keys(), component_results))
+    
+    async def _probe_component(self, client: str, url: str, label: str) -> Dict[str, Any]:
+        start_time = time.monotonic()
+        try:
+            async with self.http.get(client).get(
+                url,
+                timeout=aiohttp.ClientTimeout(total=settings.HEALTH_PROBE_TIMEOUT)
+            ) as response:
+                await response.read()
+                healthy = response.status == 200
+                return {
+                    "status": "healthy" if healthy else "degraded",
+                    "message": f"{label} operational" if healthy else f"{label} returned status {response.status}",
+                    "response_time": time.monotonic() - start_time,
+                    "last_check": datetime.utcnow(),
+                }
+        except Exception as e:
+            return {
+                "status": "unhealthy",
+                "message": f"{label} error: {str(e) or type(e).__name__}",
+                "response_time": time.monotonic() - start_time,
+                "last_check": datetime.utcnow(),
+            }
+    
+    def get_sources(self) -> List[Dict[str, Any]]:
+        return list(self.sources.values())
+    
+    def get_source(self, source: str) -> Optional[Dict[str, Any]]:
+        return self.sources.get(source)
+    
+    def get_component(self, component: str) -> Optional[Dict[str, Any]]:
+        return self.components.get(component)
+    
+    def is_down(self, source: str) -> bool:
+        """True if the latest, still-fresh probe of a source failed"""
+        snapshot = self.sources.get(source)
+        if not snapshot or snapshot["status"] != "unhealthy":
+            return False
+        # Don't trust snapshots older than two probe intervals
+        return time.monotonic() - self._probed_at[source] < 2 * self.interval
+    
+    def get_health_summary(self) -> Dict[str, Any]:
+        """Overall health summary from the latest snapshots"""
+        total = len(self.sources)
+        healthy = len([s for s in self.sources.values() if s.get('status') == 'healthy'])
+        
+        return {
+            "total": total,
+            "healthy": healthy,
+            "unhealthy": total - healthy,
+            "percentage": (healthy / total * 100) if total > 0 else 0,
+        }
@@ -0,0 +1,49 @@
+"""
+Latency tracking for upstream sources
+Rolling latency sketches used to derive adaptive timeouts
+"""
+import math
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+
+class LatencySketch:
+    """
+    Rolling window of recent latencies with on-demand quantiles
+
+    Memory is bounded by the window size; quantiles are computed lazily
+    and cached until the next observation.
+    """
+
+    def __init__(self, window_size: int = 256):
+        self._samples: deque = deque(maxlen=window_size)
+        self._sorted: Optional[List[float]] = None
+        self.total_observed = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        """Add a latency sample (seconds)"""
+        self._samples.append(seconds)
+        self._sorted = None
+        self.total_observed += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank quantile over the window, or None when empty"""
+        if not self._samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        rank = max(1, math.ceil(q * len(self._sorted)))
+        return self._sorted[rank - 1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current quantiles for status reporting"""
+        return {
+            "samples": len(self._samples),
+            "total_observed": self.total_observed,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
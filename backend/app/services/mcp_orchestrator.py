@@ -4,13 +4,18 @@ Coordinates requests across multiple MCP servers (with gateway support)
 """
 import aiohttp
 import asyncio
-from typing import List, Dict, Any, Optional
+import json
+from typing import AsyncIterator, List, Dict, Any, Optional
 from loguru import logger
 from datetime import datetime
 import os
 
 from app.core.config import settings
-from app.core.monitoring import mcp_sources_active
+from app.core.http import HTTPClientRegistry, MCP_CLIENT, http_clients
+from app.core.monitoring import mcp_sources_active, mcp_circuit_state, mcp_source_retries_total
+from app.services.latency import LatencySketch
+from app.services.resilience import CircuitBreaker, RetryBudget, backoff_delay
+from app.services.source_cache import SourceResultCache
 
 
 class MCPOrchestrator:
@@ -44,12 +49,45 @@ class MCPOrchestrator:
         },
     }
     
-    def __init__(self, use_gateway: bool = True):
+    def __init__(
+        self,
+        use_gateway: bool = True,
+        http: Optional[HTTPClientRegistry] = None,
+        cache: Optional[SourceResultCache] = None
+    ):
+        self.http = http or http_clients
+        self.cache = cache
+        self.health_prober = None  # Set when a background HealthProber is attached
         self.timeout = settings.MCP_GATEWAY_TIMEOUT
         self.max_concurrent = settings.MAX_CONCURRENT_SOURCES
         self.use_gateway = use_gateway and hasattr(settings, 'MCP_GATEWAY_URL') and settings.MCP_GATEWAY_URL
         self.gateway_url = getattr(settings, 'MCP_GATEWAY_URL', None)
         
+        # Resilience: one circuit breaker per source, one shared retry budget
+        self.breakers = {
+            source: CircuitBreaker(
+                source,
+                failure_rate_threshold=settings.CIRCUIT_FAILURE_RATE,
+                slow_call_seconds=settings.CIRCUIT_SLOW_CALL_SECONDS,
+                slow_call_rate_threshold=settings.CIRCUIT_SLOW_CALL_RATE,
+                window_size=settings.CIRCUIT_WINDOW_SIZE,
+                min_calls=settings.CIRCUIT_MIN_CALLS,
+                open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+                half_open_max_calls=settings.CIRCUIT_HALF_OPEN_CALLS,
+            )
+            for source in self.SOURCES
+        }
+        self.retry_budget = RetryBudget(
+            ratio=settings.MCP_RETRY_BUDGET_RATIO,
+            min_retries_per_second=settings.MCP_RETRY_BUDGET_MIN_PER_SECOND,
+        )
+        
+        # Adaptive timeouts: rolling latency sketch per source
+        self.latency = {
+            source: LatencySketch(settings.LATENCY_WINDOW_SIZE)
+            for source in self.SOURCES
+        }
+        
         if self.use_gateway:
             logger.info(f"MCP Orchestrator using gateway: {self.gateway_url}")
         else:
@@ -70,37 +108,356 @@ class MCPOrchestrator:
         Returns:
             List of results from each source
         """
+        target_sources = sources if sources else list(self.SOURCES.keys())
+        target_sources = [s for s in target_sources if s in self.SOURCES]
+        
+        logger.info(f"Querying {len(target_sources)} sources: {target_sources}")
+        
+        results = await self.query_batch([
+            {"id": "query", "query": query, "sources": target_sources}
+        ])
+        valid_results = results["query"]
+        
+        mcp_sources_active.set(len([r for r in valid_results if r.get('status') == 'success']))
+        
+        logger.info(f"Retrieved {len(valid_results)} valid results")
+        return valid_results
+    
+    async def iter_sources(
+        self,
+        query: str,
+        sources: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+        quorum: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Query multiple MCP sources, yielding each result as soon as it arrives
+        
+        Concurrency is bounded by a sliding window of MAX_CONCURRENT_SOURCES,
+        so a slow source never holds back the results of faster ones.
+        When the deadline passes or the quorum is reached, the remaining
+        sources are cancelled and reported as `late` (in flight) or
+        `skipped` (never started).
+        
+        With MCP_GATEWAY_STREAM_FANOUT enabled, the whole fan-out is carried
+        by a single streaming /query-all request to the gateway; otherwise,
+        with MCP_GATEWAY_BATCH_FANOUT, it goes out as one /query-batch call.
+        
+        Args:
+            query: Search query
+            sources: Specific sources to query (defaults to all)
+            deadline: Seconds to wait before cutting off stragglers
+            quorum: Number of successful sources after which to stop waiting
+        
+        Yields:
+            Source result with status and data
+        """
         # Determine which sources to query
         target_sources = sources if sources else list(self.SOURCES.keys())
         target_sources = [s for s in target_sources if s in self.SOURCES]
         
         logger.info(f"Querying {len(target_sources)} sources: {target_sources}")
         
-        # Create tasks for parallel execution
-        tasks = [
-            self._query_source(source, query)
+        if self.use_gateway and settings.MCP_GATEWAY_STREAM_FANOUT and len(target_sources) > 1:
+            results = self._iter_gateway_stream(query, target_sources, deadline, quorum)
+        elif self.use_gateway and settings.MCP_GATEWAY_BATCH_FANOUT and len(target_sources) > 1:
+            results = self._iter_batch(query, target_sources, deadline, quorum)
+        else:
+            results = self._iter_parallel(query, target_sources, deadline, quorum)
+        
+        successful = 0
+        try:
+            async for result in results:
+                if result.get('status') == 'success':
+                    successful += 1
+                yield result
+        finally:
+            await results.aclose()
+            mcp_sources_active.set(successful)
+    
+    async def _iter_parallel(
+        self,
+        query: str,
+        target_sources: List[str],
+        deadline: Optional[float] = None,
+        quorum: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Fan out one request per source under a sliding semaphore window"""
+        loop = asyncio.get_event_loop()
+        start_time = loop.time()
+        deadline_at = start_time + deadline if deadline else None
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        started = set()
+        
+        async def bounded_query(source: str) -> Dict[str, Any]:
+            async with semaphore:
+                started.add(source)
+                return await self._query_source(source, query)
+        
+        task_sources = {
+            asyncio.create_task(bounded_query(source)): source
             for source in target_sources
-        ]
+        }
+        pending = set(task_sources)
+        successful = 0
         
-        # Execute with concurrency limit
-        results = []
-        for i in range(0, len(tasks), self.max_concurrent):
-            batch = tasks[i:i + self.max_concurrent]
-            batch_results = await asyncio.gather(*batch, return_exceptions=True)
-            results.extend(batch_results)
+        try:
+            while pending:
+                timeout = None
+                if deadline_at is not None:
+                    timeout = max(0.0, deadline_at - loop.time())
+                
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception():
+                        logger.error(f"Source query failed: {task.exception()}")
+                        continue
+                    
+                    result = task.result()
+                    if result.get('status') == 'success':
+                        successful += 1
+                    yield result
+                
+                if not pending:
+                    break
+                
+                # Check whether the latency budget has fired
+                if quorum and successful >= quorum:
+                    reason = f"quorum of {quorum} reached"
+                elif deadline_at is not None and loop.time() >= deadline_at:
+                    reason = f"deadline of {deadline}s exceeded"
+                else:
+                    continue
+                
+                elapsed = loop.time() - start_time
+                logger.info(f"Latency budget fired ({reason}), cutting off {len(pending)} sources")
+                
+                for task in pending:
+                    task.cancel()
+                    source = task_sources[task]
+                    yield {
+                        "source": source,
+                        "status": "late" if source in started else "skipped",
+                        "error": f"Cut off: {reason}",
+                        "response_time": elapsed if source in started else 0,
+                    }
+                pending = set()
+        finally:
+            # Consumer stopped early: don't leave requests running
+            for task in pending:
+                task.cancel()
+    
+    async def _iter_batch(
+        self,
+        query: str,
+        target_sources: List[str],
+        deadline: Optional[float] = None,
+        quorum: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer what can be answered locally first, then fetch the rest
+        together (one /query-batch round trip when more than one is left)
         
-        # Filter out exceptions and update metrics
-        valid_results = []
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"Source query failed: {result}")
+        The remaining deadline caps each lookup's timeout at the gateway, so
+        a slow source comes back late without holding back the batch.
+        """
+        loop = asyncio.get_event_loop()
+        start_time = loop.time()
+        successful = 0
+        pending = []
+        
+        for source in target_sources:
+            local_result = await self._serve_locally(source, query)
+            if local_result:
+                successful += local_result["status"] == "success"
+                yield local_result
             else:
-                valid_results.append(result)
+                pending.append(source)
         
-        mcp_sources_active.set(len([r for r in valid_results if r.get('status') == 'success']))
+        if not pending:
+            return
         
-        logger.info(f"Retrieved {len(valid_results)} valid results")
-        return valid_results
+        if quorum and successful >= quorum:
+            logger.info(f"Latency budget fired (quorum of {quorum} reached), skipping {len(pending)} sources")
+            for source in pending:
+                yield {
+                    "source": source,
+                    "status": "skipped",
+                    "error": f"Cut off: quorum of {quorum} reached",
+                    "response_time": 0,
+                }
+            return
+        
+        remaining = None
+        if deadline:
+            remaining = max(0.001, deadline - (loop.time() - start_time))
+        fetch = asyncio.create_task(
+            self._fetch_lookups([(None, query, source) for source in pending], remaining)
+        )
+        try:
+            # The gateway cuts off stragglers itself; this wait is a backstop
+            done, _ = await asyncio.wait({fetch}, timeout=None if remaining is None else remaining + 1)
+            
+            if not done:
+                elapsed = loop.time() - start_time
+                logger.info(f"Latency budget fired (deadline of {deadline}s exceeded), cutting off {len(pending)} sources")
+                for source in pending:
+                    yield {
+                        "source": source,
+                        "status": "late",
+                        "error": f"Cut off: deadline of {deadline}s exceeded",
+                        "response_time": elapsed,
+                    }
+                return
+            
+            for result in fetch.result():
+                yield result
+        finally:
+            # Cut off or consumer stopped early: don't leave requests running
+            fetch.cancel()
+    
+    async def _iter_gateway_stream(
+        self,
+        query: str,
+        target_sources: List[str],
+        deadline: Optional[float] = None,
+        quorum: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Carry the fan-out over one streaming /query-all request, consuming
+        the gateway's NDJSON lines as each source finishes
+        """
+        loop = asyncio.get_event_loop()
+        start_time = loop.time()
+        successful = 0
+        timeouts: Dict[str, float] = {}
+        
+        for source in target_sources:
+            local_result = await self._serve_locally(source, query)
+            if local_result:
+                successful += local_result["status"] == "success"
+                yield local_result
+            elif self.breakers[source].allow_request():
+                timeouts[source] = self.get_timeout(source)
+            else:
+                self._update_circuit_metric(source)
+                yield self._circuit_open_result(source)
+        
+        if not timeouts or (quorum and successful >= quorum):
+            for source in timeouts:
+                self.breakers[source].release()
+            return
+        
+        # The gateway cuts off stragglers itself; the client timeout is a backstop
+        stream_deadline = min(deadline or max(timeouts.values()), max(timeouts.values()))
+        outstanding = set(timeouts)
+        reason = None
+        
+        try:
+            session = self.http.get(MCP_CLIENT)
+            async with session.post(
+                f"{self.gateway_url}/query-all",
+                params={
+                    "stream": "true",
+                    "sources": ",".join(timeouts),
+                    "deadline_ms": str(int(stream_deadline * 1000)),
+                },
+                json={"query": query},
+                timeout=aiohttp.ClientTimeout(total=stream_deadline + 1)
+            ) as response:
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}: {await response.text()}")
+                
+                async for line in self._iter_ndjson(response.content):
+                    gateway_result = json.loads(line)
+                    source = gateway_result["source"]
+                    if source not in outstanding:
+                        continue
+                    outstanding.discard(source)
+                    
+                    result = self._from_gateway_result(source, gateway_result)
+                    if result["status"] == "late":
+                        self.breakers[source].release()
+                    else:
+                        self._record_attempt(source, result, timeouts[source])
+                    
+                    if result["status"] == "success":
+                        successful += 1
+                        if self.cache:
+                            await self.cache.set(source, query, result)
+                    yield result
+                    
+                    if quorum and successful >= quorum and outstanding:
+                        reason = f"quorum of {quorum} reached"
+                        break
+        except Exception as e:
+            logger.warning(f"Gateway stream failed, falling back to per-source requests: {e}")
+            for source in outstanding:
+                self.breakers[source].release()
+            missing, outstanding = list(outstanding), set()
+            
+            remaining = None
+            if deadline:
+                remaining = max(0.001, deadline - (loop.time() - start_time))
+            fallback = self._iter_parallel(
+                query,
+                missing,
+                remaining,
+                quorum - successful if quorum else None
+            )
+            try:
+                async for result in fallback:
+                    yield result
+            finally:
+                await fallback.aclose()
+            return
+        finally:
+            for source in outstanding:
+                self.breakers[source].release()
+        
+        if reason:
+            elapsed = loop.time() - start_time
+            logger.info(f"Latency budget fired ({reason}), cutting off {len(outstanding)} sources")
+            for source in outstanding:
+                yield {
+                    "source": source,
+                    "status": "late",
+                    "error": f"Cut off: {reason}",
+                    "response_time": elapsed,
+                }
+    
+    @staticmethod
+    async def _iter_ndjson(content: aiohttp.StreamReader) -> AsyncIterator[bytes]:
+        """Split a streamed body into NDJSON lines, whatever their length"""
+        buffer = b""
+        async for chunk in content.iter_any():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+    
+    @staticmethod
+    def _from_gateway_result(source: str, gateway_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a gateway fan-out record to the orchestrator result format"""
+        result = {
+            "source": source,
+            "status": gateway_result["status"],
+            "response_time": gateway_result.get("response_time_ms", 0) / 1000,
+            "via_gateway": True,
+        }
+        if result["status"] == "success":
+            result["data"] = gateway_result["data"]
+        else:
+            result["error"] = gateway_result.get("error")
+            result["http_status"] = gateway_result.get("http_status")
+        return result
     
     async def _query_source(
         self,
@@ -108,7 +465,9 @@ class MCPOrchestrator:
         query: str
     ) -> Dict[str, Any]:
         """
-        Query a single MCP source (via gateway or direct)
+        Query a single MCP source through the result cache and its circuit
+        breaker, retrying transient failures with jittered backoff within
+        the retry budget
         
         Args:
             source: Source identifier
@@ -117,10 +476,27 @@ class MCPOrchestrator:
         Returns:
             Source result with status and data
         """
-        start_time = asyncio.get_event_loop().time()
-        source_info = self.SOURCES.get(source)
+        local_result = await self._serve_locally(source, query)
+        if local_result:
+            return local_result
         
-        if not source_info:
+        result = await self._query_source_uncached(source, query)
+        
+        if self.cache and result["status"] == "success":
+            await self.cache.set(source, query, result)
+        
+        return result
+    
+    async def _serve_locally(
+        self,
+        source: str,
+        query: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer a lookup without contacting the source: unknown sources,
+        cache hits and sources the background prober knows are down
+        """
+        if source not in self.SOURCES:
             return {
                 "source": source,
                 "status": "error",
@@ -128,6 +504,321 @@ class MCPOrchestrator:
                 "response_time": 0,
             }
         
+        if self.cache:
+            cached = await self.cache.get(source, query)
+            if cached:
+                logger.info(f"✓ {source}: Served from {cached['cached']} cache")
+                return cached
+        
+        # Skip sources the background prober knows are down
+        if self.health_prober and self.health_prober.is_down(source):
+            snapshot = self.health_prober.get_source(source)
+            logger.info(f"✗ {source}: Skipped, failing health probes")
+            return {
+                "source": source,
+                "status": "unavailable",
+                "error": f"Source failing health probes: {snapshot.get('error')}",
+                "response_time": 0,
+            }
+        
+        return None
+    
+    async def _query_source_uncached(
+        self,
+        source: str,
+        query: str
+    ) -> Dict[str, Any]:
+        """Query a source through its circuit breaker and the retry budget"""
+        breaker = self.breakers[source]
+        self.retry_budget.record_request()
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            
+            if not breaker.allow_request():
+                self._update_circuit_metric(source)
+                if attempt == 1:
+                    logger.debug(f"✗ {source}: Circuit open, failing fast")
+                    return self._circuit_open_result(source)
+                result["attempts"] = attempt - 1
+                return result
+            
+            timeout = self.get_timeout(source)
+            try:
+                result = await self._fetch_source(source, query, timeout)
+            except BaseException:
+                # Cancelled (e.g. cut off by a latency budget): no outcome to record
+                breaker.release()
+                raise
+            
+            retryable = self._record_attempt(source, result, timeout)
+            
+            if not retryable or attempt >= settings.MCP_RETRY_MAX_ATTEMPTS:
+                if attempt > 1:
+                    result["attempts"] = attempt
+                return result
+            
+            if not self.retry_budget.try_acquire():
+                logger.warning(f"✗ {source}: Retry budget exhausted, not retrying")
+                mcp_source_retries_total.labels(source=source, outcome="budget_exhausted").inc()
+                return result
+            
+            delay = backoff_delay(
+                attempt,
+                settings.MCP_RETRY_BACKOFF_BASE,
+                settings.MCP_RETRY_BACKOFF_MAX
+            )
+            logger.info(f"↻ {source}: Retrying in {delay:.2f}s (attempt {attempt + 1})")
+            mcp_source_retries_total.labels(source=source, outcome="retried").inc()
+            await asyncio.sleep(delay)
+    
+    def _record_attempt(self, source: str, result: Dict[str, Any], timeout: float) -> bool:
+        """Feed an attempt's outcome to the breaker and latency sketch; returns whether it is retryable"""
+        retryable = self._is_retryable(result)
+        self.breakers[source].record(not retryable, result.get("response_time", 0))
+        self._observe_latency(source, result, timeout)
+        self._update_circuit_metric(source)
+        return retryable
+    
+    @staticmethod
+    def _circuit_open_result(source: str) -> Dict[str, Any]:
+        return {
+            "source": source,
+            "status": "circuit_open",
+            "error": "Circuit open: source is failing, request not sent",
+            "response_time": 0,
+        }
+    
+    async def query_batch(
+        self,
+        items: List[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run several lookups at once
+        
+        When routing through the gateway and more than one (query, source)
+        lookup is still pending after the cache and health checks, they all
+        go out in a single /query-batch round trip instead of one request each.
+        
+        Args:
+            items: Lookups as {"id": ..., "query": ..., "sources": [...]} dicts
+        
+        Returns:
+            Source results keyed by item id
+        """
+        results: Dict[str, List[Dict[str, Any]]] = {item["id"]: [] for item in items}
+        pending = []  # (item_id, query, source)
+        
+        for item in items:
+            target_sources = item.get("sources") or list(self.SOURCES.keys())
+            for source in target_sources:
+                local_result = await self._serve_locally(source, item["query"])
+                if local_result:
+                    results[item["id"]].append(local_result)
+                else:
+                    pending.append((item["id"], item["query"], source))
+        
+        for (item_id, _, _), result in zip(pending, await self._fetch_lookups(pending)):
+            results[item_id].append(result)
+        
+        return results
+    
+    async def _fetch_lookups(
+        self,
+        lookups: List[tuple],
+        deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch (item_id, query, source) lookups that could not be served
+        locally: in one gateway batch when there are several, otherwise (or
+        if the batch call failed) one request each. Successes are cached.
+        """
+        fetched = None
+        if self.use_gateway and len(lookups) > 1:
+            fetched = await self._fetch_batch(lookups, deadline)
+        
+        if fetched is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent)
+            
+            async def bounded_query(source: str, query: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._query_source_uncached(source, query)
+            
+            fetched = await asyncio.gather(*(
+                bounded_query(source, query) for _, query, source in lookups
+            ))
+        
+        for (_, query, source), result in zip(lookups, fetched):
+            if self.cache and result["status"] == "success":
+                await self.cache.set(source, query, result)
+        
+        return list(fetched)
+    
+    async def _fetch_batch(
+        self,
+        lookups: List[tuple],
+        deadline: Optional[float] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Send lookups to the gateway's /query-batch endpoint
+        
+        A `deadline` caps each lookup's timeout; a lookup that times out
+        only because of it is reported `late` and not held against the source.
+        
+        Returns:
+            One result per lookup, or None if the batch call itself failed
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(lookups)
+        timeouts: Dict[int, float] = {}
+        capped = set()
+        
+        for index, (_, _, source) in enumerate(lookups):
+            if self.breakers[source].allow_request():
+                timeouts[index] = self.get_timeout(source)
+                if deadline is not None and deadline < timeouts[index]:
+                    timeouts[index] = deadline
+                    capped.add(index)
+            else:
+                self._update_circuit_metric(source)
+                results[index] = self._circuit_open_result(source)
+        
+        if not timeouts:
+            return results
+        
+        payload = {
+            "items": [
+                {
+                    "id": str(index),
+                    "query": lookups[index][1],
+                    "sources": [lookups[index][2]],
+                    "timeout": timeout,
+                }
+                for index, timeout in timeouts.items()
+            ]
+        }
+        
+        try:
+            session = self.http.get(MCP_CLIENT)
+            async with session.post(
+                f"{self.gateway_url}/query-batch",
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=max(timeouts.values()) + 1)
+            ) as response:
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}: {await response.text()}")
+                data = await response.json()
+        except BaseException as e:
+            for index in timeouts:
+                self.breakers[lookups[index][2]].release()
+            if not isinstance(e, Exception):
+                raise
+            logger.warning(f"Gateway batch call failed, falling back to per-source requests: {e}")
+            return None
+        
+        logger.info(f"✓ Gateway batch: {len(timeouts)} lookups in one round trip")
+        
+        unsettled = dict(timeouts)
+        try:
+            for index, timeout in timeouts.items():
+                source = lookups[index][2]
+                try:
+                    result = self._from_gateway_result(source, data["results"][str(index)][0])
+                except (KeyError, IndexError, TypeError) as e:
+                    # One malformed entry fails only its own lookup
+                    result = {
+                        "source": source,
+                        "status": "error",
+                        "error": f"Malformed gateway batch result: {type(e).__name__}: {e}",
+                        "response_time": 0,
+                        "via_gateway": True,
+                    }
+                
+                if index in capped and result["status"] == "timeout":
+                    self.breakers[source].release()
+                    result["status"] = "late"
+                    result["error"] = f"Cut off: deadline of {deadline:.2f}s exceeded"
+                else:
+                    self._record_attempt(source, result, timeout)
+                del unsettled[index]
+                results[index] = result
+        finally:
+            for index in unsettled:
+                self.breakers[lookups[index][2]].release()
+        
+        return results
+    
+    @staticmethod
+    def _is_retryable(result: Dict[str, Any]) -> bool:
+        """Timeouts, connection errors, 5xx and 429 are transient; other 4xx are not"""
+        if result["status"] == "timeout":
+            return True
+        if result["status"] != "error":
+            return False
+        http_status = result.get("http_status")
+        return http_status is None or http_status >= 500 or http_status == 429
+    
+    def get_timeout(self, source: str) -> float:
+        """
+        Effective timeout for a source: observed p99 times a safety factor,
+        clamped to the configured bounds. Falls back to the static timeout
+        until enough samples have been seen.
+        """
+        sketch = self.latency[source]
+        if not settings.ADAPTIVE_TIMEOUT_ENABLED or len(sketch) < settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+            return self.timeout
+        
+        return min(
+            max(sketch.quantile(0.99) * settings.ADAPTIVE_TIMEOUT_FACTOR, settings.ADAPTIVE_TIMEOUT_MIN),
+            settings.ADAPTIVE_TIMEOUT_MAX
+        )
+    
+    def _observe_latency(self, source: str, result: Dict[str, Any], timeout: float) -> None:
+        """Feed the latency sketch; timeouts count as censored samples at the timeout"""
+        if result["status"] == "success":
+            self.latency[source].observe(result["response_time"])
+        elif result["status"] == "timeout":
+            self.latency[source].observe(timeout)
+    
+    def get_source_stats(self, source: str) -> Dict[str, Any]:
+        """Latency sketch, effective timeout and circuit state of a source"""
+        if source not in self.SOURCES:
+            return {}
+        
+        return {
+            "latency": {
+                **self.latency[source].snapshot(),
+                "effective_timeout": self.get_timeout(source),
+            },
+            "circuit": self.breakers[source].snapshot(),
+        }
+    
+    def _update_circuit_metric(self, source: str) -> None:
+        state = self.breakers[source].state
+        mcp_circuit_state.labels(source=source).set(
+            {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}[state]
+        )
+    
+    async def _fetch_source(
+        self,
+        source: str,
+        query: str,
+        timeout: float
+    ) -> Dict[str, Any]:
+        """
+        Send a single query attempt to an MCP source (via gateway or direct)
+        
+        Args:
+            source: Source identifier
+            query: Search query
+            timeout: Total request timeout in seconds
+        
+        Returns:
+            Source result with status and data
+        """
+        start_time = asyncio.get_event_loop().time()
+        source_info = self.SOURCES[source]
+        
         try:
             # Choose routing method
             if self.use_gateway:
@@ -143,45 +834,54 @@ class MCPOrchestrator:
                 "query": query,
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    response_time = asyncio.get_event_loop().time() - start_time
+            # Ask the gateway for the raw source body instead of its envelope
+            headers = {"X-Passthrough": "1"} if self.use_gateway else None
+            
+            session = self.http.get(MCP_CLIENT)
+            async with session.post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                response_time = asyncio.get_event_loop().time() - start_time
+                
+                if response.status == 200:
+                    data = await response.json()
                     
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Handle gateway response format
-                        if self.use_gateway and "data" in data:
-                            actual_data = data["data"]
-                            gateway_time = data.get("response_time_ms", response_time * 1000)
-                            logger.info(f"✓ {source} (gateway): Retrieved data in {gateway_time:.0f}ms")
-                        else:
-                            actual_data = data
-                            logger.info(f"✓ {source} (direct): Retrieved data in {response_time:.2f}s")
-                        
-                        return {
-                            "source": source,
-                            "status": "success",
-                            "data": actual_data,
-                            "response_time": response_time,
-                            "via_gateway": self.use_gateway,
-                        }
+                    # Handle gateway response format
+                    if response.headers.get("X-Passthrough") == "1":
+                        actual_data = data
+                        gateway_time = float(response.headers.get("X-Response-Time-Ms", response_time * 1000))
+                        logger.info(f"✓ {source} (gateway): Retrieved data in {gateway_time:.0f}ms")
+                    elif self.use_gateway and "data" in data:
+                        actual_data = data["data"]
+                        gateway_time = data.get("response_time_ms", response_time * 1000)
+                        logger.info(f"✓ {source} (gateway): Retrieved data in {gateway_time:.0f}ms")
                     else:
-                        error_text = await response.text()
-                        logger.warning(f"✗ {source}: Error {response.status}")
-                        
-                        return {
-                            "source": source,
-                            "status": "error",
-                            "error": f"HTTP {response.status}: {error_text}",
-                            "response_time": response_time,
-                            "via_gateway": self.use_gateway,
-                        }
-                        
+                        actual_data = data
+                        logger.info(f"✓ {source} (direct): Retrieved data in {response_time:.2f}s")
+                    
+                    return {
+                        "source": source,
+                        "status": "success",
+                        "data": actual_data,
+                        "response_time": response_time,
+                        "via_gateway": self.use_gateway,
+                    }
+                else:
+                    error_text = await response.text()
+                    logger.warning(f"✗ {source}: Error {response.status}")
+                    
+                    return {
+                        "source": source,
+                        "status": "error",
+                        "error": f"HTTP {response.status}: {error_text}",
+                        "http_status": response.status,
+                        "response_time": response_time,
+                        "via_gateway": self.use_gateway,
+                    }
+                    
         except asyncio.TimeoutError:
             response_time = asyncio.get_event_loop().time() - start_time
             logger.warning(f"✗ {source}: Timeout after {response_time:.2f}s")
@@ -189,7 +889,7 @@ class MCPOrchestrator:
             return {
                 "source": source,
                 "status": "timeout",
-                "error": "Request timeout",
+                "error": f"Request timeout after {timeout:.1f}s",
                 "response_time": response_time,
             }
             
@@ -206,6 +906,9 @@ class MCPOrchestrator:
     
     async def check_all_sources(self) -> List[Dict[str, Any]]:
         """Check health of all MCP sources"""
+        if self.use_gateway:
+            return await self._check_gateway_sources(list(self.SOURCES.keys()))
+        
         tasks = [
             self.check_source(source)
             for source in self.SOURCES.keys()
@@ -233,36 +936,98 @@ class MCPOrchestrator:
                 "error": "Unknown source",
             }
         
+        if self.use_gateway:
+            return (await self._check_gateway_sources([source]))[0]
+        
+        start_time = asyncio.get_event_loop().time()
+        
         try:
             url = f"{source_info['url']}/health"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url,
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    if response.status == 200:
-                        return {
-                            "name": source,
-                            "status": "healthy",
-                            "last_check": datetime.utcnow(),
-                        }
-                    else:
-                        return {
-                            "name": source,
-                            "status": "unhealthy",
-                            "error": f"HTTP {response.status}",
-                            "last_check": datetime.utcnow(),
-                        }
-                        
+            session = self.http.get(MCP_CLIENT)
+            async with session.get(
+                url,
+                timeout=aiohttp.ClientTimeout(total=settings.HEALTH_PROBE_TIMEOUT)
+            ) as response:
+                response_time = asyncio.get_event_loop().time() - start_time
+                
+                if response.status == 200:
+                    return {
+                        "name": source,
+                        "status": "healthy",
+                        "response_time": response_time,
+                        "last_check": datetime.utcnow(),
+                    }
+                else:
+                    return {
+                        "name": source,
+                        "status": "unhealthy",
+                        "error": f"HTTP {response.status}",
+                        "response_time": response_time,
+                        "last_check": datetime.utcnow(),
+                    }
+                    
         except Exception as e:
             return {
                 "name": source,
                 "status": "unhealthy",
-                "error": str(e),
+                "error": str(e) or type(e).__name__,
+                "response_time": asyncio.get_event_loop().time() - start_time,
                 "last_check": datetime.utcnow(),
             }
     
+    async def _check_gateway_sources(self, sources: List[str]) -> List[Dict[str, Any]]:
+        """
+        Source health as seen by the gateway (its latest /health snapshot)
+        In gateway mode the source URLs may not be reachable from here, so
+        sources are never probed directly
+        """
+        start_time = asyncio.get_event_loop().time()
+        
+        try:
+            session = self.http.get(MCP_CLIENT)
+            async with session.get(
+                f"{self.gateway_url}/health",
+                timeout=aiohttp.ClientTimeout(total=settings.HEALTH_PROBE_TIMEOUT)
+            ) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"Gateway health returned HTTP {response.status}")
+                snapshots = (await response.json()).get("sources", {})
+            error = None
+        except Exception as e:
+            snapshots = {}
+            error = f"Gateway health unavailable: {str(e) or type(e).__name__}"
+        
+        response_time = asyncio.get_event_loop().time() - start_time
+        results = []
+        for source in sources:
+            snapshot = snapshots.get(source)
+            if snapshot is None:
+                # Not known to be down: the gateway is unreachable or does not probe this source
+                results.append({
+                    "name": source,
+                    "status": "unknown",
+                    "error": error or "Not health-checked by the gateway",
+                    "response_time": response_time,
+                    "last_check": datetime.utcnow(),
+                })
+            elif snapshot.get("status") == "healthy":
+                results.append({
+                    "name": source,
+                    "status": "healthy",
+                    "response_time": response_time,
+                    "last_check": datetime.utcnow(),
+                })
+            else:
+                results.append({
+                    "name": source,
+                    "status": "unhealthy",
+                    "error": snapshot.get("last_error") or snapshot.get("status"),
+                    "response_time": response_time,
+                    "last_check": datetime.utcnow(),
+                })
+        return results
+    
     async def get_health_summary(self) -> Dict[str, Any]:
         """Get overall health summary"""
         sources = await self.check_all_sources()
@@ -4,17 +4,19 @@ Handles local Llama 3.1 8B inference for credibility scoring
 """
 import aiohttp
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from loguru import logger
 
 from app.core.config import settings
+from app.core.http import HTTPClientRegistry, OLLAMA_CLIENT, http_clients
 from app.core.monitoring import ollama_api_calls_total
 
 
 class OllamaService:
     """Service for Ollama local inference"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[HTTPClientRegistry] = None):
+        self.http = http or http_clients
         self.host = settings.OLLAMA_HOST
         self.model = settings.OLLAMA_MODEL
     
@@ -75,20 +77,20 @@ class OllamaService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=10)  # Reduced to 10 seconds
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.warning(f"Ollama API error: {response.status} - {error_text}")
-                        raise Exception(f"Ollama API error: {response.status}")
-                    
-                    result = await response.json()
-                    return result.get('response', '')
-                    
+            session = self.http.get(OLLAMA_CLIENT)
+            async with session.post(
+                url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=10)  # Reduced to 10 seconds
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.warning(f"Ollama API error: {response.status} - {error_text}")
+                    raise Exception(f"Ollama API error: {response.status}")
+                
+                result = await response.json()
+                return result.get('response', '')
+                
         except asyncio.TimeoutError:
             logger.warning("Ollama API timeout (10s) - model may be unavailable")
             raise Exception("Ollama API timeout")
@@ -101,17 +103,17 @@ class OllamaService:
         try:
             url = f"{self.host}/api/tags"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url,
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        models = [m['name'] for m in data.get('models', [])]
-                        return self.model in models
-                    return False
-                    
+            session = self.http.get(OLLAMA_CLIENT)
+            async with session.get(
+                url,
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    models = [m['name'] for m in data.get('models', [])]
+                    return self.model in models
+                return False
+                
         except Exception as e:
             logger.error(f"Ollama health check failed: {e}")
             return False
@@ -4,12 +4,13 @@ Coordinates the complete research workflow
 """
 import asyncio
 import json
-from typing import AsyncIterator
+from typing import AsyncIterator, Callable, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from loguru import logger
 from datetime import datetime
 
+from app.core.config import settings
 from app.schemas.research import ResearchQuery
 from app.models.research import Research
 from app.services.cerebras_service import CerebrasService
@@ -19,11 +20,18 @@ from app.services.mcp_orchestrator import MCPOrchestrator
 class ResearchService:
     """Service for complete research workflow"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        cerebras_service: Optional[CerebrasService] = None,
+        mcp_orchestrator: Optional[MCPOrchestrator] = None
+    ):
         self.db = db
-        self.cerebras_service = CerebrasService()
-        self.mcp_orchestrator = MCPOrchestrator()
+        self.cerebras_service = cerebras_service or CerebrasService()
+        self.mcp_orchestrator = mcp_orchestrator or MCPOrchestrator()
         # Removed ollama_service - using Cerebras exclusively
+        # A progressive draft writes while source results are still being saved
+        self._db_lock = asyncio.Lock()
     
     async def process_query_with_tools(
         self,
@@ -57,23 +65,15 @@ class ResearchService:
             logger.info("Step 1: AI selecting optimal sources...")
             selected_sources = await self._select_sources_with_ai(query.query, parent_context)
             
-            # Step 2: Query selected sources in parallel
+            # Step 2-3: Query selected sources in parallel and synthesize with Cerebras
             logger.info(f"Step 2: Querying {len(selected_sources)} selected sources: {selected_sources}")
-            source_results = await self.mcp_orchestrator.query_all_sources(
-                query.query,
-                selected_sources
+            await self._collect_and_synthesize(
+                research_id,
+                query,
+                selected_sources,
+                parent_context
             )
             
-            # Save intermediate results
-            await self._save_source_results(research_id, source_results)
-            
-            # Step 3: Synthesize with Cerebras
-            logger.info("Step 3: Synthesizing with Cerebras...")
-            synthesis = await self._synthesize_results(query.query, source_results, parent_context)
-            
-            # Save synthesis
-            await self._save_synthesis(research_id, synthesis)
-            
             # Step 4: Set credibility score
             credibility_score = 0.8  # Higher confidence for tool-selected sources
             if query.include_credibility:
@@ -117,23 +117,16 @@ class ResearchService:
                 logger.info(f"Step 0: Loading parent research {query.parent_research_id} for context...")
                 parent_context = await self._get_parent_context(query.parent_research_id)
             
-            # Step 1: Query all sources in parallel
+            # Step 1-2: Query all sources in parallel and synthesize with Cerebras
+            # (with parent context if available)
             logger.info("Step 1: Querying MCP sources...")
-            source_results = await self.mcp_orchestrator.query_all_sources(
-                query.query,
-                query.sources
+            await self._collect_and_synthesize(
+                research_id,
+                query,
+                query.sources,
+                parent_context
             )
             
-            # Save intermediate results
-            await self._save_source_results(research_id, source_results)
-            
-            # Step 2: Synthesize with Cerebras (with parent context if available)
-            logger.info("Step 2: Synthesizing with Cerebras...")
-            synthesis = await self._synthesize_results(query.query, source_results, parent_context)
-            
-            # Save synthesis
-            await self._save_synthesis(research_id, synthesis)
-            
             # Step 3: Set default credibility score (Ollama removed due to memory constraints)
             # Using Cerebras exclusively for all AI inference
             credibility_score = 0.75  # Default high confidence for Cerebras synthesis
@@ -184,6 +177,7 @@ class ResearchService:
                 "sources": research.sources,
                 "results": research.results,
                 "synthesis": research.synthesis,
+                "synthesis_revision": research.synthesis_revision,
                 "credibility_score": research.credibility_score,
             }
             yield json.dumps(initial_state)
@@ -228,6 +222,7 @@ class ResearchService:
                     "sources": research.sources,
                     "results": research.results,
                     "synthesis": research.synthesis,
+                    "synthesis_revision": research.synthesis_revision,
                     "credibility_score": research.credibility_score,
                 }
                 
@@ -247,11 +242,166 @@ class ResearchService:
             logger.error(f"Streaming error for {research_id}: {e}")
             yield json.dumps({"error": str(e)})
     
+    async def _collect_and_synthesize(
+        self,
+        research_id: str,
+        query: ResearchQuery,
+        sources: list | None,
+        parent_context: dict | None
+    ) -> str:
+        """
+        Query sources and synthesize them, saving results and synthesis as they land
+        
+        In progressive mode a draft synthesis streams from the first sources to
+        arrive (often straight from the source cache) while the rest are still
+        pending, and a refinement pass over every source replaces it once they
+        have all landed. Each finished version is kept as a numbered revision.
+        """
+        use_cache = not query.bypass_synthesis_cache
+        draft_task: asyncio.Task | None = None
+        draft_results: list = []
+        superseded = asyncio.Event()
+        
+        def start_draft(source_results: list) -> None:
+            nonlocal draft_task, draft_results
+            successes = sum(1 for r in source_results if r.get('status') == 'success')
+            if draft_task is None and successes >= settings.PROGRESSIVE_DRAFT_MIN_SOURCES:
+                draft_results = list(source_results)
+                logger.info(f"Drafting synthesis from {successes} early source(s)...")
+                draft_task = asyncio.create_task(
+                    self._stream_draft(
+                        research_id, query.query, draft_results, parent_context, use_cache, superseded
+                    )
+                )
+        
+        try:
+            source_results = await self._collect_source_results(
+                research_id,
+                query,
+                sources,
+                on_result=start_draft if query.progressive_synthesis else None
+            )
+            
+            # The refinement always runs, even when the draft already covers
+            # every source: the draft is made without reasoning and on a
+            # smaller context budget, so it is never the full-quality answer
+            logger.info("Synthesizing with Cerebras...")
+            synthesis = await self._synthesize_results(
+                query.query,
+                source_results,
+                parent_context,
+                use_cache=use_cache
+            )
+            
+            revisions = []
+            revision = 1
+            if draft_task is not None:
+                # The refined version supersedes a draft that is still streaming
+                # (revision 1 stays the draft, even one cut short and not kept)
+                superseded.set()
+                draft_task.cancel()
+                draft = (await asyncio.gather(draft_task, return_exceptions=True))[0]
+                draft_task = None
+                revision = 2
+                if isinstance(draft, str):
+                    revisions.append(self._revision(1, "draft", draft, draft_results))
+            
+            revisions.append(self._revision(revision, "final", synthesis, source_results))
+            await self._save_synthesis(research_id, synthesis, revisions)
+            return synthesis
+            
+        finally:
+            if draft_task is not None:
+                superseded.set()
+                draft_task.cancel()
+    
+    async def _stream_draft(
+        self,
+        research_id: str,
+        query: str,
+        source_results: list,
+        parent_context: dict | None,
+        use_cache: bool,
+        superseded: asyncio.Event
+    ) -> str:
+        """Stream a quick synthesis into the research record as revision 1"""
+        chunks = []
+        saved = 0
+        last_save = 0.0
+        loop = asyncio.get_running_loop()
+        
+        async def save() -> None:
+            nonlocal saved
+            # Shielded so cancelling the draft never interrupts a write on the shared session
+            if not superseded.is_set() and saved < len(chunks):
+                saved = len(chunks)
+                await asyncio.shield(
+                    self._update(research_id, synthesis=''.join(chunks), synthesis_revision=1)
+                )
+        
+        async for chunk in self.cerebras_service.synthesize(
+            query,
+            source_results,
+            parent_context=parent_context,
+            stream=True,
+            use_reasoning=False,
+            use_cache=use_cache,
+            context_budget=settings.PROGRESSIVE_DRAFT_CONTEXT_TOKENS
+        ):
+            chunks.append(chunk)
+            if loop.time() - last_save >= settings.PROGRESSIVE_DRAFT_SAVE_INTERVAL:
+                last_save = loop.time()
+                await save()
+        
+        await save()
+        draft = ''.join(chunks)
+        logger.info(f"Draft synthesis ready ({len(draft)} chars)")
+        return draft
+    
+    @staticmethod
+    def _revision(number: int, kind: str, synthesis: str, source_results: list) -> dict:
+        return {
+            "revision": number,
+            "kind": kind,
+            "sources": [r.get('source') for r in source_results if r.get('status') == 'success'],
+            "synthesis": synthesis,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+    
+    async def _collect_source_results(
+        self,
+        research_id: str,
+        query: ResearchQuery,
+        sources: list | None,
+        on_result: Callable[[list], None] | None = None
+    ) -> list:
+        """
+        Query sources and persist each result as soon as it arrives,
+        so the SSE stream can show the fastest sources immediately.
+        Honors the query's latency budget, if any.
+        """
+        source_results = []
+        budget = query.latency_budget
+        
+        async for result in self.mcp_orchestrator.iter_sources(
+            query.query,
+            sources,
+            deadline=budget.deadline_seconds if budget else None,
+            quorum=budget.quorum if budget else None
+        ):
+            source_results.append(result)
+            await self._save_source_results(research_id, list(source_results))
+            if on_result:
+                on_result(source_results)
+        
+        return source_results
+    
     async def _synthesize_results(
         self,
         query: str,
         source_results: list,
-        parent_context: dict | None = None
+        parent_context: dict | None = None,
+        use_cache: bool = True
     ) -> str:
         """Synthesize results using Cerebras with optional parent context"""
         synthesis_chunks = []
@@ -260,7 +410,8 @@ class ResearchService:
             query,
             source_results,
             parent_context=parent_context,
-            stream=False
+            stream=False,
+            use_cache=use_cache
         ):
             synthesis_chunks.append(chunk)
         
@@ -366,6 +517,16 @@ Examples:
             logger.error(f"Error in AI source selection: {e}")
             return ["web-search", "arxiv", "news"]  # Safe default
     
+    async def _update(self, research_id: str, **values) -> None:
+        """Write columns of the research record (serialized: the session is shared)"""
+        async with self._db_lock:
+            await self.db.execute(
+                update(Research)
+                .where(Research.id == research_id)
+                .values(**values)
+            )
+            await self.db.commit()
+    
     async def _update_status(
         self,
         research_id: str,
@@ -381,12 +542,7 @@ Examples:
         if error:
             values["error"] = error
         
-        await self.db.execute(
-            update(Research)
-            .where(Research.id == research_id)
-            .values(**values)
-        )
-        await self.db.commit()
+        await self._update(research_id, **values)
     
     async def _save_source_results(
         self,
@@ -394,25 +550,21 @@ Examples:
         results: list
     ) -> None:
         """Save source results"""
-        await self.db.execute(
-            update(Research)
-            .where(Research.id == research_id)
-            .values(results=results)
-        )
-        await self.db.commit()
+        await self._update(research_id, results=results)
     
     async def _save_synthesis(
         self,
         research_id: str,
-        synthesis: str
+        synthesis: str,
+        revisions: list
     ) -> None:
-        """Save synthesis"""
-        await self.db.execute(
-            update(Research)
-            .where(Research.id == research_id)
-            .values(synthesis=synthesis)
+        """Save synthesis along with every finished revision of it"""
+        await self._update(
+            research_id,
+            synthesis=synthesis,
+            synthesis_revision=revisions[-1]["revision"],
+            synthesis_revisions=revisions
         )
-        await self.db.commit()
     
     async def _save_credibility(
         self,
@@ -420,9 +572,4 @@ Examples:
         score: float
     ) -> None:
         """Save credibility score"""
-        await self.db.execute(
-            update(Research)
-            .where(Research.id == research_id)
-            .values(credibility_score=score)
-        )
-        await self.db.commit()
+        await self._update(research_id, credibility_score=score)
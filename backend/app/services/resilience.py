@@ -0,0 +1,290 @@
+"""
+Resilience primitives for upstream calls
+Per-source circuit breakers, a global retry budget with jittered backoff and
+an adaptive (AIMD) concurrency limiter
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+from loguru import logger
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker driven by error rate and slow-call rate
+
+    closed    -> requests flow; outcomes are tracked in a rolling window
+    open      -> requests fail fast until the cool-down has elapsed
+    half_open -> a limited number of probe requests decide whether to close
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque = deque(maxlen=window_size)  # (failed, slow)
+        self._failures = 0
+        self._slow = 0
+        self._half_open_in_flight = 0
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent (reserves a probe slot when half-open)"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                return False
+            self._half_open_in_flight += 1
+
+        return True
+
+    def release(self) -> None:
+        """Give back a reserved probe slot when a request ended without an outcome"""
+        if self.state == self.HALF_OPEN and self._half_open_in_flight > 0:
+            self._half_open_in_flight -= 1
+
+    def record(self, success: bool, elapsed: float) -> None:
+        """Record the outcome of a request allowed by allow_request()"""
+        slow = elapsed >= self.slow_call_seconds
+
+        if self.state == self.HALF_OPEN:
+            self.release()
+            self._transition(self.CLOSED if success and not slow else self.OPEN)
+            return
+
+        if self.state == self.OPEN:
+            return
+
+        if len(self._outcomes) == self._outcomes.maxlen:
+            old_failed, old_slow = self._outcomes[0]
+            self._failures -= old_failed
+            self._slow -= old_slow
+        self._outcomes.append((not success, slow))
+        self._failures += not success
+        self._slow += slow
+
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+
+        if (self._failures / calls >= self.failure_rate_threshold
+                or self._slow / calls >= self.slow_call_rate_threshold):
+            self._transition(self.OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+
+        logger.warning(f"Circuit for {self.name}: {self.state} → {state}")
+        self.state = state
+
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+        if state in (self.OPEN, self.CLOSED):
+            self._half_open_in_flight = 0
+        if state == self.CLOSED:
+            self._outcomes.clear()
+            self._failures = 0
+            self._slow = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for status reporting"""
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(self._slow / calls, 3) if calls else 0.0,
+        }
+
+
+class RetryBudget:
+    """
+    Global retry budget shared by all sources
+
+    Every request deposits `ratio` tokens and every retry withdraws one, so
+    retries can add at most `ratio` extra load. A small time-based refill
+    keeps low-traffic processes able to retry at all.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 1.0,
+        max_tokens: float = 10.0,
+    ):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._last_refill = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.max_tokens,
+            self._tokens + (now - self._last_refill) * self.min_retries_per_second
+        )
+        self._last_refill = now
+
+    def record_request(self) -> None:
+        """Deposit the retry allowance earned by a first attempt"""
+        self._refill()
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Withdraw a token for a retry; False if the budget is exhausted"""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (1-based)"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date); None if absent or invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit that adapts to what the upstream accepts (AIMD)
+
+    Callers hold a slot for the whole call (acquire ... release). A
+    successful call that found the limit in use grows it by 1/limit, so
+    about +1 per round of calls; a dropped call (rate limited, overloaded,
+    timed out or slower than `slow_call_seconds`) multiplies it by
+    `backoff_ratio`. Drops from calls started before the last decrease are
+    ignored so one burst of 429s only backs off once. Callers over the
+    limit queue in FIFO order.
+    """
+
+    SUCCESS = "success"
+    DROPPED = "dropped"
+    IGNORE = "ignore"
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        backoff_ratio: float = 0.5,
+        slow_call_seconds: Optional[float] = None,
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.backoff_ratio = backoff_ratio
+        self.slow_call_seconds = slow_call_seconds
+
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def available(self) -> int:
+        return max(1, int(self.limit)) - self.in_flight
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a slot; returns the seconds spent waiting
+        Raises asyncio.TimeoutError if no slot frees up within `timeout`
+        """
+        if self.available > 0 and not self._waiters:
+            self.in_flight += 1
+            return 0.0
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except BaseException:
+            if future in self._waiters:
+                self._waiters.remove(future)
+            elif future.done() and not future.cancelled():
+                # The slot was granted as we gave up on it
+                self.in_flight -= 1
+                self._wake()
+            raise
+        return time.monotonic() - started
+
+    def release(self, outcome: str, started: float, elapsed: float) -> None:
+        """
+        Give back a slot and adapt the limit to the call's outcome
+        `started` is the call's time.monotonic() start, `elapsed` its latency
+        """
+        saturated = self.in_flight >= int(self.limit) / 2
+        self.in_flight -= 1
+
+        if outcome == self.SUCCESS and self.slow_call_seconds and elapsed >= self.slow_call_seconds:
+            outcome = self.DROPPED
+
+        if outcome == self.DROPPED:
+            if started >= self._last_decrease:
+                previous = self.limit
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = time.monotonic()
+                logger.warning(f"Concurrency limit for {self.name}: {previous:.1f} → {self.limit:.1f}")
+        elif outcome == self.SUCCESS and saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.available > 0:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limiter state for status reporting"""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+        }
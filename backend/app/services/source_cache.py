@@ -0,0 +1,203 @@
+"""
+Source Result Cache
+Tiered cache in front of MCP source queries: in-process LRU (L1) + Redis (L2)
+"""
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+from loguru import logger
+
+from app.core.config import settings
+from app.core.monitoring import (
+    source_cache_requests_total,
+    source_cache_evictions_total,
+    source_cache_bytes,
+)
+
+
+class LRUByteCache:
+    """In-process LRU cache bounded by the total size of its encoded values"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._size = 0
+    
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Get (value, expires_at) and mark it recently used, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        if entry[1] <= time.time():
+            self._remove(key)
+            source_cache_evictions_total.labels(tier="l1", reason="expired").inc()
+            return None
+        
+        self._entries.move_to_end(key)
+        return entry
+    
+    def set(self, key: str, value: bytes, expires_at: float) -> None:
+        """Store a value, evicting least recently used entries to fit"""
+        if len(value) > self.max_bytes:
+            return
+        
+        if key in self._entries:
+            self._remove(key)
+        
+        self._entries[key] = (value, expires_at)
+        self._size += len(value)
+        
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            source_cache_evictions_total.labels(tier="l1", reason="size").inc()
+        
+        source_cache_bytes.set(self._size)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+        source_cache_bytes.set(0)
+    
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+        source_cache_bytes.set(self._size)
+
+
+class RedisCache:
+    """Shared Redis cache tier; errors degrade to cache misses"""
+    
+    KEY_PREFIX = "researchpilot:source:"
+    ERROR_BACKOFF_SECONDS = 30
+    
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self._disabled_until = 0.0
+    
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCache":
+        return cls(redis.from_url(
+            url,
+            socket_timeout=settings.SOURCE_CACHE_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.SOURCE_CACHE_REDIS_TIMEOUT,
+        ))
+    
+    @property
+    def available(self) -> bool:
+        return time.time() >= self._disabled_until
+    
+    async def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Get (value, expires_at), or None on miss or error"""
+        if not self.available:
+            return None
+        
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                value, ttl_ms = await pipe.get(self.KEY_PREFIX + key).pttl(self.KEY_PREFIX + key).execute()
+        except Exception as e:
+            self._backoff(e)
+            return None
+        
+        if value is None or ttl_ms <= 0:
+            return None
+        return value, time.time() + ttl_ms / 1000
+    
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        if not self.available:
+            return
+        
+        try:
+            await self.client.set(self.KEY_PREFIX + key, value, ex=ttl)
+        except Exception as e:
+            self._backoff(e)
+    
+    async def close(self) -> None:
+        await self.client.aclose()
+    
+    def _backoff(self, error: Exception) -> None:
+        logger.warning(f"Redis cache unavailable, bypassing for {self.ERROR_BACKOFF_SECONDS}s: {error}")
+        self._disabled_until = time.time() + self.ERROR_BACKOFF_SECONDS
+
+
+class SourceResultCache:
+    """
+    Tiered cache for successful source results
+    
+    Keys are the source plus a hash of the normalized query; TTLs are per
+    source so fast-moving sources (news) expire sooner than slow ones (arXiv).
+    """
+    
+    def __init__(self, l1: LRUByteCache, l2: Optional[RedisCache] = None):
+        self.l1 = l1
+        self.l2 = l2
+    
+    @classmethod
+    def from_settings(cls) -> "SourceResultCache":
+        l2 = RedisCache.from_url(settings.REDIS_URL) if settings.SOURCE_CACHE_REDIS_ENABLED else None
+        return cls(LRUByteCache(settings.SOURCE_CACHE_L1_MAX_BYTES), l2)
+    
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Case-fold, collapse whitespace and strip surrounding punctuation"""
+        query = unicodedata.normalize("NFKC", query).casefold()
+        query = re.sub(r"\s+", " ", query)
+        return query.strip(" \t\n.,;:!?\"'")
+    
+    def make_key(self, source: str, query: str) -> str:
+        digest = hashlib.sha256(self.normalize_query(query).encode("utf-8")).hexdigest()
+        return f"{source}:{digest[:32]}"
+    
+    @staticmethod
+    def ttl_for(source: str) -> int:
+        return settings.SOURCE_CACHE_TTLS.get(source, settings.CACHE_TTL)
+    
+    async def get(self, source: str, query: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result in L1, then L2 (promoting L2 hits to L1)"""
+        key = self.make_key(source, query)
+        
+        entry = self.l1.get(key)
+        if entry is not None:
+            source_cache_requests_total.labels(tier="l1", result="hit").inc()
+            return self._decode(entry[0], "l1")
+        source_cache_requests_total.labels(tier="l1", result="miss").inc()
+        
+        if self.l2 is None:
+            return None
+        
+        entry = await self.l2.get(key)
+        if entry is not None:
+            source_cache_requests_total.labels(tier="l2", result="hit").inc()
+            self.l1.set(key, *entry)
+            return self._decode(entry[0], "l2")
+        source_cache_requests_total.labels(tier="l2", result="miss").inc()
+        
+        return None
+    
+    async def set(self, source: str, query: str, result: Dict[str, Any]) -> None:
+        """Store a successful source result in both tiers"""
+        key = self.make_key(source, query)
+        ttl = self.ttl_for(source)
+        value = json.dumps(result, default=str).encode("utf-8")
+        
+        self.l1.set(key, value, time.time() + ttl)
+        if self.l2 is not None:
+            await self.l2.set(key, value, ttl)
+    
+    async def close(self) -> None:
+        if self.l2 is not None:
+            await self.l2.close()
+    
+    @staticmethod
+    def _decode(value: bytes, tier: str) -> Dict[str, Any]:
+        result = json.loads(value)
+        result["cached"] = tier
+        result["response_time"] = 0
+        return result
@@ -0,0 +1,68 @@
+"""
+SSE Decoder
+Incremental text/event-stream decoder for streaming completions
+"""
+import json
+from typing import List
+
+try:
+    import orjson
+    decode_json = orjson.loads
+except ImportError:  # orjson is optional; the stdlib decoder is a drop-in, just slower
+    def decode_json(data: bytes):
+        return json.loads(data.decode("utf-8"))
+
+
+class SSEDecoder:
+    """
+    Incremental decoder for a text/event-stream body fed as raw byte chunks
+
+    Chunks may split lines and events anywhere (even inside a CRLF); only
+    complete lines are parsed and the rest is kept for the next feed().
+    Multi-line `data:` fields are joined with newlines as the spec requires.
+    Comments and other fields (event, id, retry) are ignored.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+        self._data: List[bytes] = []
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Add raw bytes; returns the data payloads of events completed by them"""
+        buffer = self._buffer + chunk
+        end = buffer.rfind(b"\n")
+        if end < 0:
+            self._buffer = buffer
+            return []
+
+        self._buffer = buffer[end + 1:]
+        complete = buffer[:end]
+        if b"\r" in complete:
+            complete = complete.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        return self._parse(complete.split(b"\n"))
+
+    def close(self) -> List[bytes]:
+        """
+        Flush at end of stream: a final event without its trailing blank
+        line is still delivered rather than dropped
+        """
+        lines = self._buffer.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+        self._buffer = b""
+        events = self._parse(lines)
+        if self._data:
+            events.append(b"\n".join(self._data))
+            self._data = []
+        return events
+
+    def _parse(self, lines: List[bytes]) -> List[bytes]:
+        events = []
+        data = self._data
+        for line in lines:
+            if not line:
+                if data:
+                    events.append(data[0] if len(data) == 1 else b"\n".join(data))
+                    data = []
+            elif line.startswith(b"data:"):
+                data.append(line[6:] if line[5:6] == b" " else line[5:])
+        self._data = data
+        return events
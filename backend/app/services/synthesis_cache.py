@@ -0,0 +1,133 @@
+"""
+Synthesis Cache
+Exact-match cache of Cerebras synthesis output keyed by a fingerprint of the request
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.monitoring import (
+    synthesis_cache_requests_total,
+    synthesis_cache_tokens_saved_total,
+    synthesis_cache_entries,
+)
+from app.services.context_packer import count_tokens
+
+
+class SynthesisCache:
+    """
+    In-process LRU of finished syntheses with a TTL
+
+    Keys hash everything that determines the completion: model, full prompt,
+    temperature, reasoning effort and the structured-output flag. Entries
+    are bounded by count and by total text size.
+    """
+
+    def __init__(self, ttl: int, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._size = 0
+
+    @classmethod
+    def from_settings(cls) -> "SynthesisCache":
+        return cls(
+            ttl=settings.SYNTHESIS_CACHE_TTL,
+            max_entries=settings.SYNTHESIS_CACHE_MAX_ENTRIES,
+            max_bytes=settings.SYNTHESIS_CACHE_MAX_BYTES,
+        )
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        temperature: float,
+        reasoning_effort: Optional[str],
+        structured: bool
+    ) -> str:
+        fingerprint = json.dumps(
+            [model, prompt, temperature, reasoning_effort, structured],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached synthesis text, or None (records hit/miss and tokens saved)"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] <= time.time():
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            synthesis_cache_requests_total.labels(result="miss").inc()
+            return None
+
+        self._entries.move_to_end(key)
+        synthesis_cache_requests_total.labels(result="hit").inc()
+        synthesis_cache_tokens_saved_total.inc(entry[1])
+        return entry[0]
+
+    def set(self, key: str, text: str, tokens: Optional[int] = None) -> None:
+        """Store a finished synthesis; `tokens` is what a hit saves (estimated if unknown)"""
+        size = len(text.encode("utf-8"))
+        if not text or size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (text, tokens or count_tokens(text), time.time() + self.ttl)
+        self._size += size
+
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+        synthesis_cache_entries.set(len(self._entries))
+
+    def clear(self) -> int:
+        """Drop every entry; returns how many were dropped"""
+        count = len(self._entries)
+        self._entries.clear()
+        self._size = 0
+        synthesis_cache_entries.set(0)
+        logger.info(f"Synthesis cache cleared ({count} entries)")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+        }
+
+    def _remove(self, key: str) -> None:
+        text, _, _ = self._entries.pop(key)
+        self._size -= len(text.encode("utf-8"))
+        synthesis_cache_entries.set(len(self._entries))
+
+
+async def replay(text: str, chunk_chars: int, delay: float) -> AsyncIterator[str]:
+    """
+    Re-emit cached text as a stream of chunks broken at whitespace,
+    so streaming consumers see the same shape as a live completion
+    """
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            space = text.rfind(" ", start + 1, end)
+            if space > start:
+                end = space
+        yield text[start:end]
+        start = end
+        if delay:
+            await asyncio.sleep(delay)
@@ -6,6 +6,8 @@ CREATE TABLE IF NOT EXISTS research (
     sources JSONB DEFAULT '[]'::jsonb,
     results JSONB DEFAULT '[]'::jsonb,
     synthesis TEXT,
+    synthesis_revision INTEGER,
+    synthesis_revisions JSONB DEFAULT '[]'::jsonb,
     credibility_score FLOAT,
     error TEXT,
     parent_research_id VARCHAR(255) REFERENCES research(id) ON DELETE SET NULL,
@@ -0,0 +1,10 @@
+"""
+Test setup: make the `app` package importable and give Settings the
+required values so nothing needs a .env file
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("CEREBRAS_API_KEY", "test-key")
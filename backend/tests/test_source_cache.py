@@ -0,0 +1,156 @@
+"""
+Tiered source-result cache: L1 LRU, L2 Redis and the fallback between them
+L2 runs against an in-memory stand-in for redis.asyncio
+"""
+import asyncio
+import time
+
+from app.services.source_cache import LRUByteCache, RedisCache, SourceResultCache
+
+
+class FakePipeline:
+    """The pipeline calls RedisCache makes: get(...).pttl(...).execute()"""
+
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        self.calls.append(("get", key))
+        return self
+
+    def pttl(self, key):
+        self.calls.append(("pttl", key))
+        return self
+
+    async def execute(self):
+        return [getattr(self.redis, f"_{name}")(key) for name, key in self.calls]
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client (values with expiry)"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.data = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        if self.fail:
+            raise ConnectionError("redis is down")
+        return FakePipeline(self)
+
+    async def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis is down")
+        self.data[key] = (value, time.time() + ex if ex else None)
+
+    async def aclose(self):
+        pass
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+            return None
+        return entry[0]
+
+    def _pttl(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return -2
+        if entry[1] is None:
+            return -1
+        return int((entry[1] - time.time()) * 1000)
+
+
+RESULT = {"source": "arxiv", "status": "success", "data": {"results": [{"title": "Paper"}]}, "response_time": 1.2}
+
+
+def make_cache(redis: FakeRedis = None, max_bytes: int = 1024 * 1024) -> SourceResultCache:
+    return SourceResultCache(LRUByteCache(max_bytes), RedisCache(redis) if redis is not None else None)
+
+
+def test_l1_hit_after_set():
+    async def run():
+        cache = make_cache()
+        assert await cache.get("arxiv", "quantum computing") is None
+        await cache.set("arxiv", "quantum computing", RESULT)
+
+        cached = await cache.get("arxiv", "quantum computing")
+        assert cached["cached"] == "l1"
+        assert cached["data"] == RESULT["data"]
+        assert cached["response_time"] == 0
+
+    asyncio.run(run())
+
+
+def test_key_uses_normalized_query_and_source():
+    async def run():
+        cache = make_cache()
+        await cache.set("arxiv", "Quantum  Computing?", RESULT)
+
+        assert await cache.get("arxiv", "quantum computing") is not None
+        assert await cache.get("news", "quantum computing") is None
+
+    asyncio.run(run())
+
+
+def test_l2_hit_is_promoted_to_l1():
+    async def run():
+        redis = FakeRedis()
+        await make_cache(redis).set("arxiv", "llm agents", RESULT)
+
+        # Another process: empty L1, same Redis
+        cache = make_cache(redis)
+        assert (await cache.get("arxiv", "llm agents"))["cached"] == "l2"
+        assert (await cache.get("arxiv", "llm agents"))["cached"] == "l1"
+
+    asyncio.run(run())
+
+
+def test_expired_l1_entry_falls_back_to_l2():
+    async def run():
+        redis = FakeRedis()
+        cache = make_cache(redis)
+        await cache.set("arxiv", "retrieval", RESULT)
+
+        key = cache.make_key("arxiv", "retrieval")
+        value, _ = cache.l1._entries[key]
+        cache.l1._entries[key] = (value, time.time() - 1)
+
+        assert (await cache.get("arxiv", "retrieval"))["cached"] == "l2"
+
+    asyncio.run(run())
+
+
+def test_redis_errors_degrade_to_l1_only():
+    async def run():
+        cache = make_cache(FakeRedis(fail=True))
+        await cache.set("arxiv", "graph neural networks", RESULT)
+
+        assert not cache.l2.available
+        assert (await cache.get("arxiv", "graph neural networks"))["cached"] == "l1"
+        assert await cache.get("arxiv", "something else") is None
+
+    asyncio.run(run())
+
+
+def test_l1_evicts_least_recently_used_by_size():
+    l1 = LRUByteCache(max_bytes=10)
+    expires_at = time.time() + 60
+    l1.set("a", b"1234", expires_at)
+    l1.set("b", b"1234", expires_at)
+    l1.get("a")
+    l1.set("c", b"1234", expires_at)
+
+    assert l1.get("b") is None
+    assert l1.get("a") is not None
+    assert l1.get("c") is not None
+
+    l1.set("big", b"x" * 11, expires_at)
+    assert l1.get("big") is None
@@ -1,3 +1,8 @@
+export interface LatencyBudget {
+  deadline_seconds?: number
+  quorum?: number
+}
+
 export interface ResearchQuery {
   query: string
   sources?: string[]
@@ -5,6 +10,9 @@ export interface ResearchQuery {
   include_credibility?: boolean
   parent_research_id?: string
   use_tool_calling?: boolean
+  latency_budget?: LatencyBudget
+  bypass_synthesis_cache?: boolean
+  progressive_synthesis?: boolean
 }
 
 export interface ResearchResponse {
@@ -21,6 +29,14 @@ export interface SourceResult {
   response_time?: number
 }
 
+export interface SynthesisRevision {
+  revision: number
+  kind: 'draft' | 'final'
+  sources: string[]
+  synthesis: string
+  created_at: string
+}
+
 export interface ResearchStatus {
   id: string
   status: 'pending' | 'processing' | 'completed' | 'failed'
@@ -28,6 +44,8 @@ export interface ResearchStatus {
   sources: string[]
   results?: SourceResult[]
   synthesis?: string
+  synthesis_revision?: number
+  synthesis_revisions?: SynthesisRevision[]
   credibility_score?: number
   created_at: string
   completed_at?: string
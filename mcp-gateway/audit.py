@@ -0,0 +1,262 @@
+"""
+Audit trail
+Fixed-capacity in-memory ring buffer plus a background writer that persists
+batched entries to rotating, gzip-compressed JSONL files
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Longest query text kept in an audit entry
+MAX_QUERY_CHARS = 200
+
+
+def summarize_params(params: Dict[str, Any], include_query: bool = True) -> Dict[str, Any]:
+    """
+    Compact, bounded view of request params for the audit trail
+    Keeps a truncated query and a digest of the full params instead of the params
+    """
+    encoded = json.dumps(params, sort_keys=True, default=str).encode()
+    summary: Dict[str, Any] = {"digest": hashlib.sha1(encoded).hexdigest()[:16], "size": len(encoded)}
+
+    query = params.get("query") if isinstance(params, dict) else None
+    if include_query and isinstance(query, str):
+        summary["query"] = query[:MAX_QUERY_CHARS]
+    return summary
+
+
+class AuditLog:
+    """
+    Audit entries for /audit-logs and for long-term storage
+
+    `record` is O(1) and never blocks: the entry goes into a ring buffer and,
+    when persistence is configured, onto a bounded queue that a background
+    task drains in batches. Entries are dropped (and counted) if the writer
+    falls behind.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        directory: Optional[str] = None,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        max_file_bytes: int = 50 * 1024 * 1024,
+        retention_days: float = 7,
+        queue_size: int = 10000,
+    ):
+        self.entries: deque = deque(maxlen=capacity)
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.retention_days = retention_days
+
+        self._queue: Optional[asyncio.Queue] = asyncio.Queue(maxsize=queue_size) if directory else None
+        self._writer: Optional[asyncio.Task] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._current_file: Optional[str] = None
+        self._current_day: Optional[str] = None
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls) -> "AuditLog":
+        """Build from AUDIT_* environment variables (persistence needs AUDIT_LOG_DIR)"""
+        return cls(
+            capacity=int(os.getenv("AUDIT_BUFFER_SIZE", "1000")),
+            directory=os.getenv("AUDIT_LOG_DIR") or None,
+            batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "200")),
+            flush_interval=float(os.getenv("AUDIT_FLUSH_INTERVAL", "2")),
+            max_file_bytes=int(float(os.getenv("AUDIT_MAX_FILE_MB", "50")) * 1024 * 1024),
+            retention_days=float(os.getenv("AUDIT_RETENTION_DAYS", "7")),
+            queue_size=int(os.getenv("AUDIT_QUEUE_SIZE", "10000")),
+        )
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Add an entry to the ring buffer and queue it for persistence"""
+        self.entries.append(entry)
+        self.recorded += 1
+
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def query(
+        self,
+        source: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        Most recent buffered entries (oldest first) matching the filters
+
+        Args:
+            source: Only entries for this source
+            since: ISO timestamp lower bound (inclusive)
+            until: ISO timestamp upper bound (exclusive)
+            limit: Maximum number of entries
+        """
+        matches = []
+        for entry in reversed(self.entries):
+            if len(matches) >= limit:
+                break
+            if since and entry["timestamp"] < since:
+                break  # Entries are in time order
+            if until and entry["timestamp"] >= until:
+                continue
+            if source and entry["source"] != source:
+                continue
+            matches.append(entry)
+        matches.reverse()
+        return matches
+
+    async def query_persisted(
+        self,
+        source: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Like query(), but reads the persisted files (off the event loop)"""
+        if not self.directory:
+            return []
+        return await asyncio.to_thread(self._scan_files, source, since, until, limit)
+
+    def _scan_files(self, source, since, until, limit) -> List[Dict[str, Any]]:
+        since_epoch = datetime.fromisoformat(since).replace(tzinfo=timezone.utc).timestamp() if since else None
+        matches: deque = deque(maxlen=limit)
+
+        for path in self._list_files():
+            # Skip files last written before `since`
+            if since_epoch and os.path.getmtime(path) < since_epoch:
+                continue
+            try:
+                with gzip.open(path, "rt") as f:
+                    for line in f:
+                        entry = json.loads(line)
+                        if since and entry["timestamp"] < since:
+                            continue
+                        if until and entry["timestamp"] >= until:
+                            continue
+                        if source and entry["source"] != source:
+                            continue
+                        matches.append(entry)
+            except (OSError, EOFError, ValueError) as e:
+                logger.warning(f"Could not read audit file {path}: {e}")
+
+        return list(matches)
+
+    async def start(self) -> None:
+        """Start the background writer (no-op without AUDIT_LOG_DIR)"""
+        if self._queue is None or self._writer is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._writer = asyncio.create_task(self._write_loop())
+        logger.info(f"Audit writer started: {self.directory} (retention {self.retention_days}d)")
+
+    async def stop(self) -> None:
+        """Flush queued entries and stop the writer"""
+        if self._writer is None:
+            return
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+
+        await self._flush(self._pending)
+        self._pending = []
+        while not self._queue.empty():
+            batch = []
+            while not self._queue.empty() and len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+
+    async def _write_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            try:
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Hand the partial batch to stop() so it is not lost
+                self._pending = batch
+                raise
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.error(f"Audit write failed, dropped {len(batch)} entries: {e}")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Append one gzip member per batch; rotate daily or by size and prune by age"""
+        if (self._current_file is None
+                or self._current_day != datetime.utcnow().strftime("%Y%m%d")
+                or os.path.getsize(self._current_file) >= self.max_file_bytes):
+            self._rotate()
+
+        data = "".join(json.dumps(entry, default=str) + "\n" for entry in batch)
+        with open(self._current_file, "ab") as f:
+            f.write(gzip.compress(data.encode()))
+
+    def _rotate(self) -> None:
+        now = datetime.utcnow()
+        self._current_day = now.strftime("%Y%m%d")
+        name = f"audit-{now.strftime('%Y%m%dT%H%M%S%f')}.jsonl.gz"
+        self._current_file = os.path.join(self.directory, name)
+        open(self._current_file, "ab").close()
+
+        cutoff = time.time() - self.retention_days * 86400
+        for path in self._list_files():
+            if path != self._current_file and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                logger.info(f"Removed expired audit file {path}")
+
+    def _list_files(self) -> List[str]:
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith("audit-") and name.endswith(".jsonl.gz")
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self.entries),
+            "capacity": self.entries.maxlen,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "persistence": self.directory,
+        }
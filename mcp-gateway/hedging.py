@@ -0,0 +1,129 @@
+"""
+Request hedging
+Per-source latency tracking and a hedge budget for sending a duplicate of a
+slow, idempotent source query to another replica
+"""
+import logging
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGING = {
+    "enabled": False,
+    "quantile": 0.95,
+    "budget_percent": 5,
+    "min_delay_ms": 50,
+    "min_samples": 20,
+}
+
+# Latency samples kept per source, and how often the hedge delay is recomputed
+WINDOW_SIZE = 500
+RECOMPUTE_EVERY = 20
+
+# Unused hedge budget that can build up, in hedges
+MAX_BUDGET_TOKENS = 10.0
+
+
+class SourceHedging:
+    """
+    Hedge state for one source: recent upstream latencies and a token budget
+
+    Every primary call earns `budget_percent / 100` of a token and a hedge
+    spends a whole one, so hedges stay under that share of upstream load
+    (with a small burst allowance).
+    """
+
+    def __init__(self):
+        self.latencies: deque = deque(maxlen=WINDOW_SIZE)
+        self.settings = dict(DEFAULT_HEDGING)
+        self.tokens = 0.0
+        self._delay: Optional[float] = None
+        self._since_recompute = 0
+
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+        self.budget_exhausted = 0
+        self.rate_limited = 0
+
+    def configure(self, settings: Dict[str, Any]) -> None:
+        self.settings = {**DEFAULT_HEDGING, **settings}
+        self._recompute()
+
+    def observe(self, seconds: float) -> None:
+        """Record the latency of a completed upstream call"""
+        self.latencies.append(seconds)
+        self._since_recompute += 1
+        if self._delay is None or self._since_recompute >= RECOMPUTE_EVERY:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        self._since_recompute = 0
+        if len(self.latencies) < self.settings["min_samples"]:
+            self._delay = None
+            return
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(self.settings["quantile"] * len(ordered)))
+        self._delay = max(self.settings["min_delay_ms"] / 1000, ordered[index])
+
+    def delay(self) -> Optional[float]:
+        """
+        Seconds to wait before hedging a new call, or None to not hedge
+        Also credits the budget for the call
+        """
+        if not self.settings["enabled"]:
+            return None
+        self.calls += 1
+        self.tokens = min(MAX_BUDGET_TOKENS, self.tokens + self.settings["budget_percent"] / 100)
+        return self._delay
+
+    def try_hedge(self) -> bool:
+        """Spend one token for a hedge if the budget allows it"""
+        if self.tokens < 1:
+            self.budget_exhausted += 1
+            return False
+        self.tokens -= 1
+        self.hedges += 1
+        return True
+
+    def refund(self) -> None:
+        """Undo try_hedge() for a hedge that was not sent after all (e.g. rate limited)"""
+        self.tokens += 1
+        self.hedges -= 1
+        self.rate_limited += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.settings["enabled"],
+            "delay_ms": round(self._delay * 1000, 2) if self._delay is not None else None,
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "budget_exhausted": self.budget_exhausted,
+            "rate_limited": self.rate_limited,
+            "hedge_rate": round(self.hedges / self.calls, 4) if self.calls else 0.0,
+            "win_rate": round(self.wins / self.hedges, 4) if self.hedges else 0.0,
+        }
+
+
+class Hedging:
+    """Hedge state for every source; outlives config reloads and is re-tuned by them"""
+
+    def __init__(self):
+        self.sources: Dict[str, SourceHedging] = {}
+
+    def configure(self, settings: Dict[str, Any], overrides: Dict[str, Dict[str, Any]]) -> None:
+        """Apply the `hedging` config section and per-source overrides (safe to call on reload)"""
+        for name in list(self.sources):
+            if name not in overrides:
+                del self.sources[name]
+
+        for name, override in overrides.items():
+            self.source(name).configure({**settings, **override})
+
+    def source(self, name: str) -> SourceHedging:
+        return self.sources.setdefault(name, SourceHedging())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: source.stats() for name, source in self.sources.items()}
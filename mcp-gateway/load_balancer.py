@@ -0,0 +1,179 @@
+"""
+Replica load balancing
+Picks one of a source's replica endpoints per request (least outstanding
+requests or power of two choices), ejects replicas that keep failing and
+ramps recovered replicas back up with a slow-start window
+"""
+import logging
+import random
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LEAST_OUTSTANDING = "least_outstanding"
+POWER_OF_TWO = "power_of_two"
+ROUND_ROBIN = "round_robin"
+STRATEGIES = (LEAST_OUTSTANDING, POWER_OF_TWO, ROUND_ROBIN)
+
+DEFAULT_ROUTING = {
+    "strategy": LEAST_OUTSTANDING,
+    "consecutive_failures": 3,
+    "ejection_seconds": 30,
+    "max_ejection_seconds": 300,
+    "slow_start_seconds": 30,
+}
+
+# Share of its full weight a replica gets at the start of its slow-start window
+MIN_WEIGHT = 0.1
+
+
+class Replica:
+    """
+    One upstream endpoint of a source and its shared keep-alive client
+    Replicas are reused across config reloads when their URL and timeout do
+    not change, so in-flight counts and ejection state carry over
+    """
+
+    def __init__(self, url: str, client: httpx.AsyncClient):
+        self.url = url
+        self.client = client
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.recovered_at: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+
+    def available(self, now: float) -> bool:
+        """Not ejected; an expired ejection starts the slow-start window"""
+        if self.ejected_until and now >= self.ejected_until:
+            self.recovered_at = self.ejected_until
+            self.ejected_until = 0.0
+        return not self.ejected_until
+
+    def weight(self, now: float, slow_start: float) -> float:
+        """Ramps linearly from MIN_WEIGHT to 1 over the slow-start window"""
+        if self.recovered_at is None or slow_start <= 0:
+            return 1.0
+        progress = (now - self.recovered_at) / slow_start
+        if progress >= 1:
+            # Fully ramped up: later ejections start from the base duration again
+            self.recovered_at = None
+            self.ejections = 0
+            return 1.0
+        return max(MIN_WEIGHT, progress)
+
+    def load(self, now: float, slow_start: float) -> float:
+        """Outstanding requests (counting the one being placed) scaled by weight"""
+        return (self.outstanding + 1) / self.weight(now, slow_start)
+
+    def stats(self, now: float, slow_start: float) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "available": self.available(now),
+            "outstanding": self.outstanding,
+            "weight": round(self.weight(now, slow_start), 2),
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+        }
+
+
+class SourceBalancer:
+    """
+    Replica selection for one source
+
+    Every request is placed with acquire() and finished with release(),
+    which keeps the outstanding counts the strategies use. A replica with
+    `consecutive_failures` failures in a row (or a failed health probe) is
+    ejected for `ejection_seconds`, doubling on repeat ejections. If every
+    replica is ejected the balancer falls back to all of them rather than
+    failing the request.
+    """
+
+    def __init__(self, source: str, replicas: List[Replica], settings: Optional[Dict[str, Any]] = None):
+        settings = {**DEFAULT_ROUTING, **(settings or {})}
+        if settings["strategy"] not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy for {source}: {settings['strategy']}")
+
+        self.source = source
+        self.replicas = replicas
+        self.strategy = settings["strategy"]
+        self.max_failures = int(settings["consecutive_failures"])
+        self.ejection_seconds = float(settings["ejection_seconds"])
+        self.max_ejection_seconds = float(settings["max_ejection_seconds"])
+        self.slow_start = float(settings["slow_start_seconds"])
+        self._next = 0
+
+    def acquire(self, exclude: Iterable[Replica] = ()) -> Replica:
+        """Pick a replica for one request (avoiding `exclude` when possible)"""
+        now = time.monotonic()
+        candidates = [r for r in self.replicas if r not in exclude and r.available(now)]
+        if not candidates:
+            candidates = [r for r in self.replicas if r not in exclude] or self.replicas
+
+        if len(candidates) == 1:
+            replica = candidates[0]
+        elif self.strategy == POWER_OF_TWO:
+            a, b = random.sample(candidates, 2)
+            replica = a if a.load(now, self.slow_start) <= b.load(now, self.slow_start) else b
+        elif self.strategy == LEAST_OUTSTANDING:
+            lowest = min(r.load(now, self.slow_start) for r in candidates)
+            replica = random.choice([r for r in candidates if r.load(now, self.slow_start) == lowest])
+        else:
+            replica = self._round_robin(candidates, now)
+
+        replica.outstanding += 1
+        replica.requests += 1
+        return replica
+
+    def _round_robin(self, candidates: List[Replica], now: float) -> Replica:
+        # Replicas in slow-start are skipped in proportion to their missing weight
+        for _ in range(len(candidates)):
+            replica = candidates[self._next % len(candidates)]
+            self._next += 1
+            if random.random() < replica.weight(now, self.slow_start):
+                return replica
+        return replica
+
+    def release(self, replica: Replica, ok: bool) -> None:
+        """Finish a request placed with acquire() and record whether the replica failed"""
+        replica.outstanding -= 1
+        if ok:
+            replica.consecutive_failures = 0
+            return
+
+        replica.failures += 1
+        replica.consecutive_failures += 1
+        if replica.consecutive_failures >= self.max_failures and replica.available(time.monotonic()):
+            self.eject(replica, f"{replica.consecutive_failures} consecutive failures")
+
+    def eject(self, replica: Replica, reason: str) -> None:
+        duration = min(self.max_ejection_seconds, self.ejection_seconds * 2 ** replica.ejections)
+        replica.ejections += 1
+        replica.ejected_until = time.monotonic() + duration
+        replica.recovered_at = None
+        replica.consecutive_failures = 0
+        logger.warning(f"✗ Ejected {self.source} replica {replica.url} for {duration:.0f}s: {reason}")
+
+    def mark_health(self, replica: Replica, healthy: bool) -> None:
+        """Apply a health probe result: eject on failure, lift the ejection on success"""
+        now = time.monotonic()
+        if not healthy:
+            if replica.available(now):
+                self.eject(replica, "health check failed")
+        elif not replica.available(now):
+            replica.ejected_until = 0.0
+            replica.recovered_at = now
+            logger.info(f"✓ {self.source} replica {replica.url} recovered, slow start {self.slow_start:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "strategy": self.strategy,
+            "replicas": [replica.stats(now, self.slow_start) for replica in self.replicas],
+        }
@@ -2,25 +2,102 @@
 MCP Gateway - Unified orchestration for MCP servers
 Provides routing, security, and monitoring for all MCP sources
 """
-from fastapi import FastAPI, HTTPException, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from pydantic import BaseModel, Field
 import httpx
 import asyncio
 import time
 import json
 import logging
-from typing import Dict, Any, List
-from datetime import datetime
+import os
+import random
+import re
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+
+from audit import AuditLog, summarize_params
+from rate_limiter import RateLimitExceeded
+from response_cache import ResponseCache, cache_key
+from shared_state import backend_from_env
+from hedging import Hedging
+from load_balancer import Replica
+from registry import ConfigRegistry, GatewayConfig
+import telemetry
+from telemetry import (
+    record_source_request, record_rate_limited, record_replica_request, record_cache_lookup,
+    source_retries_total, hedge_requests_total, hedge_wins_total, rate_limit_waiting, rate_limit_wait_seconds
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Gateway config (sources, retry policy, interceptors), reloaded on change
+GATEWAY_CONFIG_PATH = os.getenv(
+    "GATEWAY_CONFIG_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gateway", "config.json")
+)
+CONFIG_RELOAD_INTERVAL = float(os.getenv("CONFIG_RELOAD_INTERVAL", "2"))
+CONFIG_DRAIN_TIMEOUT = float(os.getenv("CONFIG_DRAIN_TIMEOUT", "60"))
+
+# Backoff between retries of a failed upstream call
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.1"))
+RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "2"))
+
+# Batch query limits
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "12"))
+
+# Body size limits (bytes)
+MAX_REQUEST_BODY_BYTES = int(os.getenv("MAX_REQUEST_BODY_BYTES", str(1024 * 1024)))
+MAX_UPSTREAM_BODY_BYTES = int(os.getenv("MAX_UPSTREAM_BODY_BYTES", str(10 * 1024 * 1024)))
+
+# Cheap check on 200 bodies (sources answer with a JSON object or array);
+# the full parse only happens where the body is actually decoded
+JSON_BODY_START = re.compile(rb"\s*[\[{]")
+
+# Background health probing (per-source intervals come from the config)
+HEALTH_CHECK_TICK = 1.0
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "5"))
+
+# Upstream connection pools (one shared client per source replica)
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load config, open upstream clients and start background tasks"""
+    await registry.start()
+    registry.add_listener(on_config_reload)
+    configure_response_cache(registry.current)
+    configure_hedging(registry.current)
+    logger.info(f"Upstream client pools ready (http2={http2_enabled()}, state={shared_state.name})")
+    
+    await audit_logs.start()
+    await probe_all_sources()
+    health_task = asyncio.create_task(health_probe_loop())
+    
+    yield
+    
+    health_task.cancel()
+    await audit_logs.stop()
+    await registry.stop()
+    await shared_state.close()
+    telemetry.mark_process_dead()
+
+
 app = FastAPI(
     title="ResearchPilot MCP Gateway",
     description="Unified gateway for Model Context Protocol servers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -32,8 +109,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# MCP Server registry
-MCP_SERVERS = {
+# Built-in source registry, used when gateway/config.json has no sources
+DEFAULT_MCP_SERVERS = {
     "web-search": {
         "url": "http://mcp-web-search:9001",
         "name": "Web Search",
@@ -66,60 +143,367 @@ MCP_SERVERS = {
     }
 }
 
-# Metrics storage
-metrics = {
-    "total_requests": 0,
-    "successful_requests": 0,
-    "failed_requests": 0,
-    "requests_by_source": {source: 0 for source in MCP_SERVERS.keys()},
-    "avg_response_times": {source: [] for source in MCP_SERVERS.keys()}
-}
+# Audit trail: ring buffer for /audit-logs, batched to disk when AUDIT_LOG_DIR is set
+audit_logs = AuditLog.from_env()
+
+# Latest health snapshot per source, refreshed by the background prober
+health_snapshots: Dict[str, Dict[str, Any]] = {}
+
+def http2_enabled() -> bool:
+    """HTTP/2 is used only when requested and the h2 package is installed"""
+    if not UPSTREAM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("UPSTREAM_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def create_upstream_client(config: Dict) -> httpx.AsyncClient:
+    """Create a keep-alive client for one source replica (default timeout from the registry)"""
+    return httpx.AsyncClient(
+        base_url=config["url"],
+        timeout=config["timeout"],
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY
+        ),
+        http2=http2_enabled()
+    )
+
+
+# Rate limit buckets and summary metrics, shared across workers/nodes per GATEWAY_STATE_BACKEND
+shared_state = backend_from_env()
+telemetry.use_shared_state(shared_state)
+
+registry = ConfigRegistry(
+    GATEWAY_CONFIG_PATH,
+    DEFAULT_MCP_SERVERS,
+    create_upstream_client,
+    reload_interval=CONFIG_RELOAD_INTERVAL,
+    drain_timeout=CONFIG_DRAIN_TIMEOUT,
+    state=shared_state
+)
+
+# Upstream response cache; outlives config reloads and is re-tuned by them
+response_cache = ResponseCache(on_lookup=record_cache_lookup)
+
+# Per-source latency windows and hedge budgets; also outlive reloads
+hedging = Hedging()
+
+# When each source was last probed (monotonic time)
+last_probed: Dict[str, float] = {}
+
+
+def configure_response_cache(config: GatewayConfig):
+    """Apply the `cache` section and per-source cache TTLs"""
+    response_cache.configure(
+        config.raw.get("cache", {}),
+        {name: source["cache"]["ttl"] for name, source in config.sources.items() if "ttl" in source["cache"]}
+    )
 
-# Audit log storage (in-memory for demo, would use DB in production)
-audit_logs: List[Dict] = []
+
+def configure_hedging(config: GatewayConfig):
+    """Apply the `hedging` section and per-source hedging overrides"""
+    hedging.configure(
+        config.raw.get("hedging", {}),
+        {name: source["hedging"] for name, source in config.sources.items()}
+    )
+
+
+def on_config_reload(old: GatewayConfig, new: GatewayConfig):
+    """Re-tune the cache and hedging, forget health state of removed sources and re-probe changed ones"""
+    configure_response_cache(new)
+    configure_hedging(new)
+
+    for name in old.sources:
+        if name not in new.sources:
+            health_snapshots.pop(name, None)
+            last_probed.pop(name, None)
+        elif old.sources[name]["replicas"] != new.sources[name]["replicas"]:
+            last_probed.pop(name, None)
+
+
+async def probe_replica(config: GatewayConfig, source_name: str, replica: Replica) -> Tuple[bool, Optional[str]]:
+    """Probe one replica's health endpoint and feed the result to its balancer"""
+    try:
+        response = await replica.client.get(
+            config.sources[source_name]["health_check"]["path"],
+            timeout=HEALTH_CHECK_TIMEOUT
+        )
+        healthy = response.status_code == 200
+        error = None if healthy else f"HTTP {response.status_code}"
+    except Exception as e:
+        healthy = False
+        error = str(e) or type(e).__name__
+    
+    config.balancer(source_name).mark_health(replica, healthy)
+    return healthy, error
+
+
+async def probe_source(config: GatewayConfig, source_name: str) -> Dict[str, Any]:
+    """Probe a single MCP server's health endpoint (every replica; healthy if any replica is)"""
+    source = config.sources[source_name]
+    replicas = config.balancer(source_name).replicas
+    previous = health_snapshots.get(source_name, {})
+    start_time = time.time()
+    
+    results = await asyncio.gather(*(probe_replica(config, source_name, replica) for replica in replicas))
+    healthy = any(ok for ok, _ in results)
+    error = next((error for _, error in results if error), None)
+    
+    now = datetime.utcnow().isoformat()
+    snapshot = {
+        "status": "healthy" if healthy else ("degraded" if error.startswith("HTTP") else "unhealthy"),
+        "url": source["url"],
+        "latency_ms": round((time.time() - start_time) * 1000, 2),
+        "last_check": now,
+        "last_success": now if healthy else previous.get("last_success"),
+        "last_error": error or previous.get("last_error"),
+    }
+    if len(replicas) > 1:
+        snapshot["replicas"] = {
+            replica.url: "healthy" if ok else error
+            for replica, (ok, error) in zip(replicas, results)
+        }
+    return snapshot
+
+
+async def probe_all_sources(due_only: bool = False):
+    """Probe MCP servers concurrently (only those whose interval has elapsed if `due_only`)"""
+    with registry.use() as config:
+        now = time.monotonic()
+        names = [
+            name for name, source in config.sources.items()
+            if source["health_check"]["enabled"] and not (
+                due_only and now - last_probed.get(name, float("-inf")) < source["health_check"]["interval"]
+            )
+        ]
+        if not names:
+            return
+        
+        results = await asyncio.gather(*(probe_source(config, name) for name in names))
+        for name, result in zip(names, results):
+            if name in registry.current.sources:
+                health_snapshots[name] = result
+                last_probed[name] = now
+
+
+async def health_probe_loop():
+    """Refresh each source's health snapshot on its configured interval"""
+    while True:
+        await asyncio.sleep(HEALTH_CHECK_TICK)
+        try:
+            await probe_all_sources(due_only=True)
+        except Exception as e:
+            logger.error(f"Health probe round failed: {e}")
 
 
 # Security Interceptors
-def sql_injection_check(params: Dict[str, Any]) -> bool:
-    """Check for SQL injection patterns"""
-    dangerous_patterns = [
-        "union.*select", "insert.*into", "drop.*table",
-        "delete.*from", "--", ";", "'"
-    ]
-    
-    param_str = json.dumps(params).lower()
-    for pattern in dangerous_patterns:
-        if pattern in param_str:
-            logger.warning(f"SQL injection attempt detected: {pattern}")
-            return False
-    return True
+def security_check(config: GatewayConfig, params: Dict[str, Any]) -> Optional[str]:
+    """Run the enabled security interceptors; returns the violation, if any"""
+    return config.interceptors.check(params)
 
 
-def rate_limit_check(source: str) -> bool:
-    """Simple rate limiting (60 requests per minute per source)"""
-    # In production, would use Redis for distributed rate limiting
-    # For demo, we'll allow all requests
-    return True
+async def rate_limit_check(config: GatewayConfig, source: str, max_wait: Optional[float] = None) -> float:
+    """
+    Wait for a rate limit token for a source (token bucket per source)
+    Raises RateLimitExceeded if no token is available within the wait deadline
+    """
+    rate_limit_waiting.labels(source=source).inc()
+    try:
+        wait = await config.rate_limiter.acquire(source, max_wait)
+    except RateLimitExceeded:
+        await record_rate_limited(source)
+        raise
+    finally:
+        rate_limit_waiting.labels(source=source).dec()
+    
+    rate_limit_wait_seconds.labels(source=source).observe(wait)
+    return wait
+
+
+def retry_delay(policy: Dict[str, Any], attempt: int) -> float:
+    """Backoff before retry `attempt` (1-based), with full jitter"""
+    if policy.get("backoff") == "fixed":
+        delay = RETRY_BACKOFF_BASE
+    elif policy.get("backoff") == "linear":
+        delay = RETRY_BACKOFF_BASE * attempt
+    else:
+        delay = RETRY_BACKOFF_BASE * (2 ** (attempt - 1))
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, delay))
+
+
+class UpstreamBodyTooLarge(Exception):
+    """Raised when an upstream response exceeds MAX_UPSTREAM_BODY_BYTES"""
+
+
+async def read_upstream_body(response: httpx.Response) -> bytes:
+    """Read a streamed upstream body, aborting once it exceeds MAX_UPSTREAM_BODY_BYTES"""
+    declared = response.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > MAX_UPSTREAM_BODY_BYTES:
+        raise UpstreamBodyTooLarge(f"Upstream response of {declared} bytes exceeds {MAX_UPSTREAM_BODY_BYTES}")
+    
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) > MAX_UPSTREAM_BODY_BYTES:
+            raise UpstreamBodyTooLarge(f"Upstream response exceeds {MAX_UPSTREAM_BODY_BYTES} bytes")
+    return bytes(body)
+
+
+async def send_to_replica(
+    config: GatewayConfig,
+    source: str,
+    body: bytes,
+    timeout: Optional[float],
+    tried: List[Replica]
+) -> Tuple[int, bytes]:
+    """One POST /search to a replica the source's balancer picks (avoiding `tried`)"""
+    balancer = config.balancer(source)
+    replica = balancer.acquire(exclude=tried)
+    tried.append(replica)
+    failed = True
+    start_time = time.monotonic()
+    try:
+        async with replica.client.stream(
+            "POST",
+            "/search",
+            content=body,
+            headers={"Content-Type": "application/json"},
+            timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+        ) as response:
+            failed = response.status_code >= 500
+            content = await read_upstream_body(response)
+    except asyncio.CancelledError:
+        # The caller gave up (or a hedge won); that says nothing about the replica
+        failed = False
+        raise
+    finally:
+        balancer.release(replica, ok=not failed)
+        record_replica_request(source, replica.url, failed)
+    
+    if not failed:
+        hedging.source(source).observe(time.monotonic() - start_time)
+    return response.status_code, content
+
+
+async def hedged_send(
+    config: GatewayConfig,
+    source: str,
+    body: bytes,
+    timeout: Optional[float],
+    tried: List[Replica]
+) -> Tuple[int, bytes]:
+    """
+    send_to_replica(), plus a duplicate to another replica if the first call
+    is still running after the source's observed latency quantile (p95 by
+    default) and the hedge budget allows it. The first good response wins
+    and the other call is cancelled.
+    """
+    state = hedging.source(source)
+    delay = state.delay()
+    started = time.monotonic()
+    primary = asyncio.ensure_future(send_to_replica(config, source, body, timeout, tried))
+    if delay is None or (timeout is not None and delay >= timeout):
+        return await primary
+    
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done or not state.try_hedge():
+            return await primary
+        if not await config.rate_limiter.try_acquire(source):
+            # A hedge is an extra upstream request and must fit the source's quota
+            state.refund()
+            return await primary
+        
+        # The hedge shares the primary's deadline rather than starting a new timeout
+        hedge_timeout = None if timeout is None else max(0.001, timeout - (time.monotonic() - started))
+        hedge = asyncio.ensure_future(send_to_replica(config, source, body, hedge_timeout, tried))
+        hedge_requests_total.labels(source=source).inc()
+        pending.add(hedge)
+        
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            good = [task for task in done if task.exception() is None and task.result()[0] < 500]
+            if good or not pending:
+                task = good[0] if good else done.pop()
+                if task is hedge:
+                    state.wins += 1
+                    hedge_wins_total.labels(source=source).inc()
+                return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def post_upstream(
+    config: GatewayConfig,
+    source: str,
+    params: Dict[str, Any],
+    timeout: Optional[float] = None,
+    content: Optional[bytes] = None
+) -> Tuple[int, bytes]:
+    """
+    POST a search to a source, retrying per the source's retry policy
+    Only connection failures and 502/503/504 are retried; timeouts are not,
+    since another attempt would exceed the caller's time budget
+    
+    `content` is sent as-is when given (the caller's original JSON bytes),
+    so the body is not re-encoded on the way through
+    
+    Returns:
+        (status code, raw response body)
+    """
+    policy = config.sources[source]["retry"]
+    attempts = max(1, int(policy.get("max_attempts", 1))) if policy.get("enabled") else 1
+    body = content if content is not None else json.dumps(params).encode()
+    # Retries and hedges go to a replica not tried yet when there is one
+    tried: List[Replica] = []
+    
+    for attempt in range(1, attempts + 1):
+        error = None
+        try:
+            status_code, response_body = await hedged_send(config, source, body, timeout, tried)
+            if status_code not in (502, 503, 504) or attempt == attempts:
+                return status_code, response_body
+        except (httpx.ConnectError, httpx.RemoteProtocolError, httpx.ReadError) as e:
+            if attempt == attempts:
+                raise
+            error = e
+        
+        if not await config.rate_limiter.try_acquire(source):
+            # Each retry is another upstream request: skip it rather than exceed the quota
+            logger.info(f"Not retrying {source}: rate limit quota used up")
+            if error is not None:
+                raise error
+            return status_code, response_body
+        
+        source_retries_total.labels(source=source).inc()
+        await asyncio.sleep(retry_delay(policy, attempt))
 
 
 def audit_log(source: str, endpoint: str, params: Dict, response_time: float, success: bool, error: str = None):
-    """Log request for audit trail"""
-    log_entry = {
+    """Record a request in the audit trail (non-blocking)"""
+    audit = registry.current.interceptors.audit
+    if not audit.enabled or (not success and not audit.log_errors):
+        return
+    
+    audit_logs.record({
         "timestamp": datetime.utcnow().isoformat(),
         "source": source,
         "endpoint": endpoint,
-        "params": params,
+        "params": summarize_params(params, include_query=audit.log_requests),
         "response_time_ms": round(response_time * 1000, 2),
         "success": success,
         "error": error
-    }
-    audit_logs.append(log_entry)
-    
-    # Keep only last 1000 entries
-    if len(audit_logs) > 1000:
-        audit_logs.pop(0)
+    })
     
-    logger.info(f"Audit: {source} - {endpoint} - {response_time*1000:.2f}ms - {'✓' if success else '✗'}")
+    logger.debug(f"Audit: {source} - {endpoint} - {response_time*1000:.2f}ms - {'✓' if success else '✗'}")
 
 
 @app.get("/")
@@ -129,12 +513,13 @@ async def root():
         "service": "ResearchPilot MCP Gateway",
         "version": "1.0.0",
         "status": "operational",
-        "sources": len(MCP_SERVERS),
+        "sources": len(registry.current.sources),
         "features": [
             "Unified routing",
             "Security interceptors",
             "Audit logging",
             "Rate limiting",
+            "Replica load balancing",
             "Health monitoring"
         ]
     }
@@ -142,153 +527,424 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Gateway health check"""
-    # Check connectivity to all MCP servers
-    server_health = {}
-    
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for source_name, config in MCP_SERVERS.items():
-            try:
-                response = await client.get(f"{config['url']}/health")
-                server_health[source_name] = {
-                    "status": "healthy" if response.status_code == 200 else "degraded",
-                    "url": config['url']
-                }
-            except Exception as e:
-                server_health[source_name] = {
-                    "status": "unhealthy",
-                    "error": str(e)
-                }
-    
-    all_healthy = all(s["status"] == "healthy" for s in server_health.values())
+    """Gateway health check (served from the latest background probe)"""
+    all_healthy = all(s["status"] == "healthy" for s in health_snapshots.values())
     
     return {
         "status": "healthy" if all_healthy else "degraded",
         "gateway": "operational",
-        "sources": server_health,
+        "sources": health_snapshots,
         "timestamp": datetime.utcnow().isoformat()
     }
 
 
+def shortened_timeout(config: GatewayConfig, source: str, timeout: Optional[float]) -> bool:
+    """Whether the caller cut the source's configured timeout short"""
+    return timeout is not None and timeout < config.sources[source]["timeout"]
+
+
+async def call_source(
+    config: GatewayConfig,
+    source: str,
+    params: Dict[str, Any],
+    timeout: Optional[float] = None,
+    content: Optional[bytes] = None
+) -> Dict[str, Any]:
+    """
+    Rate-limit and send one search to a source
+    Returns an upstream record with the raw response body instead of raising
+    """
+    try:
+        await rate_limit_check(config, source)
+    except RateLimitExceeded as e:
+        return {
+            "status": "error",
+            "error": f"Rate limit exceeded: {e.reason}",
+            "http_status": 429,
+            "retry_after": e.retry_after_header,
+            "cacheable": False
+        }
+    
+    upstream_start = time.time()
+    try:
+        status_code, body = await post_upstream(config, source, params, timeout, content)
+        
+        if status_code == 200:
+            if JSON_BODY_START.match(body):
+                record = {"status": "success", "content": body}
+            else:
+                # Never cache (or pass through) a 200 that is plainly not JSON
+                record = {"status": "error", "error": "Invalid JSON from source", "cacheable": False}
+        else:
+            record = {
+                "status": "error",
+                "error": f"HTTP {status_code}",
+                "http_status": status_code,
+                # Client errors depend on the request, not on upstream health
+                "cacheable": status_code >= 500
+            }
+    except httpx.TimeoutException:
+        # A timeout under a caller-shortened deadline says nothing about the source
+        record = {
+            "status": "timeout",
+            "error": "Source timeout",
+            "cacheable": not shortened_timeout(config, source, timeout)
+        }
+    except UpstreamBodyTooLarge as e:
+        record = {"status": "error", "error": str(e)}
+    except Exception as e:
+        record = {"status": "error", "error": str(e)}
+    
+    await record_source_request(source, record["status"], time.time() - upstream_start)
+    return record
+
+
+async def cached_call_source(
+    config: GatewayConfig,
+    source: str,
+    params: Dict[str, Any],
+    timeout: Optional[float] = None,
+    bypass_cache: bool = False,
+    content: Optional[bytes] = None
+) -> Tuple[Dict[str, Any], str]:
+    """
+    call_source() behind the response cache
+    Identical concurrent calls share one upstream request; the shared request
+    pins the config generation so a reload cannot close its client mid-flight
+    """
+    async def fetch() -> Dict[str, Any]:
+        config.pin()
+        try:
+            return await call_source(config, source, params, timeout, content)
+        finally:
+            config.release()
+    
+    key = cache_key(source, params)
+    # Only coalesce with fetches that run under the same deadline: joining a
+    # shorter one would hand its timeout to a caller willing to wait longer
+    flight = f"{key}@{timeout}" if shortened_timeout(config, source, timeout) else key
+    return await response_cache.get_or_fetch(source, key, fetch, bypass=bypass_cache, flight=flight)
+
+
+async def read_json_body(request: Request) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Read the request body with a size limit
+    Returns the parsed JSON (for interceptors and cache keys) and the raw bytes
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > MAX_REQUEST_BODY_BYTES:
+        raise HTTPException(status_code=413, detail=f"Request body exceeds {MAX_REQUEST_BODY_BYTES} bytes")
+    
+    raw = bytearray()
+    async for chunk in request.stream():
+        raw += chunk
+        if len(raw) > MAX_REQUEST_BODY_BYTES:
+            raise HTTPException(status_code=413, detail=f"Request body exceeds {MAX_REQUEST_BODY_BYTES} bytes")
+    
+    try:
+        params = json.loads(raw)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {str(e)}")
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=400, detail="JSON body must be an object")
+    return params, bytes(raw)
+
+
+def wants_passthrough(request: Request, passthrough: bool) -> bool:
+    """Passthrough is requested with ?passthrough=true or an X-Passthrough: 1 header"""
+    return passthrough or request.headers.get("x-passthrough", "").lower() in ("1", "true")
+
+
+def wants_fresh(request: Request) -> bool:
+    """Whether the caller asked to skip cached responses (Cache-Control: no-cache)"""
+    return "no-cache" in request.headers.get("cache-control", "").lower()
+
+
 @app.post("/query/{source}")
-async def query_source(source: str, request: Request):
+async def query_source(source: str, request: Request, passthrough: bool = False):
     """
     Route a query to a specific MCP source with security checks
+    
+    In passthrough mode (`?passthrough=true` or `X-Passthrough: 1`) the
+    upstream JSON body is returned byte-for-byte instead of being wrapped in
+    the {"data", "response_time_ms"} envelope; timing moves to headers
     """
     start_time = time.time()
     
     # Get request body
-    body = await request.json()
+    body, raw_body = await read_json_body(request)
     
-    # Security checks
-    if not sql_injection_check(body):
-        audit_log(source, "search", body, time.time() - start_time, False, error="SQL injection blocked")
-        raise HTTPException(status_code=400, detail="Potential SQL injection detected")
+    with registry.use() as config:
+        # Security checks
+        violation = security_check(config, body)
+        if violation:
+            audit_log(source, "search", body, time.time() - start_time, False, error=violation)
+            raise HTTPException(status_code=400, detail=f"Security violation detected: {violation}")
+        
+        if source not in config.sources:
+            raise HTTPException(status_code=404, detail=f"Unknown source: {source}")
+        
+        record, cache_status = await cached_call_source(
+            config, source, body, bypass_cache=wants_fresh(request), content=raw_body
+        )
     
-    if not rate_limit_check(source):
-        audit_log(source, "search", body, time.time() - start_time, False, error="Rate limit exceeded")
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+    response_time = time.time() - start_time
+    headers = {
+        "X-Cache": cache_status,
+        "X-Response-Time-Ms": f"{response_time * 1000:.2f}"
+    }
+    
+    if record["status"] == "success":
+        audit_log(source, "search", body, response_time, True)
+        
+        if wants_passthrough(request, passthrough):
+            return Response(
+                content=record["content"],
+                media_type="application/json",
+                headers={**headers, "X-Passthrough": "1"}
+            )
+        
+        try:
+            data = json.loads(record["content"])
+        except ValueError as e:
+            response_cache.discard(cache_key(source, body))
+            audit_log(source, "search", body, response_time, False, error=str(e))
+            raise HTTPException(status_code=502, detail=f"Source error: Invalid JSON from source: {e}", headers=headers)
+        
+        return JSONResponse(
+            {
+                "data": data,
+                "response_time_ms": round(response_time * 1000, 2)
+            },
+            headers=headers
+        )
+    
+    audit_log(source, "search", body, response_time, False, error=record["error"])
+    
+    if record.get("http_status") == 429 and "retry_after" in record:
+        raise HTTPException(
+            status_code=429,
+            detail=record["error"],
+            headers={"Retry-After": record["retry_after"], **headers}
+        )
+    if record["status"] == "timeout":
+        raise HTTPException(status_code=504, detail="Source timeout", headers=headers)
+    if record.get("http_status"):
+        raise HTTPException(status_code=502, detail=f"MCP source error: {record['http_status']}", headers=headers)
+    raise HTTPException(status_code=502, detail=f"Source error: {record['error']}", headers=headers)
+
+
+async def fetch_source(
+    config: GatewayConfig,
+    source: str,
+    params: Dict[str, Any],
+    timeout: Optional[float] = None,
+    content: Optional[bytes] = None
+) -> Dict[str, Any]:
+    """
+    Query one MCP source and return a result record instead of raising
+    Used by the fan-out endpoints, where one failing source must not fail the rest
+    """
+    source_timeout = config.sources[source]["timeout"]
+    timeout = min(timeout, source_timeout) if timeout else source_timeout
+    start_time = time.time()
     
-    # Get source configuration
-    if source not in MCP_SERVERS:
-        raise HTTPException(status_code=404, detail=f"Unknown source: {source}")
+    record, cache_status = await cached_call_source(config, source, params, timeout, content=content)
     
-    source_config = MCP_SERVERS[source]
-    source_url = source_config["url"]
-    timeout = source_config["timeout"]
+    result = {"source": source, "status": record["status"]}
+    if record["status"] == "success":
+        try:
+            result["data"] = json.loads(record["content"])
+        except ValueError as e:
+            response_cache.discard(cache_key(source, params))
+            result["status"] = "error"
+            result["error"] = f"Invalid JSON from source: {e}"
+    else:
+        result["error"] = record["error"]
+        for field in ("http_status", "retry_after"):
+            if field in record:
+                result[field] = record[field]
+    
+    result["cache"] = cache_status
+    result["response_time_ms"] = round((time.time() - start_time) * 1000, 2)
+    return result
+
+
+def ndjson_response(config: GatewayConfig, lines: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """
+    Stream records as NDJSON
+    Keeps its own pin on the config generation until the stream ends
+    """
+    config.pin()
+    
+    async def body():
+        try:
+            async for record in lines:
+                yield json.dumps(record) + "\n"
+        finally:
+            config.release()
+    
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+async def as_completed_within(tasks: Dict[asyncio.Task, str], deadline: Optional[float] = None):
+    """
+    Yield source results as their tasks finish
+    At the deadline the remaining tasks are cancelled and reported as late
+    """
+    loop = asyncio.get_event_loop()
+    start_time = loop.time()
+    deadline_at = start_time + deadline if deadline else None
+    pending = set(tasks)
     
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                f"{source_url}/search",
-                json=body
-            )
-            response_time = time.time() - start_time
+        while pending:
+            timeout = None if deadline_at is None else max(0.0, deadline_at - loop.time())
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
             
-            # Update metrics
-            metrics["total_requests"] += 1
-            metrics["requests_by_source"][source] += 1
-            metrics["avg_response_times"][source].append(response_time)
+            for task in done:
+                yield task.result()
             
-            if response.status_code == 200:
-                metrics["successful_requests"] += 1
-                audit_log(source, "search", body, response_time, True)
-                
-                return {
-                    "data": response.json(),
-                    "response_time_ms": round(response_time * 1000, 2)
-                }
-            else:
-                metrics["failed_requests"] += 1
-                error_detail = f"MCP source error: {response.status_code}"
-                audit_log(source, "search", body, response_time, False, error=error_detail)
-                raise HTTPException(status_code=502, detail=error_detail)
-                
-    except httpx.TimeoutException:
-        response_time = time.time() - start_time
-        metrics["total_requests"] += 1
-        metrics["failed_requests"] += 1
-        audit_log(source, "search", body, response_time, False, error="Timeout")
-        raise HTTPException(status_code=504, detail="Source timeout")
-    except Exception as e:
-        response_time = time.time() - start_time
-        metrics["total_requests"] += 1
-        metrics["failed_requests"] += 1
-        audit_log(source, "search", body, response_time, False, error=str(e))
-        raise HTTPException(status_code=502, detail=f"Source error: {str(e)}")
+            if pending and deadline_at is not None and loop.time() >= deadline_at:
+                elapsed_ms = round((loop.time() - start_time) * 1000, 2)
+                for task in pending:
+                    task.cancel()
+                    yield {
+                        "source": tasks[task],
+                        "status": "late",
+                        "error": "Deadline exceeded",
+                        "response_time_ms": elapsed_ms
+                    }
+                pending = set()
+    finally:
+        for task in pending:
+            task.cancel()
 
 
 @app.post("/query-all")
-async def query_all_sources(request: Request):
+async def query_all_sources(
+    request: Request,
+    stream: bool = False,
+    sources: Optional[str] = None,
+    deadline_ms: Optional[int] = None
+):
     """
-    Query all MCP sources in parallel
+    Query all (or a comma-separated subset of) MCP sources in parallel
+    
+    With `stream=true` the response is NDJSON, one line per source as each
+    finishes. Sources still running at `deadline_ms` are cancelled and
+    reported as late.
     """
-    try:
-        params = await request.json()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {str(e)}")
+    params, raw_body = await read_json_body(request)
     
-    # Security check
-    if not sql_injection_check(params):
-        raise HTTPException(status_code=400, detail="Security violation detected")
+    with registry.use() as config:
+        # Security check
+        violation = security_check(config, params)
+        if violation:
+            raise HTTPException(status_code=400, detail=f"Security violation detected: {violation}")
+        
+        target_sources = [s.strip() for s in sources.split(",") if s.strip()] if sources else list(config.sources)
+        unknown = [s for s in target_sources if s not in config.sources]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Unknown sources: {unknown}")
+        
+        deadline = deadline_ms / 1000 if deadline_ms and deadline_ms > 0 else None
+        
+        # Execute all queries in parallel
+        tasks = {
+            asyncio.create_task(fetch_source(config, name, params, content=raw_body)): name
+            for name in target_sources
+        }
+        
+        if stream:
+            return ndjson_response(config, as_completed_within(tasks, deadline))
+        
+        results = [result async for result in as_completed_within(tasks, deadline)]
     
-    # Query all sources in parallel
-    async def query_source_async(source: str, config: Dict):
-        try:
-            async with httpx.AsyncClient(timeout=config['timeout']) as client:
-                start_time = time.time()
-                response = await client.post(f"{config['url']}/search", json=params)
-                response_time = time.time() - start_time
-                
-                if response.status_code == 200:
-                    return {
-                        "source": source,
-                        "status": "success",
-                        "data": response.json(),
-                        "response_time_ms": round(response_time * 1000, 2)
-                    }
-                else:
-                    return {
-                        "source": source,
-                        "status": "error",
-                        "error": f"HTTP {response.status_code}",
-                        "response_time_ms": round(response_time * 1000, 2)
-                    }
-        except Exception as e:
-            return {
-                "source": source,
-                "status": "error",
-                "error": str(e)
-            }
+    return {
+        "results": results,
+        "total_sources": len(target_sources),
+        "successful": sum(1 for r in results if r["status"] == "success"),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+class BatchItem(BaseModel):
+    """A single lookup in a batch: one query over a subset of sources"""
+    id: str = Field(..., description="Caller-chosen item id used to key the results")
+    query: str = Field(..., min_length=1, description="Search query")
+    sources: Optional[List[str]] = Field(default=None, description="Sources to query (defaults to all)")
+    max_results: int = Field(default=10, ge=1, le=50, description="Maximum results per source")
+    timeout: Optional[float] = Field(default=None, gt=0, description="Per-source timeout in seconds")
+
+
+class BatchRequest(BaseModel):
+    """Batch of lookups executed in one round trip"""
+    items: List[BatchItem] = Field(..., min_length=1)
+    stream: bool = Field(default=False, description="Stream NDJSON lines as each lookup finishes")
+
+
+@app.post("/query-batch")
+async def query_batch(batch: BatchRequest):
+    """
+    Run several (query, sources) lookups with bounded concurrency
+    Returns results keyed by item id, or streams one NDJSON line per
+    (item, source) as each finishes when `stream` is set
+    """
+    if len(batch.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many items (max {MAX_BATCH_ITEMS})")
+    
+    if len({item.id for item in batch.items}) != len(batch.items):
+        raise HTTPException(status_code=400, detail="Item ids must be unique")
     
-    # Execute all queries in parallel
-    tasks = [query_source_async(name, config) for name, config in MCP_SERVERS.items()]
-    results = await asyncio.gather(*tasks)
+    with registry.use() as config:
+        for item in batch.items:
+            unknown = [s for s in item.sources or [] if s not in config.sources]
+            if unknown:
+                raise HTTPException(status_code=404, detail=f"Unknown sources in item {item.id}: {unknown}")
+            
+            violation = security_check(config, {"query": item.query})
+            if violation:
+                raise HTTPException(status_code=400, detail=f"Security violation detected in item {item.id}: {violation}")
+        
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        
+        async def run_lookup(item: BatchItem, source: str) -> Dict[str, Any]:
+            params = {"query": item.query, "max_results": item.max_results}
+            async with semaphore:
+                result = await fetch_source(config, source, params, item.timeout)
+            
+            success = result["status"] == "success"
+            audit_log(source, "search", params, result["response_time_ms"] / 1000, success, error=result.get("error"))
+            result["id"] = item.id
+            return result
+        
+        tasks = [
+            asyncio.create_task(run_lookup(item, source))
+            for item in batch.items
+            for source in (item.sources or list(config.sources))
+        ]
+        
+        if batch.stream:
+            async def completed():
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        yield await next_done
+                finally:
+                    for task in tasks:
+                        task.cancel()
+            
+            return ndjson_response(config, completed())
+        
+        results: Dict[str, List[Dict[str, Any]]] = {item.id: [] for item in batch.items}
+        for result in await asyncio.gather(*tasks):
+            results[result.pop("id")].append(result)
     
     return {
         "results": results,
-        "total_sources": len(MCP_SERVERS),
-        "successful": sum(1 for r in results if r["status"] == "success"),
+        "total_items": len(batch.items),
+        "total_lookups": len(tasks),
+        "successful": sum(1 for r in results.values() for x in r if x["status"] == "success"),
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -296,51 +952,101 @@ async def query_all_sources(request: Request):
 @app.get("/sources")
 async def list_sources():
     """List all available MCP sources"""
+    config = registry.current
     return {
         "sources": [
             {
                 "id": name,
-                "name": config["name"],
-                "url": config["url"],
-                "timeout": config["timeout"]
+                "name": source["name"],
+                "url": source["url"],
+                "replicas": source["replicas"],
+                "timeout": source["timeout"],
+                "retry": source["retry"],
+                "health_check": source["health_check"]
             }
-            for name, config in MCP_SERVERS.items()
+            for name, source in config.sources.items()
         ],
-        "total": len(MCP_SERVERS)
+        "total": len(config.sources),
+        "config_version": config.version
+    }
+
+
+@app.post("/config/reload")
+async def reload_config():
+    """Reload gateway/config.json now instead of waiting for the file watcher"""
+    reloaded = registry.reload(force=True)
+    return {
+        "reloaded": reloaded,
+        "config_version": registry.current.version,
+        "sources": list(registry.current.sources)
     }
 
 
 @app.get("/metrics")
 async def get_metrics():
-    """Get gateway metrics"""
-    avg_times = {}
-    for source, times in metrics["avg_response_times"].items():
-        if times:
-            avg_times[source] = round(sum(times) / len(times) * 1000, 2)
-        else:
-            avg_times[source] = 0
+    """Prometheus metrics (aggregated across workers in multiprocess mode)"""
+    return Response(content=telemetry.export(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/metrics/summary")
+async def get_metrics_summary():
+    """Per-source request counts and latency quantiles as JSON"""
+    sources = await telemetry.source_summary()
+    total = sum(n for s in sources.values() for n in s.get("requests", {}).values())
+    successful = sum(s.get("requests", {}).get("success", 0) for s in sources.values())
     
     return {
-        "total_requests": metrics["total_requests"],
-        "successful_requests": metrics["successful_requests"],
-        "failed_requests": metrics["failed_requests"],
-        "success_rate": round(
-            metrics["successful_requests"] / metrics["total_requests"] * 100, 2
-        ) if metrics["total_requests"] > 0 else 0,
-        "requests_by_source": metrics["requests_by_source"],
-        "avg_response_times_ms": avg_times
+        "total_requests": total,
+        "successful_requests": successful,
+        "failed_requests": total - successful,
+        "success_rate": round(successful / total * 100, 2) if total > 0 else 0,
+        "sources": sources,
+        "state_backend": shared_state.name,
+        "rate_limits": registry.current.rate_limiter.stats(),
+        "load_balancing": {name: balancer.stats() for name, balancer in registry.current.balancers.items()},
+        "hedging": hedging.stats(),
+        "response_cache": response_cache.stats()
     }
 
 
 @app.get("/audit-logs")
-async def get_audit_logs(limit: int = 100):
-    """Get recent audit logs"""
+async def get_audit_logs(
+    limit: int = Query(default=100, ge=1, le=10000),
+    source: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    persisted: bool = False
+):
+    """
+    Get audit logs, oldest first, filtered by source and time range
+    Reads the in-memory ring buffer, or the persisted files with `persisted=true`
+    The ring buffer belongs to the worker that answers; the persisted files
+    cover every worker writing to the same AUDIT_LOG_DIR
+    """
+    filters = {
+        "source": source,
+        "since": to_utc_iso(since),
+        "until": to_utc_iso(until),
+        "limit": limit
+    }
+    logs = await audit_logs.query_persisted(**filters) if persisted else audit_logs.query(**filters)
+    
     return {
-        "logs": audit_logs[-limit:],
-        "total": len(audit_logs)
+        "logs": logs,
+        "total": len(logs),
+        "audit": audit_logs.stats()
     }
 
 
+def to_utc_iso(value: Optional[datetime]) -> Optional[str]:
+    """Naive-UTC ISO string, comparable with audit timestamps"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -0,0 +1,231 @@
+"""
+Rate limiting for MCP sources
+Per-source token buckets with a bounded wait queue (admission control);
+buckets live in a state backend so workers can share them
+"""
+import asyncio
+import math
+import time
+import logging
+from typing import Dict, Any, Optional
+
+from shared_state import LocalBackend, StateBackend
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted within its wait deadline"""
+
+    def __init__(self, source: str, retry_after: float, reason: str):
+        self.source = source
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"Rate limit exceeded for {source}: {reason}")
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds (at least 1)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """
+    Token bucket with reservations, stored in a state backend
+
+    A request takes a token immediately if one is available; otherwise it
+    reserves the next future token (the balance goes negative) and waits
+    until that token has been refilled. Reservations are served in order.
+    With a shared backend every worker draws from the same bucket.
+    """
+
+    def __init__(self, key: str, requests_per_minute: float, burst: int, backend: StateBackend):
+        self.key = key
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.backend = backend
+
+    async def reserve(self) -> float:
+        """Reserve one token and return how long to wait before using it"""
+        return await self.backend.reserve_token(self.key, self.rate, self.burst)
+
+    async def cancel(self) -> None:
+        """Give back a reserved token that will not be used"""
+        await self.backend.return_token(self.key, self.rate, self.burst)
+
+    async def wait_time(self) -> float:
+        """Time until a new reservation could be used, without reserving"""
+        return await self.backend.token_wait(self.key, self.rate, self.burst)
+
+
+class SourceRateLimiter:
+    """
+    Admission control for one source
+    Requests wait for a token in a bounded queue, up to a wait deadline
+    """
+
+    def __init__(
+        self,
+        source: str,
+        requests_per_minute: float = 60,
+        burst: int = 10,
+        max_queue: int = 50,
+        max_wait_seconds: float = 5.0,
+        backend: Optional[StateBackend] = None,
+    ):
+        self.source = source
+        self.settings = (requests_per_minute, burst, max_queue, max_wait_seconds)
+        self.bucket = TokenBucket(f"ratelimit|{source}", requests_per_minute, burst, backend or LocalBackend())
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.extra_admitted = 0
+        self.extra_skipped = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def acquire(self, max_wait: Optional[float] = None) -> float:
+        """
+        Wait for a token
+
+        Args:
+            max_wait: Wait deadline in seconds (defaults to the configured one)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the queue is full or the wait would exceed the deadline
+        """
+        max_wait = self.max_wait_seconds if max_wait is None else min(max_wait, self.max_wait_seconds)
+
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise RateLimitExceeded(self.source, await self.bucket.wait_time(), "queue full")
+
+        wait = await self.bucket.reserve()
+        if wait > max_wait:
+            await self.bucket.cancel()
+            self.rejected += 1
+            raise RateLimitExceeded(self.source, wait, f"wait of {wait:.1f}s exceeds {max_wait:.1f}s")
+
+        if wait > 0:
+            self.queued += 1
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                await asyncio.shield(self.bucket.cancel())
+                raise
+            finally:
+                self.queue_depth -= 1
+
+        self.admitted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    async def try_acquire(self) -> bool:
+        """
+        Take a token only if one is available right now
+        Used for extra upstream attempts (retries, hedges), which are skipped
+        rather than queued when the source's quota is used up
+        """
+        wait = await self.bucket.reserve()
+        if wait > 0:
+            await self.bucket.cancel()
+            self.extra_skipped += 1
+            return False
+        self.extra_admitted += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and wait-time metrics"""
+        return {
+            "requests_per_minute": round(self.bucket.rate * 60, 2),
+            "burst": self.bucket.burst,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "extra_admitted": self.extra_admitted,
+            "extra_skipped": self.extra_skipped,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 2) if self.admitted else 0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+class RateLimiter:
+    """Per-source rate limiters built from the gateway config"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._limiters: Dict[str, SourceRateLimiter] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        sources,
+        previous: Optional["RateLimiter"] = None,
+        backend: Optional[StateBackend] = None,
+    ) -> "RateLimiter":
+        """
+        Build limiters from the `rate_limit` interceptor in the gateway config
+        Sources may override the defaults with their own `rate_limit` block
+
+        Args:
+            config: Parsed gateway config.json
+            sources: Source names to create limiters for
+            previous: Limiter being replaced; sources with unchanged settings
+                keep their queue and counters
+            backend: Where token buckets are stored (per-process by default)
+        """
+        interceptor = next(
+            (i for i in config.get("security", {}).get("interceptors", []) if i.get("type") == "rate_limit"),
+            {}
+        )
+        defaults = interceptor.get("config", {})
+        overrides = {s["name"]: s.get("rate_limit", {}) for s in config.get("sources", [])}
+
+        limiter = cls(enabled=interceptor.get("enabled", True))
+        for source in sources:
+            settings = {**defaults, **overrides.get(source, {})}
+            source_limiter = SourceRateLimiter(
+                source,
+                requests_per_minute=settings.get("requests_per_minute", 60),
+                burst=settings.get("burst", 10),
+                max_queue=settings.get("max_queue", 50),
+                max_wait_seconds=settings.get("max_wait_seconds", 5.0),
+                backend=backend,
+            )
+            old = previous._limiters.get(source) if previous else None
+            limiter._limiters[source] = old if old and old.settings == source_limiter.settings else source_limiter
+
+        logger.info(f"Rate limiter {'enabled' if limiter.enabled else 'disabled'} for {len(limiter._limiters)} sources")
+        return limiter
+
+    async def acquire(self, source: str, max_wait: Optional[float] = None) -> float:
+        """Wait for a token for a source (no-op when disabled or the source is unknown)"""
+        limiter = self._limiters.get(source)
+        if not self.enabled or limiter is None:
+            return 0.0
+        return await limiter.acquire(max_wait)
+
+    async def try_acquire(self, source: str) -> bool:
+        """Take a token for an extra attempt without waiting (always True when disabled)"""
+        limiter = self._limiters.get(source)
+        if not self.enabled or limiter is None:
+            return True
+        return await limiter.try_acquire()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics for all sources"""
+        return {source: limiter.stats() for source, limiter in self._limiters.items()}
@@ -0,0 +1,275 @@
+"""
+Source registry
+Gateway sources, replicas, retry policy and interceptors loaded from
+gateway/config.json and hot-reloaded when the file changes
+"""
+import asyncio
+import json
+import logging
+import os
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, Optional, Set
+
+import httpx
+
+from interceptors import InterceptorPipeline
+from load_balancer import Replica, SourceBalancer
+from rate_limiter import RateLimiter
+from shared_state import StateBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY = {"enabled": False, "max_attempts": 1, "backoff": "exponential"}
+DEFAULT_HEALTH_CHECK = {"enabled": True, "interval": 30, "path": "/health"}
+
+
+class ConfigError(ValueError):
+    """Raised when the gateway config is invalid"""
+
+
+def parse_sources(config: Dict[str, Any], defaults: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the source registry from the `sources` list of the config
+    A source has one `endpoint` or a list of replica `endpoints`; disabled
+    sources are left out and without a `sources` list the defaults are used
+    """
+    entries = config.get("sources")
+    if entries is None:
+        return {
+            name: {**source, "replicas": [source["url"]], "retry": DEFAULT_RETRY,
+                   "health_check": DEFAULT_HEALTH_CHECK, "cache": {}, "routing": {}, "hedging": {}}
+            for name, source in defaults.items()
+        }
+
+    sources = {}
+    for entry in entries:
+        name = entry.get("name")
+        replicas = entry.get("endpoints") or ([entry["endpoint"]] if entry.get("endpoint") else [])
+        if not name or not replicas:
+            raise ConfigError(f"Source entries need a name and an endpoint: {entry}")
+        if name in sources:
+            raise ConfigError(f"Duplicate source: {name}")
+        if not entry.get("enabled", True):
+            continue
+
+        sources[name] = {
+            "url": replicas[0].rstrip("/"),
+            "replicas": [url.rstrip("/") for url in replicas],
+            "name": entry.get("display_name", name),
+            "timeout": float(entry.get("timeout", 30)),
+            "retry": {**DEFAULT_RETRY, **entry.get("retry", {})},
+            "health_check": {**DEFAULT_HEALTH_CHECK, **entry.get("health_check", {})},
+            "cache": entry.get("cache", {}),
+            "routing": entry.get("routing", {}),
+            "hedging": entry.get("hedging", {}),
+        }
+    return sources
+
+
+class GatewayConfig:
+    """
+    One immutable generation of the gateway config
+    Requests hold a reference for their whole lifetime, so a reload never
+    changes the sources, clients or limits of a request that is in flight
+    """
+
+    def __init__(
+        self,
+        version: int,
+        raw: Dict[str, Any],
+        sources: Dict[str, Dict[str, Any]],
+        balancers: Dict[str, SourceBalancer],
+        rate_limiter: RateLimiter,
+        interceptors: InterceptorPipeline,
+    ):
+        self.version = version
+        self.raw = raw
+        self.sources = sources
+        self.balancers = balancers
+        self.rate_limiter = rate_limiter
+        self.interceptors = interceptors
+        self.in_flight = 0
+
+    @property
+    def routing(self) -> Dict[str, Any]:
+        return self.raw.get("routing", {})
+
+    def balancer(self, source: str) -> SourceBalancer:
+        return self.balancers[source]
+
+    def clients(self) -> Set[httpx.AsyncClient]:
+        return {replica.client for balancer in self.balancers.values() for replica in balancer.replicas}
+
+    def pin(self) -> "GatewayConfig":
+        """Keep this generation alive for work that outlives the request (release() when done)"""
+        self.in_flight += 1
+        return self
+
+    def release(self) -> None:
+        """End a request started with ConfigRegistry.acquire()"""
+        self.in_flight -= 1
+
+
+class ConfigRegistry:
+    """
+    Holds the current GatewayConfig and swaps in a new one when the config
+    file changes. Clients of replaced or removed sources are closed only after
+    the requests using the old generation have drained.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        defaults: Dict[str, Dict[str, Any]],
+        client_factory: Callable[[Dict[str, Any]], httpx.AsyncClient],
+        reload_interval: float = 2.0,
+        drain_timeout: float = 60.0,
+        state: Optional[StateBackend] = None,
+    ):
+        self.path = path
+        self.defaults = defaults
+        self.client_factory = client_factory
+        self.reload_interval = reload_interval
+        self.drain_timeout = drain_timeout
+        self.state = state
+
+        self.current = self._build({}, None)
+        self._mtime: Optional[float] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._retiring: Dict[asyncio.Task, GatewayConfig] = {}
+        self._listeners: list = []
+
+    def _read(self) -> Dict[str, Any]:
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _build(self, raw: Dict[str, Any], previous: Optional[GatewayConfig]) -> GatewayConfig:
+        """
+        Build a new generation, reusing replicas (with their clients and
+        load-balancing state) and rate limiters whose settings did not change
+        """
+        sources = parse_sources(raw, self.defaults)
+
+        balancers = {}
+        for name, source in sources.items():
+            old = previous.sources.get(name) if previous else None
+            reusable = {}
+            if old and old["timeout"] == source["timeout"]:
+                reusable = {replica.url: replica for replica in previous.balancers[name].replicas}
+
+            replicas = [
+                reusable.get(url) or Replica(url, self.client_factory({**source, "url": url}))
+                for url in source["replicas"]
+            ]
+            balancers[name] = SourceBalancer(name, replicas, {**raw.get("routing", {}), **source["routing"]})
+
+        return GatewayConfig(
+            version=previous.version + 1 if previous else 1,
+            raw=raw,
+            sources=sources,
+            balancers=balancers,
+            rate_limiter=RateLimiter.from_config(
+                raw,
+                sources.keys(),
+                previous=previous.rate_limiter if previous else None,
+                backend=self.state,
+            ),
+            interceptors=InterceptorPipeline.from_config(raw),
+        )
+
+    def add_listener(self, callback: Callable[[GatewayConfig, GatewayConfig], None]) -> None:
+        """Call `callback(old, new)` after every successful reload"""
+        self._listeners.append(callback)
+
+    @contextmanager
+    def use(self) -> Iterator[GatewayConfig]:
+        """Pin the current config generation for the duration of a request"""
+        config = self.acquire()
+        try:
+            yield config
+        finally:
+            config.release()
+
+    def acquire(self) -> GatewayConfig:
+        """Pin the current generation; the caller must call release() on it"""
+        return self.current.pin()
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Load the config file if it changed since the last load
+        An invalid file is logged and ignored; the current config stays active
+
+        Returns:
+            True if a new config generation was activated
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            if self._mtime is None and force:
+                logger.warning(f"Could not load gateway config from {self.path}, using defaults: {e}")
+            return False
+
+        if mtime == self._mtime and not force:
+            return False
+        self._mtime = mtime
+
+        try:
+            new = self._build(self._read(), self.current)
+        except Exception as e:
+            logger.error(f"Ignoring invalid gateway config {self.path}: {e}")
+            return False
+
+        old, self.current = self.current, new
+        logger.info(f"Gateway config v{new.version} active: {list(new.sources)}")
+
+        for callback in self._listeners:
+            callback(old, new)
+
+        if old.in_flight or old.clients() - new.clients():
+            task = asyncio.ensure_future(self._retire(old))
+            self._retiring[task] = old
+            task.add_done_callback(lambda t: self._retiring.pop(t, None))
+        return True
+
+    async def _retire(self, old: GatewayConfig) -> None:
+        """Wait for the old generation to drain, then close the clients no live generation uses"""
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + self.drain_timeout
+        while old.in_flight > 0 and loop.time() < deadline:
+            await asyncio.sleep(0.1)
+
+        if old.in_flight > 0:
+            logger.warning(f"Config v{old.version} still had {old.in_flight} requests after {self.drain_timeout}s")
+
+        live = self.current.clients()
+        for other in self._retiring.values():
+            if other is not old:
+                live.update(other.clients())
+        stale = [client for client in old.clients() if client not in live]
+        await asyncio.gather(*(client.aclose() for client in stale), return_exceptions=True)
+        logger.info(f"Config v{old.version} retired ({len(stale)} clients closed)")
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Config reload failed: {e}")
+
+    async def start(self) -> None:
+        """Load the config file and start watching it for changes"""
+        self.reload(force=True)
+        if self.reload_interval > 0:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Stop watching and close every client"""
+        if self._watcher:
+            self._watcher.cancel()
+        clients = self.current.clients()
+        for task, old in list(self._retiring.items()):
+            task.cancel()
+            clients.update(old.clients())
+
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
@@ -0,0 +1,228 @@
+"""
+Response cache
+LRU cache of upstream source responses with per-source TTLs,
+stale-while-revalidate, negative caching and request coalescing
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cache lookup outcomes (also used as metric labels)
+HIT = "hit"
+STALE = "stale"
+NEGATIVE = "negative"
+MISS = "miss"
+COALESCED = "coalesced"
+BYPASS = "bypass"
+
+
+def cache_key(source: str, body: Dict[str, Any]) -> str:
+    """Key on the source and the canonical JSON body (sorted keys, collapsed query whitespace)"""
+    if isinstance(body.get("query"), str):
+        body = {**body, "query": " ".join(body["query"].split())}
+    return f"{source}:{json.dumps(body, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+class CacheEntry:
+    """A cached upstream response record and its freshness window"""
+
+    __slots__ = ("record", "size", "fresh_until", "stale_until", "negative")
+
+    def __init__(self, record: Dict[str, Any], size: int, fresh_until: float, stale_until: float, negative: bool):
+        self.record = record
+        self.size = size
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.negative = negative
+
+
+class ResponseCache:
+    """
+    In-process LRU keyed by (source, canonical body)
+
+    Fresh entries are served directly. Entries past their TTL but within the
+    stale window are served immediately while one background refresh runs.
+    Errors are cached for a short negative TTL. Concurrent misses for the
+    same key share a single upstream request.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300,
+        stale_ttl: float = 300,
+        negative_ttl: float = 5,
+        ttls: Optional[Dict[str, float]] = None,
+        on_lookup: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.on_lookup = on_lookup
+        self.configure({
+            "enabled": enabled,
+            "max_entries": max_entries,
+            "max_bytes": max_bytes,
+            "default_ttl": default_ttl,
+            "stale_while_revalidate": stale_ttl,
+            "negative_ttl": negative_ttl,
+        }, ttls or {})
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.counts: Dict[str, int] = {HIT: 0, STALE: 0, NEGATIVE: 0, MISS: 0, COALESCED: 0, BYPASS: 0}
+        self.evictions = 0
+
+    def configure(self, settings: Dict[str, Any], ttls: Dict[str, float]) -> None:
+        """Apply the `cache` config section and per-source TTLs (safe to call on reload)"""
+        self.enabled = settings.get("enabled", True)
+        self.max_entries = settings.get("max_entries", 10000)
+        self.max_bytes = settings.get("max_bytes", 64 * 1024 * 1024)
+        self.default_ttl = settings.get("default_ttl", 300)
+        self.stale_ttl = settings.get("stale_while_revalidate", 300)
+        self.negative_ttl = settings.get("negative_ttl", 5)
+        self.ttls = dict(ttls)
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    async def get_or_fetch(
+        self,
+        source: str,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        bypass: bool = False,
+        flight: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Get the record for a key, calling `fetch` on a miss
+
+        `fetch` must return a record with a "status" ("success" or an error
+        status) and may set "cacheable": False to skip storing it.
+        Concurrent misses only share a request with the same `flight` key
+        (defaults to `key`), so callers whose fetches differ in ways the
+        cache key leaves out, such as a shorter deadline, are not coalesced.
+
+        Returns:
+            (record, outcome) where outcome is one of hit/stale/negative/miss/coalesced/bypass
+        """
+        if not self.enabled:
+            return await fetch(), BYPASS
+
+        flight = flight or key
+
+        now = time.monotonic()
+        entry = None if bypass else self._entries.get(key)
+
+        if entry is not None and now >= entry.stale_until:
+            self._remove(key)
+            entry = None
+
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                return entry.record, self._count(source, NEGATIVE if entry.negative else HIT)
+            if not entry.negative:
+                if flight not in self._inflight:
+                    self._start_fetch(source, key, flight, fetch)
+                return entry.record, self._count(source, STALE)
+
+        if flight in self._inflight:
+            record = await asyncio.shield(self._inflight[flight])
+            return record, self._count(source, COALESCED)
+
+        record = await asyncio.shield(self._start_fetch(source, key, flight, fetch))
+        return record, self._count(source, BYPASS if bypass else MISS)
+
+    def _start_fetch(
+        self,
+        source: str,
+        key: str,
+        flight: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> asyncio.Future:
+        """
+        Run the upstream request as its own task so that cancelling one
+        waiter does not cancel the request the other waiters share
+        """
+        async def run() -> Dict[str, Any]:
+            try:
+                record = await fetch()
+                self._store(source, key, record)
+                return record
+            finally:
+                self._inflight.pop(flight, None)
+
+        task = asyncio.ensure_future(run())
+        self._inflight[flight] = task
+        task.add_done_callback(self._log_failure)
+        return task
+
+    @staticmethod
+    def _log_failure(task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Cache fetch failed: {task.exception()}")
+
+    def _store(self, source: str, key: str, record: Dict[str, Any]) -> None:
+        if not record.get("cacheable", True):
+            return
+
+        negative = record["status"] != "success"
+        ttl = self.negative_ttl if negative else self.ttl_for(source)
+        if ttl <= 0:
+            return
+
+        now = time.monotonic()
+        size = len(key) + len(record.get("content") or b"")
+        self._remove(key)
+        self._entries[key] = CacheEntry(
+            record,
+            size,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + (0 if negative else self.stale_ttl),
+            negative=negative,
+        )
+        self._bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _count(self, source: str, outcome: str) -> str:
+        self.counts[outcome] += 1
+        if self.on_lookup:
+            self.on_lookup(source, outcome)
+        return outcome
+
+    def discard(self, key: str) -> None:
+        """Drop one entry, e.g. a response found to be unreadable only after it was cached"""
+        self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and coalescing counts"""
+        lookups = sum(self.counts.values()) - self.counts[BYPASS]
+        served = self.counts[HIT] + self.counts[STALE] + self.counts[NEGATIVE] + self.counts[COALESCED]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "in_flight": len(self._inflight),
+            **self.counts,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,353 @@
+"""
+Shared gateway state
+Counters, histograms and token buckets behind one interface, so that every
+worker process (shared memory) or every gateway node (Redis) sees the same
+rate limits and request totals
+"""
+import bisect
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def refill(tokens: float, last: float, now: float, rate: float, burst: float) -> float:
+    """Token balance after refilling at `rate` per second since `last` (capped at `burst`)"""
+    return min(burst, tokens + max(0.0, now - last) * rate)
+
+
+def reservation_wait(tokens: float, rate: float) -> float:
+    """Seconds until a balance that just paid for a token is back at zero"""
+    return 0.0 if tokens >= 0 else -tokens / rate
+
+
+def histogram_keys(key: str, value: float, buckets: Sequence[float]) -> Dict[str, float]:
+    """
+    Counter increments that record one histogram observation
+    Only the matching bucket is counted; read_histogram() makes them cumulative
+    """
+    index = bisect.bisect_left(buckets, value)
+    bound = buckets[index] if index < len(buckets) else float("inf")
+    return {f"{key}|le={bound}": 1.0, f"{key}|sum": value, f"{key}|count": 1.0}
+
+
+def read_histogram(counters: Dict[str, float], key: str) -> Tuple[List[Tuple[float, float]], float]:
+    """
+    Cumulative (upper_bound, count) buckets and the sum of a histogram
+    stored with histogram_keys()
+    """
+    prefix = f"{key}|le="
+    counts = sorted(
+        (float(name[len(prefix):]), value)
+        for name, value in counters.items()
+        if name.startswith(prefix)
+    )
+    cumulative, total = [], 0.0
+    for bound, count in counts:
+        total += count
+        cumulative.append((bound, total))
+    if not cumulative or cumulative[-1][0] != float("inf"):
+        cumulative.append((float("inf"), total))
+    return cumulative, counters.get(f"{key}|sum", 0.0)
+
+
+class StateBackend(ABC):
+    """
+    Interface for shared counters, histograms and token buckets
+
+    Keys are plain strings; counters and histograms share one namespace
+    (a histogram is a group of counters, see histogram_keys()). Token
+    buckets hold a balance that may go negative: a reservation takes a
+    token now and waits until it has been refilled. Backends implement
+    incr_many(), counters() and take_token(); the rest is built on them.
+    """
+
+    name = "base"
+    shared = False
+
+    @abstractmethod
+    async def incr_many(self, amounts: Dict[str, float]) -> None:
+        """Add to several counters at once"""
+
+    async def incr(self, key: str, amount: float = 1.0) -> None:
+        await self.incr_many({key: amount})
+
+    async def observe(self, key: str, value: float, buckets: Sequence[float]) -> None:
+        """Record one histogram observation"""
+        await self.incr_many(histogram_keys(key, value, buckets))
+
+    @abstractmethod
+    async def counters(self, prefix: str = "") -> Dict[str, float]:
+        """All counters whose key starts with `prefix`"""
+
+    @abstractmethod
+    async def take_token(self, key: str, rate: float, burst: float, amount: float = 1.0) -> float:
+        """
+        Refill the bucket, subtract `amount` tokens (negative gives tokens
+        back) and return the new balance. New buckets start full.
+        """
+
+    async def reserve_token(self, key: str, rate: float, burst: float) -> float:
+        """Reserve one token and return how long to wait before using it"""
+        return reservation_wait(await self.take_token(key, rate, burst), rate)
+
+    async def return_token(self, key: str, rate: float, burst: float) -> None:
+        """Give back a reserved token that will not be used"""
+        await self.take_token(key, rate, burst, -1.0)
+
+    async def token_wait(self, key: str, rate: float, burst: float) -> float:
+        """Time until a new reservation could be used, without reserving"""
+        tokens = await self.take_token(key, rate, burst, 0.0)
+        return 0.0 if tokens >= 1.0 else (1.0 - tokens) / rate
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalBackend(StateBackend):
+    """Per-process state (the default; nothing is shared between workers)"""
+
+    name = "local"
+
+    def __init__(self):
+        self._counters: Dict[str, float] = {}
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def incr_many(self, amounts: Dict[str, float]) -> None:
+        for key, amount in amounts.items():
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    async def counters(self, prefix: str = "") -> Dict[str, float]:
+        return {key: value for key, value in self._counters.items() if key.startswith(prefix)}
+
+    async def take_token(self, key: str, rate: float, burst: float, amount: float = 1.0) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(key, [float(burst), now])
+        bucket[0] = min(burst, refill(bucket[0], bucket[1], now, rate, burst) - amount)
+        bucket[1] = now
+        return bucket[0]
+
+
+class SharedMemoryBackend(StateBackend):
+    """
+    State shared by the worker processes of one host
+
+    A fixed-size open-addressing table in a memory-mapped file (put it on
+    tmpfs, e.g. /dev/shm or the Prometheus multiprocess directory). Each
+    slot holds a key and two doubles; an exclusive flock() on the file makes
+    every update atomic across processes. Slots are never freed, so size
+    the table for the number of distinct keys (a few per source).
+    """
+
+    name = "shared_memory"
+    shared = True
+
+    KEY_BYTES = 64
+    SLOT = struct.Struct(f"<{KEY_BYTES}sdd")
+    VALUES = struct.Struct("<dd")
+
+    def __init__(self, path: str, slots: int = 4096):
+        self.path = path
+        self.slots = slots
+        size = self.SLOT.size * slots
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._slot_of: Dict[str, int] = {}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, key: str) -> int:
+        """Byte offset of the key's slot, claiming a free slot for a new key (hold the lock)"""
+        slot = self._slot_of.get(key)
+        if slot is not None:
+            return slot * self.SLOT.size
+
+        encoded = key.encode()
+        if len(encoded) > self.KEY_BYTES:
+            raise ValueError(f"State key longer than {self.KEY_BYTES} bytes: {key}")
+
+        start = zlib.crc32(encoded) % self.slots
+        for probe in range(self.slots):
+            slot = (start + probe) % self.slots
+            offset = slot * self.SLOT.size
+            stored = self._map[offset:offset + self.KEY_BYTES].rstrip(b"\0")
+            if not stored:
+                self.SLOT.pack_into(self._map, offset, encoded, 0.0, 0.0)
+            elif stored != encoded:
+                continue
+            self._slot_of[key] = slot
+            return offset
+        raise RuntimeError(f"Shared state table {self.path} is full ({self.slots} slots)")
+
+    async def incr_many(self, amounts: Dict[str, float]) -> None:
+        with self._locked():
+            for key, amount in amounts.items():
+                offset = self._offset(key) + self.KEY_BYTES
+                value, extra = self.VALUES.unpack_from(self._map, offset)
+                self.VALUES.pack_into(self._map, offset, value + amount, extra)
+
+    async def counters(self, prefix: str = "") -> Dict[str, float]:
+        encoded_prefix = prefix.encode()
+        result = {}
+        with self._locked():
+            for offset in range(0, self.SLOT.size * self.slots, self.SLOT.size):
+                key, value, _ = self.SLOT.unpack_from(self._map, offset)
+                key = key.rstrip(b"\0")
+                if key and key.startswith(encoded_prefix):
+                    result[key.decode()] = value
+        return result
+
+    async def take_token(self, key: str, rate: float, burst: float, amount: float = 1.0) -> float:
+        # Wall-clock time: the refill timestamp is read by other processes
+        now = time.time()
+        with self._locked():
+            offset = self._offset(key) + self.KEY_BYTES
+            tokens, last = self.VALUES.unpack_from(self._map, offset)
+            if last == 0.0:
+                tokens, last = float(burst), now
+            tokens = min(burst, refill(tokens, last, now, rate, burst) - amount)
+            self.VALUES.pack_into(self._map, offset, tokens, now)
+        return tokens
+
+    async def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+# Refill, take and store a token bucket atomically, using the Redis clock
+TAKE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'last')
+local tokens = tonumber(state[1]) or burst
+local last = tonumber(state[2]) or now
+tokens = math.min(burst, math.min(burst, tokens + math.max(0, now - last) * rate) - amount)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'last', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return tostring(tokens)
+"""
+
+
+class RedisBackend(StateBackend):
+    """
+    State shared by every gateway node through Redis
+
+    Counters live in one hash and token buckets are updated by a Lua script,
+    so each operation is a single round trip. When Redis is unreachable the
+    backend falls back to per-process state and retries after a backoff,
+    so an outage loosens limits instead of failing requests.
+    """
+
+    name = "redis"
+    shared = True
+
+    ERROR_BACKOFF_SECONDS = 30
+
+    def __init__(self, url: str, prefix: str = "researchpilot:gateway:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("GATEWAY_STATE_BACKEND=redis needs the redis package") from e
+
+        self.prefix = prefix
+        self.client = redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._take = self.client.register_script(TAKE_TOKEN_SCRIPT)
+        self._fallback = LocalBackend()
+        self._disabled_until = 0.0
+
+    @property
+    def _counters_key(self) -> str:
+        return f"{self.prefix}counters"
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _failed(self, error: Exception) -> None:
+        if self._available():
+            logger.warning(f"Redis state unavailable, using per-process state for {self.ERROR_BACKOFF_SECONDS}s: {error}")
+        self._disabled_until = time.monotonic() + self.ERROR_BACKOFF_SECONDS
+
+    async def incr_many(self, amounts: Dict[str, float]) -> None:
+        if self._available():
+            try:
+                pipeline = self.client.pipeline(transaction=False)
+                for key, amount in amounts.items():
+                    pipeline.hincrbyfloat(self._counters_key, key, amount)
+                await pipeline.execute()
+                return
+            except Exception as e:
+                self._failed(e)
+        await self._fallback.incr_many(amounts)
+
+    async def counters(self, prefix: str = "") -> Dict[str, float]:
+        if self._available():
+            try:
+                values = await self.client.hgetall(self._counters_key)
+                return {
+                    key.decode(): float(value)
+                    for key, value in values.items()
+                    if key.decode().startswith(prefix)
+                }
+            except Exception as e:
+                self._failed(e)
+        return await self._fallback.counters(prefix)
+
+    async def take_token(self, key: str, rate: float, burst: float, amount: float = 1.0) -> float:
+        if self._available():
+            try:
+                # Idle buckets expire once they would have refilled anyway
+                ttl = max(60, int(burst / rate) + 60)
+                return float(await self._take(keys=[f"{self.prefix}bucket:{key}"], args=[rate, burst, amount, ttl]))
+            except Exception as e:
+                self._failed(e)
+        return await self._fallback.take_token(key, rate, burst, amount)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def backend_from_env() -> StateBackend:
+    """
+    Build the backend named by GATEWAY_STATE_BACKEND
+
+    - local (default): per-process state
+    - shared_memory: one host, GATEWAY_STATE_PATH (defaults to a file in
+      PROMETHEUS_MULTIPROC_DIR, which is cleared on container start)
+    - redis: several nodes, GATEWAY_REDIS_URL
+    """
+    kind = os.getenv("GATEWAY_STATE_BACKEND", "local").lower()
+
+    if kind == "local":
+        return LocalBackend()
+    if kind == "shared_memory":
+        directory = os.getenv("PROMETHEUS_MULTIPROC_DIR", "/dev/shm")
+        path = os.getenv("GATEWAY_STATE_PATH", os.path.join(directory, "gateway-state.bin"))
+        return SharedMemoryBackend(path, slots=int(os.getenv("GATEWAY_STATE_SLOTS", "4096")))
+    if kind == "redis":
+        return RedisBackend(
+            os.getenv("GATEWAY_REDIS_URL", "redis://localhost:6379/0"),
+            prefix=os.getenv("GATEWAY_STATE_PREFIX", "researchpilot:gateway:")
+        )
+    raise ValueError(f"Unknown GATEWAY_STATE_BACKEND: {kind}")
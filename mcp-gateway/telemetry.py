@@ -0,0 +1,237 @@
+"""
+Gateway metrics
+Prometheus counters and histograms for MCP sources, aggregated across worker
+processes when PROMETHEUS_MULTIPROC_DIR is set, and mirrored into a shared
+state backend (when one is configured) for gateway-wide summaries
+"""
+import os
+from typing import Dict, Any, Iterable, Optional
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess
+
+from shared_state import StateBackend, histogram_keys, read_histogram
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75,
+    1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0
+)
+
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+# Shared backend behind /metrics/summary (None: read the Prometheus registry)
+shared_state: Optional[StateBackend] = None
+
+# Metrics
+source_requests_total = Counter(
+    'gateway_source_requests_total',
+    'Requests routed to MCP sources',
+    ['source', 'status']
+)
+
+source_request_duration_seconds = Histogram(
+    'gateway_source_request_duration_seconds',
+    'MCP source request duration',
+    ['source'],
+    buckets=LATENCY_BUCKETS
+)
+
+source_retries_total = Counter(
+    'gateway_source_retries_total',
+    'Upstream calls retried under the source retry policy',
+    ['source']
+)
+
+replica_requests_total = Counter(
+    'gateway_replica_requests_total',
+    'Upstream attempts per source replica (failed: connection error, timeout or 5xx)',
+    ['source', 'replica', 'result']
+)
+
+hedge_requests_total = Counter(
+    'gateway_hedge_requests_total',
+    'Hedged (duplicate) upstream calls sent after the hedge delay',
+    ['source']
+)
+
+hedge_wins_total = Counter(
+    'gateway_hedge_wins_total',
+    'Hedged calls that finished before the call they duplicated',
+    ['source']
+)
+
+response_cache_requests_total = Counter(
+    'gateway_response_cache_requests_total',
+    'Response cache lookups by outcome (hit, stale, negative, miss, coalesced, bypass)',
+    ['source', 'result']
+)
+
+rate_limit_waiting = Gauge(
+    'gateway_rate_limit_waiting',
+    'Requests waiting for a rate limit token',
+    ['source'],
+    multiprocess_mode='livesum'
+)
+
+rate_limit_wait_seconds = Histogram(
+    'gateway_rate_limit_wait_seconds',
+    'Time spent waiting for a rate limit token',
+    ['source'],
+    buckets=WAIT_BUCKETS
+)
+
+rate_limit_rejected_total = Counter(
+    'gateway_rate_limit_rejected_total',
+    'Requests rejected by the rate limiter',
+    ['source']
+)
+
+
+def get_registry() -> CollectorRegistry:
+    """Registry to export: merged per-process files in multiprocess mode"""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def use_shared_state(backend: StateBackend) -> None:
+    """Mirror source request metrics into `backend` if it is shared across workers or nodes"""
+    global shared_state
+    shared_state = backend if backend.shared else None
+
+
+async def record_source_request(source: str, status: str, seconds: float) -> None:
+    """Count a routed request and observe its latency"""
+    source_requests_total.labels(source=source, status=status).inc()
+    source_request_duration_seconds.labels(source=source).observe(seconds)
+
+    if shared_state is not None:
+        await shared_state.incr_many({
+            f"requests|{source}|{status}": 1.0,
+            **histogram_keys(f"latency|{source}", seconds, LATENCY_BUCKETS),
+        })
+
+
+async def record_rate_limited(source: str) -> None:
+    """Count a request the rate limiter turned away"""
+    rate_limit_rejected_total.labels(source=source).inc()
+    source_requests_total.labels(source=source, status="rate_limited").inc()
+
+    if shared_state is not None:
+        await shared_state.incr(f"requests|{source}|rate_limited")
+
+
+def record_replica_request(source: str, replica: str, failed: bool) -> None:
+    """Count one upstream attempt against the replica that served it"""
+    replica_requests_total.labels(source=source, replica=replica, result="failed" if failed else "ok").inc()
+
+
+def record_cache_lookup(source: str, result: str) -> None:
+    """Count a response cache lookup"""
+    response_cache_requests_total.labels(source=source, result=result).inc()
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess files on shutdown"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def export() -> bytes:
+    """Prometheus text exposition"""
+    return generate_latest(get_registry())
+
+
+def _histogram_quantile(q: float, buckets: list) -> float:
+    """
+    Estimate a quantile from cumulative (upper_bound, count) buckets,
+    interpolating linearly inside the bucket (like PromQL histogram_quantile)
+    """
+    total = buckets[-1][1]
+    if total == 0:
+        return 0.0
+
+    rank = q * total
+    lower_bound, lower_count = 0.0, 0.0
+    for upper_bound, count in buckets:
+        if count >= rank:
+            if upper_bound == float("inf"):
+                return lower_bound
+            if count == lower_count:
+                return upper_bound
+            return lower_bound + (upper_bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+        lower_bound, lower_count = upper_bound, count
+    return lower_bound
+
+
+def _collect_prometheus():
+    """Request counts, cumulative latency buckets and latency sums from the Prometheus registry"""
+    counts: Dict[str, Dict[str, int]] = {}
+    buckets: Dict[str, list] = {}
+    sums: Dict[str, float] = {}
+
+    for family in get_registry().collect():
+        if family.name == 'gateway_source_requests':
+            for sample in family.samples:
+                if sample.name.endswith('_total'):
+                    source_counts = counts.setdefault(sample.labels['source'], {})
+                    status = sample.labels['status']
+                    source_counts[status] = source_counts.get(status, 0) + int(sample.value)
+        elif family.name == 'gateway_source_request_duration_seconds':
+            for sample in family.samples:
+                source = sample.labels['source']
+                if sample.name.endswith('_bucket'):
+                    buckets.setdefault(source, []).append((float(sample.labels['le']), sample.value))
+                elif sample.name.endswith('_sum'):
+                    sums[source] = sums.get(source, 0.0) + sample.value
+
+    merged = {}
+    for source, source_buckets in buckets.items():
+        # Multiprocess samples may repeat a bound once per file; merge them
+        by_bound: Dict[float, float] = {}
+        for upper_bound, count in source_buckets:
+            by_bound[upper_bound] = by_bound.get(upper_bound, 0.0) + count
+        merged[source] = sorted(by_bound.items())
+    return counts, merged, sums
+
+
+async def _collect_shared():
+    """The same numbers from the shared state backend"""
+    counters = await shared_state.counters()
+    counts: Dict[str, Dict[str, int]] = {}
+    buckets: Dict[str, list] = {}
+    sums: Dict[str, float] = {}
+
+    for key, value in counters.items():
+        kind, _, rest = key.partition("|")
+        source, _, rest = rest.partition("|")
+        if kind == "requests":
+            counts.setdefault(source, {})[rest] = int(value)
+        elif kind == "latency" and source not in buckets:
+            buckets[source], sums[source] = read_histogram(counters, f"latency|{source}")
+    return counts, buckets, sums
+
+
+async def source_summary(quantiles: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-source request counts by status and latency quantiles (ms), read
+    from the shared state backend if there is one, otherwise from the same
+    registry that /metrics exports
+    """
+    counts, buckets, sums = await _collect_shared() if shared_state is not None else _collect_prometheus()
+    summary: Dict[str, Dict[str, Any]] = {source: {"requests": c} for source, c in counts.items()}
+
+    for source, cumulative in buckets.items():
+        count = cumulative[-1][1]
+        latency = {"count": int(count)}
+        latency["avg_ms"] = round(sums.get(source, 0.0) / count * 1000, 2) if count else 0
+        for q in quantiles:
+            latency[f"p{int(q * 100)}_ms"] = round(_histogram_quantile(q, cumulative) * 1000, 2)
+        summary.setdefault(source, {})["latency"] = latency
+
+    return summary
@@ -0,0 +1,7 @@
+"""
+Test setup: the gateway is a flat set of modules, import them from the parent directory
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
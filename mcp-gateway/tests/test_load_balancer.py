@@ -0,0 +1,135 @@
+"""
+Replica load balancing: latency-aware placement, ejection and slow start
+Replicas are stub httpx clients that answer after an injected latency
+"""
+import asyncio
+import random
+import time
+
+import httpx
+import pytest
+
+from load_balancer import LEAST_OUTSTANDING, MIN_WEIGHT, POWER_OF_TWO, Replica, SourceBalancer
+
+
+def stub_replica(url: str, latency: float = 0.0) -> Replica:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={"results": [], "replica": url})
+
+    return Replica(url, httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url=url))
+
+
+def balancer(*replicas: Replica, **settings) -> SourceBalancer:
+    return SourceBalancer("web-search", list(replicas), settings)
+
+
+@pytest.mark.parametrize("strategy", [LEAST_OUTSTANDING, POWER_OF_TWO])
+def test_load_skews_toward_fast_replicas(strategy):
+    random.seed(7)
+    fast = stub_replica("http://fast", 0.005)
+    medium = stub_replica("http://medium", 0.02)
+    slow = stub_replica("http://slow", 0.06)
+    pool = balancer(fast, medium, slow, strategy=strategy)
+
+    async def worker(requests: int) -> None:
+        for _ in range(requests):
+            replica = pool.acquire()
+            try:
+                response = await replica.client.post("/search", json={"query": "q"})
+                pool.release(replica, response.status_code == 200)
+            except Exception:
+                pool.release(replica, False)
+                raise
+
+    async def run() -> None:
+        await asyncio.gather(*(worker(20) for _ in range(8)))
+        for replica in (fast, medium, slow):
+            await replica.client.aclose()
+
+    asyncio.run(run())
+
+    assert fast.requests + medium.requests + slow.requests == 160
+    assert fast.requests > medium.requests > slow.requests
+    assert all(replica.outstanding == 0 for replica in (fast, medium, slow))
+
+
+def test_consecutive_failures_eject_replica():
+    bad, good = stub_replica("http://bad"), stub_replica("http://good")
+    pool = balancer(bad, good, consecutive_failures=3, ejection_seconds=30)
+
+    for _ in range(3):
+        bad.outstanding += 1
+        pool.release(bad, False)
+
+    assert not bad.available(time.monotonic())
+    assert all(pool.acquire() is good for _ in range(10))
+
+
+def test_success_resets_failure_streak():
+    replica = stub_replica("http://flaky")
+    pool = balancer(replica, stub_replica("http://other"), consecutive_failures=3)
+
+    for ok in (False, False, True, False, False):
+        replica.outstanding += 1
+        pool.release(replica, ok)
+
+    assert replica.available(time.monotonic())
+
+
+def test_repeat_ejections_back_off():
+    replica = stub_replica("http://bad")
+    pool = balancer(replica, stub_replica("http://good"), ejection_seconds=10, max_ejection_seconds=25)
+
+    durations = []
+    for _ in range(3):
+        pool.eject(replica, "test")
+        durations.append(replica.ejected_until - time.monotonic())
+
+    assert [round(d) for d in durations] == [10, 20, 25]
+
+
+def test_all_ejected_falls_back_to_every_replica():
+    a, b = stub_replica("http://a"), stub_replica("http://b")
+    pool = balancer(a, b)
+    pool.eject(a, "test")
+    pool.eject(b, "test")
+
+    assert pool.acquire() in (a, b)
+
+
+def test_recovered_replica_ramps_up_with_slow_start():
+    recovered, steady = stub_replica("http://recovered"), stub_replica("http://steady")
+    pool = balancer(recovered, steady, slow_start_seconds=30)
+    pool.eject(recovered, "test")
+
+    # The ejection has just run out: the replica is back at its minimum weight
+    recovered.ejected_until = time.monotonic() - 0.001
+    now = time.monotonic()
+    assert recovered.available(now)
+    assert recovered.weight(now, pool.slow_start) == pytest.approx(MIN_WEIGHT)
+
+    # Least outstanding favours the steady replica until it is ~10x as loaded
+    placed = [pool.acquire() for _ in range(5)]
+    assert all(replica is steady for replica in placed)
+
+    # Halfway through the window the weight is about one half
+    recovered.recovered_at = time.monotonic() - 15
+    assert recovered.weight(time.monotonic(), pool.slow_start) == pytest.approx(0.5, abs=0.01)
+
+    # Past the window: full weight, and the ejection history is forgotten
+    recovered.recovered_at = time.monotonic() - 31
+    assert recovered.weight(time.monotonic(), pool.slow_start) == 1.0
+    assert recovered.ejections == 0
+
+
+def test_health_probes_eject_and_restore():
+    replica, other = stub_replica("http://probed"), stub_replica("http://other")
+    pool = balancer(replica, other)
+
+    pool.mark_health(replica, False)
+    assert not replica.available(time.monotonic())
+
+    pool.mark_health(replica, True)
+    assert replica.available(time.monotonic())
+    assert replica.recovered_at is not None